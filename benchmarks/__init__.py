@@ -0,0 +1 @@
+"""Benchmarks de rssreader4 (voir benchmarks/bench.py)."""
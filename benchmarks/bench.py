@@ -0,0 +1,933 @@
+"""
+Benchmarks reproductibles de rssreader4: `python rssreader4.py bench` (suite + régressions
+contre une référence) ou `python -m benchmarks.bench bench_server` (un bench, JSON sur stdout).
+
+Mesures seulement: le comportement est vérifié par les tests (tests/, pytest). Les quelques
+contrôles qui conditionnent une mesure (parité des parseurs, ordre des résultats, budget
+d'import...) lèvent BenchCheckError, jamais `assert`: ils tiennent aussi sous python -O.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+import itertools
+from datetime import datetime, timezone
+from hashlib import sha1
+
+import rssreader4 as rr
+from rssreader4 import (
+    BENCH_MIN_S, BENCH_SIZES, BENCH_TOLERANCE, FETCH_TIMEOUT, FIN_WORDS_EN_W, FIN_WORDS_FR_W, IMPORT_BUDGET_MS,
+    IMPORT_FORBIDDEN, NEG_WORDS_EN_W, NEG_WORDS_FR_W, PHRASES_EN_W, PHRASES_FR_W, POS_WORDS_EN_W, POS_WORDS_FR_W,
+    RENDER_CHUNK, UA, METRICS, ArticleStore, BackgroundExporter, ExportWriter, FeedHub, FeedServer, FetchEngine,
+    Item, LangDetector, LinkCache, LinkResolver, QueryScheduler, ScoringPool, StoryClusterer, UnexpectedFeed,
+    dedup_key, detect_lang_simple, edition_urls, entry_source, entry_timestamp, fetch_query, get_lexicon,
+    item_line_args, items_from_entries, iter_google_news, label_from_score, safe_strip, score_batch,
+    score_text_auto, score_text_en, score_text_fr, sort_items, tokenize,
+)
+from benchmarks.support import (
+    SYNTH_FILLER, SYNTH_SOURCES, RedirectFeedServer, StubFeedServer, score_text_reference, synthetic_items,
+    synthetic_lang_titles, synthetic_rss, synthetic_titles,
+)
+
+
+class BenchCheckError(RuntimeError):
+    """Contrôle d'un bench en échec (résultat faux: la mesure n'a pas de sens)."""
+
+
+def _check(cond, msg="contrôle en échec"):
+    if not cond:
+        raise BenchCheckError(str(msg))
+
+
+def bench_fetch(n_entries: int = 100, delay: float = 0.3, rounds: int = 3) -> dict:
+    """FR+EN: ancien chemin (requests.get séquentiel) vs FetchEngine (session + parallèle)."""
+    import requests
+    feedparser = rr._import_feedparser()
+    routes = {"/fr": synthetic_rss(n_entries, 1), "/en": synthetic_rss(n_entries, 2)}  # /down -> 404
+    with StubFeedServer(routes, delay=delay) as srv:
+        urls = [("FR", srv.url + "/fr"), ("EN", srv.url + "/en")]
+
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for _lab, url in urls:
+                r = requests.get(url, headers={"User-Agent": UA}, timeout=20)
+                r.raise_for_status()
+                feedparser.parse(r.text)
+        t_seq = (time.perf_counter() - t0) / rounds
+
+        engine = FetchEngine()
+        try:
+            t0 = time.perf_counter()
+            for _ in range(rounds):
+                results = engine.fetch_many(urls)
+            t_par = (time.perf_counter() - t0) / rounds
+            _check(all(res.ok and len(res.entries) == n_entries for res in results), "FetchEngine: entrées manquantes")
+
+            partial = engine.fetch_many([("FR", srv.url + "/fr"), ("EN", srv.url + "/down")])
+            _check(partial[0].ok and len(partial[0].entries) == n_entries and not partial[1].ok,
+                   "échec partiel: l'édition valide doit rester servie")
+        finally:
+            engine.close()
+
+    return {"sequential_s": round(t_seq, 4), "engine_s": round(t_par, 4),
+            "speedup": round(t_seq / max(t_par, 1e-9), 2), "partial_failure_ok": True}
+
+
+def bench_scheduler(duration: float = 8.0, n_queries: int = 6, rate: float = 4.0, burst: int = 2,
+                    interval: float = 1.0) -> dict:
+    """
+    QueryScheduler contre un serveur local qui injecte du throttling: les hits n° 6 et 7
+    reçoivent 429 (Retry-After: 1), /q1 répond 503 une fois, /hot publie à chaque hit un
+    item au score fort. Vérifie le débit par hôte (<= burst + rate par seconde glissante),
+    la pause après un 429, le boost de /hot et la reprise de /q1.
+    """
+    hits = []
+    state = {"n": 0, "q1_failed": False}
+    lock = threading.Lock()
+
+    def handler(h):
+        path = h.path.split("?", 1)[0]
+        with lock:
+            state["n"] += 1
+            n = state["n"]
+            hits.append(time.monotonic())
+            fail_q1 = path == "/q1" and not state["q1_failed"]
+            state["q1_failed"] = state["q1_failed"] or fail_q1
+        if n in (6, 7) or fail_q1:
+            h.send_response(429 if n in (6, 7) else 503)
+            if n in (6, 7):
+                h.send_header("Retry-After", "1")
+            h.send_header("Content-Length", "0")
+            h.end_headers()
+            with lock:
+                if n in (6, 7):
+                    state["t429"] = max(state.get("t429", 0.0), time.monotonic())
+            return True
+        if path == "/hot":
+            title = f"Broadcom shares soar after record earnings beat and upgrade {n}"
+        else:
+            title = f"Broadcom to hold annual shareholder meeting {n}"
+        body = synthetic_rss(1, seed=n, titles=[(title, "Reuters")])
+        h.send_response(200)
+        h.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        h.send_header("Content-Length", str(len(body)))
+        h.end_headers()
+        h.wfile.write(body)
+        return True
+
+    with StubFeedServer(handler=handler) as srv:
+        sched = QueryScheduler(workers=2, rate=rate, burst=burst, backoff_base=0.5, backoff_max=4.0, seed=0,
+                               url_for=lambda q, mode: [("EN", f"{srv.url}/{q}")])
+        jobs = {q: sched.add(q, interval) for q in ["hot"] + [f"q{i}" for i in range(1, n_queries)]}
+        METRICS.reset()
+        try:
+            sched.run_sync(duration)
+        finally:
+            sched.close()
+        st = sched.stats()
+
+    worst = max(sum(1 for u in hits[i:] if u - t < 1.0) for i, t in enumerate(hits))
+    _check(worst <= burst + rate + 1, f"débit par hôte dépassé: {worst} hits/s")
+    # requêtes déjà en vol exceptées (marge 0.1 s), plus aucun hit pendant la seconde qui suit le 429
+    t429 = state["t429"]
+    _check(not [t for t in hits if t429 + 0.1 < t < t429 + 0.95], "Retry-After non respecté")
+    others = [j.runs for q, j in jobs.items() if q != "hot"]
+    _check(jobs["hot"].runs > max(others), "requête chaude non boostée")
+    _check(jobs["q1"].runs > 1 and jobs["q1"].failures == 0, "pas de reprise après 503")
+    lag = METRICS.snapshot()["stages"].get("sched_lag", {})
+    return {"hits": len(hits), "max_hits_per_s": worst, "runs": {q: j.runs for q, j in jobs.items()},
+            "throttled": st["throttled"], "max_queue_depth": st["max_queue_depth"],
+            "lag_p50_ms": lag.get("p50_ms"), "lag_p95_ms": lag.get("p95_ms"), "retry_after_ok": True}
+
+
+def bench_server(clients: int = 48, sse_clients: int = 8, duration: float = 4.0, n_queries: int = 4,
+                 interval: float = 0.5) -> dict:
+    """
+    Mode serveur sous charge: QueryScheduler -> FeedHub -> FeedServer, alimentés par un flux
+    local qui publie deux nouveaux items par hit, face à un essaim de clients locaux (threads,
+    http.client en keep-alive): /items avec If-None-Match, /rss en gzip, long-poll, SSE.
+    Vérifie que la charge amont ne dépend pas du nombre de clients (un fetch par passage),
+    les 304, le gzip + XML, et que chaque client SSE reçoit toutes les séquences dans l'ordre.
+    """
+    import gzip
+    import http.client
+    import xml.etree.ElementTree as ET
+    from urllib.parse import quote
+
+    counts = {}
+    lock = threading.Lock()
+
+    def handler(h):
+        q = h.path.split("?", 1)[0].strip("/")
+        with lock:
+            n = counts[q] = counts.get(q, 0) + 1
+        titles = [(f"{q} shares soar after record earnings beat {m}" if m % 2 else
+                   f"{q} shares plunge after profit warning {m}", "Reuters")
+                  for m in (2 * n, 2 * n - 1, 2 * n - 2, 2 * n - 3) if m > 0]
+        body = synthetic_rss(len(titles), seed=n, titles=titles,
+                             links=[f"https://example.com/{q}/{m}" for m in range(2 * n, 2 * n - len(titles), -1)])
+        h.send_response(200)
+        h.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        h.send_header("Content-Length", str(len(body)))
+        h.end_headers()
+        h.wfile.write(body)
+        return True
+
+    queries = [f"Q{i}" for i in range(n_queries)]
+    hub = FeedHub()
+    published = {}  # séquence -> instant de publication
+
+    def on_result(q, items, _results):
+        t = time.perf_counter()  # avant publish: un client SSE peut recevoir l'item aussitôt
+        last = hub.publish(q, items)
+        for s in range(last - len(items) + 1, last + 1):
+            published[s] = t
+
+    lat, errors, stat = [], [], {"200": 0, "304": 0, "gzip_bytes": 0, "plain_bytes": 0, "longpoll_wakeups": 0}
+    sse = [[] for _ in range(sse_clients)]
+    hello = threading.Semaphore(0)
+    stop = threading.Event()
+
+    def sse_client(i, host, port):
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        try:
+            conn.request("GET", "/events?since=0")
+            resp = conn.getresponse()
+            _check(resp.status == 200, resp.status)
+            while True:
+                line = resp.readline()
+                if not line:
+                    break
+                if line.startswith(b"event: hello"):
+                    hello.release()
+                elif line.startswith(b"id: "):
+                    sse[i].append((int(line[4:]), time.perf_counter()))
+        except Exception as e:  # noqa: BLE001 - rapporté par le bench
+            errors.append(f"sse: {e!r}")
+        finally:
+            conn.close()
+
+    def client(i, host, port):
+        q = queries[i % n_queries]
+        kind = ("items", "rss", "wait")[i % 3]
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        etag, since = None, 0
+        try:
+            while not stop.is_set():
+                if kind == "wait":
+                    path, headers = f"/items?q={quote(q)}&since={since}&wait=2", {}
+                else:
+                    path = f"/{kind}?q={quote(q)}&limit=50"
+                    headers = {"Accept-Encoding": "gzip"} if kind == "rss" else {}
+                    if etag:
+                        headers["If-None-Match"] = etag
+                t0 = time.perf_counter()
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                dt = time.perf_counter() - t0
+                with lock:
+                    if kind != "wait":  # long-poll: le temps mesuré est surtout l'attente voulue
+                        lat.append(dt)
+                    stat[str(resp.status)] = stat.get(str(resp.status), 0) + 1
+                if resp.status == 304:
+                    continue
+                _check(resp.status == 200, (resp.status, path))
+                etag = resp.getheader("ETag")
+                if resp.getheader("Content-Encoding") == "gzip":
+                    with lock:
+                        stat["gzip_bytes"] += len(body)
+                    body = gzip.decompress(body)
+                    with lock:
+                        stat["plain_bytes"] += len(body)
+                if kind == "rss":
+                    ET.fromstring(body)
+                else:
+                    doc = json.loads(body)
+                    if kind == "wait" and doc["count"]:
+                        with lock:
+                            stat["longpoll_wakeups"] += 1
+                    since = doc["seq"]
+        except Exception as e:  # noqa: BLE001
+            errors.append(f"{kind}: {e!r}")
+        finally:
+            conn.close()
+
+    with StubFeedServer(handler=handler) as upstream:
+        sched = QueryScheduler(workers=2, rate=50.0, burst=10, on_result=on_result,
+                               url_for=lambda q, mode: [("EN", f"{upstream.url}/{q}")])
+        for q in queries:
+            sched.add(q, interval)
+            hub.add_query(q)
+        METRICS.reset()
+        srv = FeedServer(hub, port=0, stats=sched.stats, heartbeat=1.0).start()
+        host, port = srv._httpd.server_address[:2]
+        readers = [threading.Thread(target=sse_client, args=(i, host, port), daemon=True)
+                   for i in range(sse_clients)]
+        for t in readers:
+            t.start()
+        for _ in readers:
+            _check(hello.acquire(timeout=10), "flux SSE non ouvert")
+        runner = threading.Thread(target=sched.run_sync, args=(duration,), daemon=True)
+        swarm = [threading.Thread(target=client, args=(i, host, port), daemon=True) for i in range(clients)]
+        t0 = time.perf_counter()
+        runner.start()
+        for t in swarm:
+            t.start()
+        runner.join()
+        time.sleep(0.3)  # derniers événements SSE
+        stop.set()
+        for t in swarm:
+            t.join(10)
+        elapsed = time.perf_counter() - t0
+        srv.close()
+        for t in readers:
+            t.join(10)
+        sched.close()
+        st = sched.stats()
+
+    _check(not errors, errors[:5])
+    hits = sum(counts.values())
+    _check(st["runs"] <= hits <= st["runs"] + sched.workers, f"fetchs amont: {hits} pour {st['runs']} passages")
+    _check(stat["304"] > 0, "aucun 304")
+    _check(stat["gzip_bytes"] and stat["gzip_bytes"] < stat["plain_bytes"], "gzip non servi")
+    expected = list(range(1, hub.seq + 1))
+    for got in sse:
+        _check([s for s, _t in got] == expected, "SSE: séquences manquantes ou désordonnées")
+    lat.sort()
+    n_req = stat["200"] + stat["304"]
+    push = sorted(t - published[s] for got in sse for s, t in got)
+    hs = hub.stats()
+
+    def pct(xs, p):
+        return round(xs[min(len(xs) - 1, int(p * len(xs)))] * 1000, 2) if xs else None
+
+    return {"clients": clients, "sse_clients": sse_clients, "requests": n_req,
+            "requests_per_s": round(n_req / elapsed, 1), "p50_ms": pct(lat, 0.5), "p95_ms": pct(lat, 0.95),
+            "p99_ms": pct(lat, 0.99), "not_modified": stat["304"], "ok": stat["200"],
+            "gzip_ratio": round(stat["gzip_bytes"] / stat["plain_bytes"], 3),
+            "longpoll_wakeups": stat["longpoll_wakeups"], "upstream_hits": hits, "runs": st["runs"],
+            "items": hub.seq, "renders": hs["renders"], "render_hits": hs["render_hits"],
+            "sse_push_p50_ms": pct(push, 0.5), "sse_push_p95_ms": pct(push, 0.95), "sse_complete": True}
+
+
+def bench_links(n_articles: int = 200, workers: int = 8, delay: float = 0.05, path: str = None) -> dict:
+    """
+    LinkResolver contre RedirectFeedServer (deux jetons par article, un opaque en 302,
+    1 sur 10 vers une 404): passage à froid puis à chaud sur le cache persistant.
+    Comportement (dédup, parallélisme borné, cache, LRU): tests/test_links.py.
+    """
+    import tempfile
+    path = path or os.path.join(tempfile.mkdtemp(prefix="rss-links-"), "links.json")
+    with RedirectFeedServer(n_articles, delay) as srv:
+        out = {}
+        for run in ("cold", "warm"):
+            resolver = LinkResolver(LinkCache(path), workers=workers, rate=0, hosts=srv.hosts)
+            fetcher = FetchEngine(links=resolver)
+            head0 = srv.state["head"]
+            t0 = time.perf_counter()
+            try:
+                items, _results = fetch_query(fetcher, [("EN", f"{srv.url}/feed")])
+            finally:
+                fetcher.close()
+                resolver.close()
+            el = time.perf_counter() - t0
+            expected = n_articles + n_articles // 10  # les liens en 404 restent opaques: pas de dédup possible
+            _check(len(items) == expected, f"{run}: {len(items)} items, {expected} attendus")
+            out[run] = {"s": round(el, 3), "items": len(items), "head": srv.state["head"] - head0,
+                        "stats": resolver.stats()}
+        out["max_inflight"] = srv.state["max_inflight"]
+    return out
+
+
+def _entry_key(e) -> tuple:
+    st = getattr(e, "published_parsed", None)
+    return (getattr(e, "title", ""), getattr(e, "link", ""), tuple(st[:6]) if st else None,
+            entry_source(e), getattr(e, "published", ""))
+
+
+def bench_parse(sizes=(100, 10_000), fixtures_dir: str = None) -> dict:
+    """
+    Parité iter_google_news == feedparser (titre, lien, date, source) sur des flux
+    synthétiques et les flux enregistrés (fixtures_dir/*.xml), puis débit des deux.
+    """
+    feedparser = rr._import_feedparser()
+    feeds = {f"synthetic-{n}": synthetic_rss(n, seed=n) for n in sizes}
+    if fixtures_dir:
+        for fn in sorted(os.listdir(fixtures_dir)):
+            if fn.endswith(".xml"):
+                with open(os.path.join(fixtures_dir, fn), "rb") as f:
+                    feeds[f"fixture-{fn[:-4]}"] = f.read()
+    res = {}
+    for name, data in feeds.items():
+        t0 = time.perf_counter()
+        ref = feedparser.parse(data).entries
+        t_fp = time.perf_counter() - t0
+        try:
+            t0 = time.perf_counter()
+            fast = list(iter_google_news(data))
+            t_fast = time.perf_counter() - t0
+        except UnexpectedFeed as e:
+            res[name] = {"fallback": str(e)}
+            continue
+        diffs = [(a, b) for a, b in zip(map(_entry_key, ref), map(_entry_key, fast)) if a != b]
+        if len(ref) != len(fast) or diffs:
+            raise BenchCheckError(f"{name}: {len(ref)} vs {len(fast)} entrées, {len(diffs)} écarts, "
+                                 f"ex: {diffs[:1]!r}")
+        mb = len(data) / 1e6
+        res[name] = {"entries": len(fast), "feedparser_s": round(t_fp, 4), "fast_s": round(t_fast, 4),
+                     "fast_mb_per_s": round(mb / max(t_fast, 1e-9), 1),
+                     "speedup": round(t_fp / max(t_fast, 1e-9), 1)}
+    return res
+
+
+def bench_render(sizes=(10_000, 100_000), legacy_max: int = 20_000) -> dict:
+    """
+    Rendu du terminal: ancien chemin (3 insert + 1 tag configuré/bindé par item)
+    vs insert par lots + tag "ilink" partagé. Nécessite un display Tk.
+    L'ancien chemin n'est mesuré que jusqu'à `legacy_max` items.
+    """
+    rr._import_tk()
+    root = rr.tk.Tk()
+    root.withdraw()
+    res = {}
+    try:
+        for n in sizes:
+            items = synthetic_items(n)
+            row = {}
+            if n <= legacy_max:
+                text = rr.tk.Text(root)
+                t0 = time.perf_counter()
+                for k, it in enumerate(items):
+                    line, tag, _i, _t, _nl, _n = item_line_args(it)
+                    text.insert("end", line[:25], tag)
+                    text.insert("end", line[25:], tag)
+                    tg = f"i_link_{k}"
+                    start = text.index("end-1c")
+                    text.insert("end", "[i]")
+                    text.tag_add(tg, start, text.index("end-1c"))
+                    text.tag_configure(tg, foreground="#1a73e8", underline=True)
+                    text.tag_bind(tg, "<Button-1>", lambda _e, u=it.link: u)
+                    text.insert("end", " \n")
+                    text.see("end")
+                text.update_idletasks()
+                row["legacy_s"] = round(time.perf_counter() - t0, 3)
+                text.destroy()
+
+            text = rr.tk.Text(root)
+            text.tag_configure("ilink", foreground="#1a73e8", underline=True)
+            t0 = time.perf_counter()
+            for i in range(0, n, RENDER_CHUNK):
+                args = []
+                for it in itertools.islice(items, i, i + RENDER_CHUNK):
+                    args.extend(item_line_args(it))
+                text.insert("end", *args)
+            text.see("end")
+            text.update_idletasks()
+            row["batched_s"] = round(time.perf_counter() - t0, 3)
+            text.destroy()
+            if "legacy_s" in row:
+                row["speedup"] = round(row["legacy_s"] / max(row["batched_s"], 1e-9), 2)
+            res[n] = row
+    finally:
+        root.destroy()
+    return res
+
+
+def bench_store(n: int = 1_000_000, path: str = None) -> dict:
+    """Charge n lignes synthétiques dans un ArticleStore (insert puis upsert de 10%) + requête d'historique."""
+    import tempfile
+    tmpdir = None
+    if path is None:
+        tmpdir = tempfile.mkdtemp(prefix="rss-bench-")
+        path = os.path.join(tmpdir, "articles.db")
+    pool = synthetic_titles(5000)
+    base = int(datetime(2025, 12, 19, tzinfo=timezone.utc).timestamp())
+    labels = ("POS", "NEU", "NEG")
+
+    def rows(lo, hi, now):
+        for i in range(lo, hi):
+            title, src = pool[i % len(pool)]
+            yield (sha1(str(i).encode()).hexdigest(), base - i * 7, f"SYM{i % 500}", "fr" if i % 3 else "en",
+                   labels[i % 3], i % 11 - 5, src, title, f"https://news.google.com/rss/articles/{i}", now)
+
+    store = ArticleStore(path)
+    try:
+        t0 = time.perf_counter()
+        store.upsert_rows(rows(0, n, base))
+        t_ins = time.perf_counter() - t0
+
+        k = max(1, n // 10)
+        t0 = time.perf_counter()
+        store.upsert_rows(rows(n - k, n + k, base + 1))  # moitié conflits, moitié nouvelles
+        t_up = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        hist = store.history(since=datetime.fromtimestamp(base - 86400, timezone.utc), query="SYM42")
+        t_q = time.perf_counter() - t0
+        total = store.count()
+    finally:
+        store.close()
+        if tmpdir is not None:
+            import shutil
+            shutil.rmtree(tmpdir, ignore_errors=True)
+    return {"rows": total, "insert_rows_per_s": round(n / t_ins), "upsert_rows_per_s": round(2 * k / t_up),
+            "history_query_ms": round(t_q * 1000, 2), "history_rows": len(hist)}
+
+
+def bench_memory(n: int = 100_000, seed: int = 0) -> dict:
+    """
+    Octets par item (tracemalloc) et coût d'accès: dict par item (ancienne forme,
+    clé story comprise) contre Item à __slots__, sur les mêmes chaînes.
+    """
+    import tracemalloc
+    items = synthetic_items(n, seed)
+
+    def measure(build):
+        tracemalloc.start()
+        try:
+            objs = build()
+            size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        return objs, size
+
+    dicts, dict_b = measure(lambda: [dict(it.to_dict(), story=None) for it in items])
+    slotted, item_b = measure(lambda: [Item.from_dict(d) for d in dicts])
+    t_dict = _bench_min_time(lambda: [(d["ts"], d["label"], d["source"], d["score"]) for d in dicts], 3)
+    t_item = _bench_min_time(lambda: [(it.ts, it.label, it.source, it.score) for it in slotted], 3)
+    return {"items": n, "dict_bytes_per_item": round(dict_b / n, 1), "item_bytes_per_item": round(item_b / n, 1),
+            "ratio": round(dict_b / max(item_b, 1), 2),
+            "dict_access_us_per_item": round(t_dict / n * 1e6, 3),
+            "item_access_us_per_item": round(t_item / n * 1e6, 3)}
+
+
+def bench_scoring(n: int = 20000, seed: int = 0) -> dict:
+    """score_text_fr/en (lexique compilé) vs implémentation historique (support.score_text_reference)."""
+    samples = synthetic_titles(n, seed)
+    refs = {
+        "fr": (score_text_fr, (POS_WORDS_FR_W, NEG_WORDS_FR_W, FIN_WORDS_FR_W, PHRASES_FR_W)),
+        "en": (score_text_en, (POS_WORDS_EN_W, NEG_WORDS_EN_W, FIN_WORDS_EN_W, PHRASES_EN_W)),
+    }
+    res = {"n": n}
+    for lang, (fast, dicts) in refs.items():
+        t0 = time.perf_counter()
+        for t, s in samples:
+            score_text_reference(t, s, *dicts)
+        t_ref = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for t, s in samples:
+            fast(t, s)
+        t_fast = time.perf_counter() - t0
+
+        res[lang] = {"reference_s": round(t_ref, 4), "compiled_s": round(t_fast, 4),
+                     "speedup": round(t_ref / max(t_fast, 1e-9), 2)}
+    return res
+
+
+def bench_lang(n: int = 20000, seed: int = 0) -> dict:
+    """Exactitude et vitesse: detect_lang_simple (historique) vs LangDetector (froid, puis mémo chaud)."""
+    import time
+    samples = synthetic_lang_titles(n, seed)
+    res = {"n": n, "langdetect": rr._has_module("langdetect")}
+
+    t0 = time.perf_counter()
+    legacy = [detect_lang_simple(f"{t} {src}") for t, src, _lg in samples]
+    t_legacy = time.perf_counter() - t0
+
+    det = LangDetector()
+    t0 = time.perf_counter()
+    fast = [det.detect(t, src) for t, src, _lg in samples]
+    t_cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for t, src, _lg in samples:
+        det.detect(t, src)
+    t_warm = time.perf_counter() - t0
+
+    no_prior = LangDetector()
+    plain = [no_prior.detect(t, "", learn=False) for t, _src, _lg in samples]
+
+    def acc(pred):
+        return round(sum(p == lg for p, (_t, _s, lg) in zip(pred, samples)) / max(n, 1), 4)
+
+    res["detect_lang_simple"] = {"accuracy": acc(legacy), "s": round(t_legacy, 4)}
+    res["lang_detector"] = {"accuracy": acc(fast), "cold_s": round(t_cold, 4), "warm_s": round(t_warm, 4),
+                            "speedup_cold": round(t_legacy / max(t_cold, 1e-9), 2),
+                            "speedup_warm": round(t_legacy / max(t_warm, 1e-9), 2)}
+    res["lang_detector_no_source_prior"] = {"accuracy": acc(plain)}
+    res["detector"] = det.stats()
+    return res
+
+
+def bench_stories(n_stories: int = 20000, copies: int = 5, seed: int = 0) -> dict:
+    """
+    Regroupement de reprises synthétiques (titre +/- un mot, source en suffixe):
+    pureté/complétude des dépêches et coût par item ajouté (1re vs dernière tranche).
+    """
+    import random
+    import time
+    rnd = random.Random(seed)
+    # vocabulaire de pseudo-mots (les titres réels varient bien plus que synthetic_titles)
+    vocab = ["".join(rnd.choice("bcdfglmnprstvaeiou") for _ in range(rnd.randint(3, 9))) for _ in range(20000)]
+    vocab += SYNTH_FILLER
+    items, truth = [], []
+    for k in range(n_stories):
+        words = rnd.sample(vocab, rnd.randint(6, 12))
+        for _ in range(rnd.randint(1, copies)):
+            w = list(words)
+            if rnd.random() < 0.5 and len(w) > 4:
+                w.pop(rnd.randrange(len(w)))
+            if rnd.random() < 0.5:
+                w.insert(rnd.randrange(len(w) + 1), rnd.choice(SYNTH_FILLER))
+            src = rnd.choice(SYNTH_SOURCES) or "Source"
+            items.append(Item(title=f"{' '.join(w)} - {src}", source=src))
+            truth.append(k)
+    order = list(range(len(items)))
+    rnd.shuffle(order)
+
+    cl = StoryClusterer()
+    tenth = max(1, len(order) // 10)
+    t0 = time.perf_counter()
+    for i in order[:tenth]:
+        cl.add(items[i])
+    t_first = time.perf_counter() - t0
+    for i in order[tenth:-tenth]:
+        cl.add(items[i])
+    t1 = time.perf_counter()
+    for i in order[-tenth:]:
+        cl.add(items[i])
+    t_last = time.perf_counter() - t1
+    el = time.perf_counter() - t0
+
+    story_truth = {}
+    pure = 0
+    for it, k in zip(items, truth):
+        story_truth.setdefault(id(it.story), []).append(k)
+    for ks in story_truth.values():
+        pure += max(ks.count(k) for k in set(ks))
+    return {
+        "items": len(items), "true_stories": n_stories, "stories": cl.stories,
+        "purity": round(pure / len(items), 4),
+        "us_per_item": round(el / len(items) * 1e6, 1),
+        "us_per_item_first_tenth": round(t_first / tenth * 1e6, 1),
+        "us_per_item_last_tenth": round(t_last / tenth * 1e6, 1),
+    }
+
+
+def bench_batch_scoring(n: int = 100000, seed: int = 0) -> dict:
+    """Vérifie score_batch == score_text_auto item par item et chronomètre les deux."""
+    import time
+    samples = synthetic_titles(n, seed)
+    titles = [t for t, _s in samples]
+    sources = [s for _t, s in samples]
+
+    # chaque passe part d'un détecteur vierge: a priori par source appris dans le même ordre
+    rr._LANG_DETECTOR = LangDetector()
+    t0 = time.perf_counter()
+    ref = [score_text_auto(t, s) for t, s in samples]
+    t_ref = time.perf_counter() - t0
+
+    rr._LANG_DETECTOR = LangDetector()
+    t0 = time.perf_counter()
+    scores, labels, langs = score_batch(titles, sources)
+    t_batch = time.perf_counter() - t0
+
+    mismatches = [i for i, (sc, lang) in enumerate(ref)
+                  if (int(scores[i]), str(langs[i]), str(labels[i])) != (sc, lang, label_from_score(sc))]
+    if mismatches:
+        raise BenchCheckError(f"{len(mismatches)} écarts, ex: {samples[mismatches[0]]!r}")
+    return {"n": n, "numpy": rr.np is not None, "per_item_s": round(t_ref, 4), "batch_s": round(t_batch, 4),
+            "speedup": round(t_ref / max(t_batch, 1e-9), 2)}
+
+
+def bench_batch_crossover(sizes=(10, 20, 50, 75, 100, 200, 500, 1000, 3000), seed: int = 0,
+                          budget_s: float = 0.2) -> dict:
+    """
+    score_batch vs score_text_auto item par item selon la taille du lot (meilleur de
+    plusieurs passes, learn=False): fixe BATCH_MIN, la taille sous laquelle
+    items_from_entries score item par item.
+    """
+    import time
+    score_batch(["warm-up"], [""], learn=False)
+    rows = []
+    for n in sizes:
+        samples = synthetic_titles(n, seed)
+        titles = [t for t, _s in samples]
+        sources = [s for _t, s in samples]
+        t_item = t_batch = float("inf")
+        spent, runs = 0.0, 0
+        while runs < 3 or spent < budget_s:
+            t0 = time.perf_counter()
+            for t, src in samples:
+                score_text_auto(t, src, False)
+            t1 = time.perf_counter()
+            score_batch(titles, sources, learn=False)
+            t2 = time.perf_counter()
+            t_item, t_batch = min(t_item, t1 - t0), min(t_batch, t2 - t1)
+            spent += t2 - t0
+            runs += 1
+        rows.append({"n": n, "per_item_s": round(t_item, 6), "batch_s": round(t_batch, 6),
+                     "speedup": round(t_item / max(t_batch, 1e-9), 2)})
+    faster = [r["n"] for r in rows if r["speedup"] >= 1.0]
+    return {"numpy": rr.np is not None, "batch_min": rr.BATCH_MIN, "rows": rows,
+            "crossover": min(faster) if faster else None}
+
+
+def bench_scoring_pool(n: int = 200000, workers=(0, 1, 2, 4), seed: int = 0) -> dict:
+    """Débit de ScoringPool selon le nombre de workers (0 = dans le processus), ordre vérifié."""
+    samples = synthetic_titles(n, seed)
+    titles = [t for t, _s in samples]
+    sources = [s for _t, s in samples]
+    expected = None
+    res = {"n": n, "cpu_count": os.cpu_count()}
+    for w in workers:
+        with ScoringPool(w) as pool:
+            scores, labels, langs = pool.score(titles, sources)
+            st = pool.stats()
+        if expected is None:
+            expected = scores
+        elif scores != expected:
+            raise BenchCheckError(f"workers={w}: résultats différents de workers={workers[0]}")
+        res[w] = {k: st[k] for k in ("elapsed_s", "items_per_s", "per_core_items_per_s")}
+    return res
+
+
+def _bench_min_time(fn, repeat: int, warmup: bool = True) -> float:
+    if warmup:
+        fn()  # caches (tokens de langue, regex) chauds: on mesure le régime établi
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _bench_render(items) -> float:
+    """Rendu par lots comme refresh_view (tags de ligne compris); None sans display Tk."""
+    try:
+        rr._import_tk()
+    except ImportError:
+        return None
+    try:
+        root = rr.tk.Tk()
+    except rr.tk.TclError:
+        return None
+    root.withdraw()
+    try:
+        text = rr.tk.Text(root)
+        text.tag_configure("ilink", foreground="#1a73e8", underline=True)
+        t0 = time.perf_counter()
+        for i in range(0, len(items), RENDER_CHUNK):
+            args = []
+            for it in itertools.islice(items, i, i + RENDER_CHUNK):
+                args.extend(item_line_args(it, ("row", f"lab_{it.label}", f"lang_{it.lang}")))
+            text.insert("end", *args)
+        text.see("end")
+        text.update_idletasks()
+        return time.perf_counter() - t0
+    finally:
+        root.destroy()
+
+
+def _bench_export(items, path: str) -> float:
+    """Chemin de on_save_csv: ExportWriter + BackgroundExporter, jusqu'à la fermeture du fichier."""
+    t0 = time.perf_counter()
+    exporter = BackgroundExporter(ExportWriter(path))
+    exporter.submit(items, "BENCH")
+    exporter.close()
+    exporter.join()
+    if exporter.error is not None:
+        raise exporter.error
+    return time.perf_counter() - t0
+
+
+def bench_suite(sizes=BENCH_SIZES, fixtures_dir: str = None, repeat: int = 3, render: bool = True,
+                import_budget_ms: float = IMPORT_BUDGET_MS) -> dict:
+    """
+    Suite reproductible: flux synthétiques de `sizes` entrées (graines fixes) + flux
+    enregistrés (fixtures_dir/*.xml, cf. record_fixtures), servis par StubFeedServer.
+    -> {"meta": {...}, "results": {"étape/flux": {"n", "s", "us_per_item"}}}; s = meilleur de `repeat`.
+    """
+    import platform
+    import tempfile
+    feedparser = rr._import_feedparser()
+    feeds = {f"synthetic-{n}": synthetic_rss(n, seed=n) for n in sizes}
+    if fixtures_dir:
+        for fn in sorted(os.listdir(fixtures_dir)):
+            if fn.endswith(".xml"):
+                with open(os.path.join(fixtures_dir, fn), "rb") as f:
+                    feeds[f"fixture-{fn[:-4]}"] = f.read()
+
+    results = {}
+
+    def record(stage: str, feed: str, n: int, s: float):
+        results[f"{stage}/{feed}"] = {"n": n, "s": round(s, 6), "us_per_item": round(s / max(n, 1) * 1e6, 3)}
+
+    fr, en = get_lexicon("fr"), get_lexicon("en")  # compilation hors mesure
+    score_batch(["warm-up"], [""])
+    with StubFeedServer({f"/{name}": body for name, body in feeds.items()}) as srv, \
+            tempfile.TemporaryDirectory() as tmp:
+        engine = FetchEngine()
+        try:
+            for name, body in feeds.items():
+                entries = feedparser.parse(body).entries
+                n = len(entries)
+                url = f"{srv.url}/{name}"
+                record("http+parse", name, n,
+                       _bench_min_time(lambda: engine.fetch_entries(url), repeat, warmup=False))
+                record("feedparser", name, n, _bench_min_time(lambda: feedparser.parse(body), repeat, warmup=False))
+                record("parse_google_news", name, n,
+                       _bench_min_time(lambda: list(iter_google_news(body)), repeat, warmup=False))
+                record("entry_timestamp", name, n,
+                       _bench_min_time(lambda: [entry_timestamp(e) for e in entries], repeat))
+                titles = [safe_strip(getattr(e, "title", "")) for e in entries]
+                sources = [entry_source(e) for e in entries]
+                links = [safe_strip(getattr(e, "link", "")) for e in entries]
+                record("tokenize", name, n, _bench_min_time(lambda: [tokenize(t) for t in titles], repeat))
+                record("score_text_fr", name, n,
+                       _bench_min_time(lambda: [fr.score(t, src) for t, src in zip(titles, sources)], repeat))
+                record("score_text_en", name, n,
+                       _bench_min_time(lambda: [en.score(t, src) for t, src in zip(titles, sources)], repeat))
+                record("score_batch", name, n, _bench_min_time(lambda: score_batch(titles, sources), repeat))
+                record("dedup_key", name, n,
+                       _bench_min_time(lambda: [dedup_key(t, ln) for t, ln in zip(titles, links)], repeat))
+                items = items_from_entries(entries)
+                record("items_from_entries", name, n, _bench_min_time(lambda: items_from_entries(entries), repeat))
+                record("sort", name, n, _bench_min_time(lambda: sort_items(list(reversed(items))), repeat))
+                for ext in ("csv", "jsonl"):
+                    path = os.path.join(tmp, f"{name}.{ext}")
+                    record(f"export_{ext}", name, n, min(_bench_export(items, path) for _ in range(max(1, repeat))))
+                if render:
+                    t = _bench_render(sort_items(items))
+                    if t is not None:
+                        record("render", name, n, t)
+        finally:
+            engine.close()
+
+    return {
+        "meta": {
+            "python": platform.python_version(), "platform": platform.platform(),
+            "feedparser": getattr(feedparser, "__version__", ""), "numpy": rr._import_numpy() is not None,
+            "repeat": repeat, "sizes": list(sizes), "render": any(k.startswith("render/") for k in results),
+        },
+        "results": results,
+        "memory": bench_memory(max(sizes, default=1000)),
+        "import": bench_import(import_budget_ms),
+    }
+
+
+def _importtime_rows(stderr: str) -> list:
+    """Sortie de `python -X importtime` -> [(module, profondeur, cumul ms)] dans l'ordre de fin d'import."""
+    rows = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        rows.append((name.strip(), (len(name) - len(name.lstrip()) - 1) // 2, int(parts[1]) / 1000))
+    return rows
+
+
+def bench_import(budget_ms: float = IMPORT_BUDGET_MS, repeat: int = 5, top: int = 10) -> dict:
+    """
+    Démarrage à froid, mesuré par `python -X importtime` dans des processus neufs:
+    `import rssreader4` puis un score_batch (chemin d'un job de scoring / cron).
+    -> import_ms (cumul du module, meilleur de `repeat`), lazy_ms (modules chargés au
+    premier scoring: numpy), imports les plus lents, modules IMPORT_FORBIDDEN chargés
+    quand même; ok = budget respecté et aucun module interdit.
+    """
+    import subprocess
+    here = os.path.dirname(os.path.abspath(rr.__file__))
+    code = "import rssreader4 as r; r.score_batch(['Broadcom shares soar'], [''])"
+    env = dict(os.environ, PYTHONPATH=here + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    runs = []
+    for k in range(max(1, repeat) + 1):
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=here, env=env,
+                             capture_output=True, text=True, check=True).stderr
+        if k:  # 1er passage: compilation des .pyc, non compté
+            runs.append(_importtime_rows(out))
+    best, best_ms = None, None
+    for rows in runs:
+        ms = next((cum for name, _d, cum in rows if name == "rssreader4"), None)
+        if ms is None:
+            raise RuntimeError("rssreader4 absent de la sortie -X importtime")
+        if best_ms is None or ms < best_ms:
+            best, best_ms = rows, ms
+
+    # imports directs du module (profondeur 1 juste avant sa ligne) + modules chargés ensuite (paresseux)
+    at = next(i for i, r in enumerate(best) if r[0] == "rssreader4")
+    start = max((i for i in range(at) if best[i][1] == 0), default=-1) + 1
+    direct = [r for r in best[start:at] if r[1] == 1]
+    lazy = [r for r in best[at + 1:] if r[1] == 0]
+    names = {name for name, _d, _c in best}
+    forbidden = sorted(m for m in IMPORT_FORBIDDEN if m in names)
+    slow = sorted(direct + lazy, key=lambda r: -r[2])[:top]
+    return {
+        "import_ms": round(best_ms, 1), "lazy_ms": round(sum(r[2] for r in lazy), 1), "budget_ms": budget_ms,
+        "forbidden_loaded": forbidden, "ok": best_ms <= budget_ms and not forbidden,
+        "slowest": [{"module": name, "cumulative_ms": round(cum, 1), "lazy": (name, d, cum) in lazy}
+                    for name, d, cum in slow],
+    }
+
+
+def bench_compare(current: dict, baseline: dict, tolerance: float = BENCH_TOLERANCE) -> list:
+    """Cas plus lents que baseline * (1 + tolérance) -> [{case, baseline_s, s, ratio}], pire d'abord."""
+    regressions = []
+    base = baseline.get("results", {})
+    for case, cur in current.get("results", {}).items():
+        ref = base.get(case)
+        if ref is None or max(cur["s"], ref["s"]) < BENCH_MIN_S:
+            continue
+        ratio = cur["s"] / max(ref["s"], 1e-9)
+        if ratio > 1 + tolerance:
+            regressions.append({"case": case, "baseline_s": ref["s"], "s": cur["s"], "ratio": round(ratio, 2)})
+    return sorted(regressions, key=lambda r: -r["ratio"])
+
+
+def record_fixtures(queries, out_dir: str, mode: str = "FR+EN") -> list:
+    """Enregistre les flux Google News bruts (XML) de `queries` -> out_dir/<requête>-<édition>.xml."""
+    import requests
+    os.makedirs(out_dir, exist_ok=True)
+    session = requests.Session()
+    session.headers["User-Agent"] = UA
+    written = []
+    try:
+        for q in queries:
+            for label, url in edition_urls(q, mode):
+                r = session.get(url, timeout=FETCH_TIMEOUT)
+                r.raise_for_status()
+                name = re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{q}-{label}").strip("_")
+                path = os.path.join(out_dir, name + ".xml")
+                with open(path, "wb") as f:
+                    f.write(r.content)
+                written.append(path)
+    finally:
+        session.close()
+    return written
+
+
+def main(argv=None) -> int:
+    """python -m benchmarks.bench NOM [NOM...] -> résultats JSON; code 1 si un contrôle échoue."""
+    names = (sys.argv[1:] if argv is None else argv) or ["bench_scoring"]
+    out = {}
+    for name in names:
+        fn = globals().get(name)
+        if not name.startswith("bench_") or fn is None:
+            print(f"bench inconnu: {name}", file=sys.stderr)
+            return 2
+        try:
+            out[name] = fn()
+        except BenchCheckError as e:
+            print(f"{name}: ÉCHEC: {e}", file=sys.stderr)
+            return 1
+    sys.stdout.write(json.dumps(out, indent=2, ensure_ascii=False, default=str) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
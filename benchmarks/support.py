@@ -0,0 +1,251 @@
+"""
+Données partagées par benchmarks/ et tests/: titres et flux RSS synthétiques (graines
+fixes, schéma Google News), serveurs HTTP locaux sur un port libre et le scorer
+historique servant de référence. Ne dépend que de rssreader4 (la sous-commande bench
+fonctionne sans tests/).
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+
+from rssreader4 import (
+    FIN_WORDS_EN_W, FIN_WORDS_FR_W, NEG_WORDS_EN_W, NEG_WORDS_FR_W, PHRASES_EN_W, PHRASES_FR_W, POS_WORDS_EN_W,
+    POS_WORDS_FR_W, Item, label_from_score, score_text_auto, tokenize,
+)
+
+def score_text_reference(title: str, source: str, pos_w: dict, neg_w: dict, fin_w: dict, phrases_w: dict) -> int:
+    # Implémentation historique: un scan `in` par expression (sous-chaîne, une fois par
+    # expression), puis les poids de chaque token.
+    text = f"{title} {source}".strip()
+    text_lc = text.lower()
+    score = sum(w for phr, w in phrases_w.items() if phr in text_lc)
+    for t in tokenize(text):
+        score += pos_w.get(t, 0)
+        score -= neg_w.get(t, 0)  # NEG weights are positive -> subtract
+        score += fin_w.get(t, 0)
+    return score
+
+
+SYNTH_FILLER = ["Broadcom", "AVGO", "Nvidia", "le", "la", "les", "the", "of", "after", "sur", "des",
+                 "marché", "market", "Q3", "2025", "CEO", "annonce", "says", "PDG", "Wall Street"]
+
+
+SYNTH_SOURCES = ["Reuters", "Bloomberg", "Les Echos", "Boursorama", "CNBC", "Zonebourse", "MarketWatch", ""]
+
+
+def synthetic_titles(n: int, seed: int = 0):
+    """Titres synthétiques (mots/expressions des lexiques + remplissage) -> [(title, source), ...]."""
+    import random
+    rnd = random.Random(seed)
+    vocab = []
+    for d in (POS_WORDS_FR_W, NEG_WORDS_FR_W, FIN_WORDS_FR_W, POS_WORDS_EN_W, NEG_WORDS_EN_W, FIN_WORDS_EN_W):
+        vocab.extend(d)
+    phrases = list(PHRASES_FR_W) + list(PHRASES_EN_W)
+    out = []
+    for _ in range(n):
+        words = rnd.sample(SYNTH_FILLER, rnd.randint(3, 8))
+        words += rnd.sample(vocab, rnd.randint(0, 3))
+        if rnd.random() < 0.3:
+            words.append(rnd.choice(phrases))
+        rnd.shuffle(words)
+        title = " ".join(words)
+        if rnd.random() < 0.5:
+            title = title.capitalize()
+        out.append((title, rnd.choice(SYNTH_SOURCES)))
+    return out
+
+
+# Titres étiquetés (gabarits réalistes, majoritairement hors lexiques) pour mesurer la détection de langue
+_LANG_TEMPLATES = {
+    "fr": ["{c} : le titre grimpe après l'annonce d'un partenariat", "{c} confirme ses objectifs annuels",
+           "Pourquoi {c} attire les investisseurs cette semaine", "{c} va racheter une start-up française",
+           "Les analystes restent prudents sur {c}", "{c} : ce qu'il faut retenir de la publication",
+           "Bourse de Paris : {c} en tête du CAC 40", "{c} nomme un nouveau directeur financier",
+           "{c} franchit un seuil symbolique", "{c} : l'action recule malgré un carnet de commandes plein",
+           "{c}, {c2} : les valeurs à suivre", "{c} {q}"],
+    "en": ["{c} stock climbs after partnership announcement", "{c} confirms annual targets",
+           "Why {c} is attracting investors this week", "{c} to acquire a European startup",
+           "Analysts stay cautious on {c}", "{c}: what to know about the report",
+           "Wall Street: {c} leads the Nasdaq", "{c} names a new chief financial officer",
+           "{c} crosses a symbolic threshold", "{c} slips despite a full order book",
+           "{c}, {c2}: stocks to watch", "{c} {q}"],
+}
+
+
+_LANG_SOURCES = {"fr": ["Les Echos", "Boursorama", "Zonebourse", "BFM Bourse", "Le Figaro"],
+                 "en": ["Reuters", "Bloomberg", "CNBC", "MarketWatch", "Barron's"]}
+
+
+_LANG_COMPANIES = ["Broadcom", "Nvidia", "LVMH", "TotalEnergies", "Apple", "Airbus", "Kering", "Microsoft",
+                   "Capgemini", "Tesla", "Sanofi", "AVGO", "NVDA", "Stellantis"]
+
+
+def synthetic_lang_titles(n: int, seed: int = 0):
+    """-> [(title, source, lang)]: titres étiquetés FR/EN, dont des titres courts sans indice ("{c} {q}")."""
+    import random
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        lang = rnd.choice(("fr", "en"))
+        c, c2 = rnd.sample(_LANG_COMPANIES, 2)
+        title = rnd.choice(_LANG_TEMPLATES[lang]).format(c=c, c2=c2, q=f"Q{rnd.randint(1, 4)} 2025")
+        out.append((title, rnd.choice(_LANG_SOURCES[lang]), lang))
+    return out
+
+
+def synthetic_items(n: int, seed: int = 0):
+    """Items scorés (même forme que items_from_entries), triés par date décroissante."""
+    now = int(datetime(2025, 12, 19, 12, 0, tzinfo=timezone.utc).timestamp())
+    items = []
+    for i, (title, src) in enumerate(synthetic_titles(n, seed)):
+        score, lang = score_text_auto(title, src)
+        items.append(Item(now - 37 * i, title, src, f"https://news.google.com/rss/articles/CBMi{seed:04d}{i:08d}?oc=5",
+                          score, label_from_score(score), lang))
+    return items
+
+
+def synthetic_rss(n: int, seed: int = 0, titles=None, links=None) -> bytes:
+    """
+    Flux RSS au schéma Google News (title/link/guid/pubDate/description/source).
+    titles: [(titre, source)] imposés (sinon n titres synthetic_titles); links: liens imposés.
+    """
+    from email.utils import format_datetime
+    from xml.sax.saxutils import escape, quoteattr
+    now = datetime(2025, 12, 19, 12, 0, tzinfo=timezone.utc).timestamp()
+    parts = ['<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+             '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>'
+             '<generator>NFE/5.0</generator><title>"AVGO" - Google News</title>'
+             '<link>https://news.google.com/search?q=AVGO</link><language>en-US</language>'
+             '<description>Google News</description>']
+    for i, (title, src) in enumerate(synthetic_titles(n, seed) if titles is None else titles):
+        src = src or "Reuters"
+        link = f"https://news.google.com/rss/articles/CBMi{seed:04d}{i:08d}?oc=5" if links is None else escape(links[i])
+        pub = format_datetime(datetime.fromtimestamp(now - 37 * i, timezone.utc), usegmt=True)
+        parts.append(
+            f"<item><title>{escape(title)} - {escape(src)}</title><link>{link}</link>"
+            f'<guid isPermaLink="false">CBMi{seed:04d}{i:08d}</guid><pubDate>{pub}</pubDate>'
+            f"<description>{escape(title)}</description>"
+            f"<source url={quoteattr('https://www.' + src.lower().replace(' ', '') + '.com')}>{escape(src)}</source></item>"
+        )
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+class StubFeedServer:
+    """
+    Serveur HTTP local (thread) pour benchs: sert `routes[path] -> bytes` avec
+    une latence artificielle (GET et HEAD). `handler` optionnel: f(request_handler)
+    -> bool (True = réponse déjà envoyée) pour injecter erreurs, redirections, etc.
+    """
+
+    def __init__(self, routes=None, delay: float = 0.0, handler=None):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        stub = self
+        self.routes = dict(routes or {})
+        self.delay = delay
+        self.hits = 0
+        self._lock = threading.Lock()
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *_a):
+                pass
+
+            def do_HEAD(self):
+                self.do_GET()
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.hits += 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if handler is not None and handler(self):
+                    return
+                body = stub.routes.get(self.path.split("?", 1)[0])
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+def gnews_token(url: str) -> str:
+    """Jeton news.google.com/rss/articles/ de l'ancien format (inverse de decode_gnews_link; tests / benchs)."""
+    import base64
+    raw = url.encode("utf-8")
+    n, var = len(raw), bytearray()
+    while True:
+        var.append((n & 0x7F) | (0x80 if n > 0x7F else 0))
+        n >>= 7
+        if not n:
+            break
+    return base64.urlsafe_b64encode(b"\x08\x13\x22" + bytes(var) + raw + b"\xd2\x01\x00").decode("ascii").rstrip("=")
+
+
+class RedirectFeedServer(StubFeedServer):
+    """
+    Redirections Google News simulées: chaque article i paraît deux fois dans /feed, sous un
+    jeton décodable hors ligne et sous un jeton opaque /rss/articles/AU_yqL_i (302 après
+    `delay` vers /article/i, servi par l'hôte "localhost"); 1 article sur 10 redirige
+    vers une 404. .state: {"head": HEAD reçus, "max_inflight": HEAD simultanés max}.
+    """
+
+    def __init__(self, n_articles: int = 200, delay: float = 0.05):
+        self.state = {"head": 0, "inflight": 0, "max_inflight": 0}
+        self.n_articles = n_articles
+        lock = threading.Lock()
+
+        def handler(h):
+            path = h.path.split("?", 1)[0]
+            if path.startswith("/rss/articles/AU_yqL"):
+                i = int(path.rsplit("_", 1)[1])
+                with lock:
+                    self.state["head"] += h.command == "HEAD"
+                    self.state["inflight"] += 1
+                    self.state["max_inflight"] = max(self.state["max_inflight"], self.state["inflight"])
+                time.sleep(delay)
+                with lock:
+                    self.state["inflight"] -= 1
+                h.send_response(302)
+                h.send_header("Location", f"{self.site}/article/{i}" if i % 10 else f"{self.site}/missing/{i}")
+                h.send_header("Content-Length", "0")
+                h.end_headers()
+                return True
+            if path.startswith("/article/"):
+                h.send_response(200)
+                h.send_header("Content-Length", "0")
+                h.end_headers()
+                return True
+            return False
+
+        super().__init__(handler=handler)
+        # liens de redirection sur 127.0.0.1, articles sur localhost (même serveur, autre hôte)
+        self.site = self.url.replace("127.0.0.1", "localhost")
+        titles, links = [], []
+        for i in range(n_articles):
+            title = (f"Broadcom article {i} annonce des résultats", "Reuters")
+            titles += [title, title]
+            opaque = f"{self.url}/rss/articles/AU_yqL_{i}?oc=5"
+            decodable = f"{self.url}/rss/articles/{gnews_token(f'{self.site}/article/{i}')}?oc=5"
+            links += [opaque, decodable] if i % 2 else [decodable, opaque]
+        self.routes["/feed"] = synthetic_rss(len(titles), titles=titles, links=links)
+        self.hosts = ("127.0.0.1",)
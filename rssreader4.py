@@ -8,43 +8,116 @@ Fonctions:
 - Query + recency + after/before + site:
 - Sélecteur langue: FR | EN | FR+EN (dual feed)
 - Fetch RSS -> merge + dédoublonnage + tri local par fraîcheur
-- Scoring auto FR/EN (détection heuristique, optionnel langdetect)
-- Lexiques pondérés + expressions (bigrams)
-- Filtres POS/NEG (checkbox)
+- Scoring auto FR/EN (détection en un passage: mots + trigrammes, mémo LRU, a priori par source)
+- Lexiques pondérés + expressions (bigrams), compilés une fois (CompiledLexicon)
+- Filtres POS/NEG, langue, source (masquage instantané, sans réafficher)
 - Terminal minimal: [YYYY-MM-DD HH:MM] [POS/NEG/NEU score] [FR/EN] Source – Titre [i]
 - [i] cliquable ouvre l’URL
-- Barre statut: nb news + ambiance globale
-- SAVE CSV: exporte les items (inclut URL brute)
+- Barre statut: nb news / dépêches + ambiance globale (une voix par dépêche)
+- Auto-refresh: polling incrémental (seules les nouvelles entrées sont scorées/insérées)
+- SAVE: exporte les items (inclut URL brute) en CSV / JSONL / Parquet, en arrière-plan,
+  avec export continu optionnel pendant l'auto-refresh
+- Cache HTTP disque (ETag / Last-Modified, 304 -> entrées déjà parsées)
+- Historique local SQLite (WAL): chaque item scoré est conservé, consultable sans refetch
+- Mode headless (sans Tk): scan d'une watchlist en parallèle -> JSONL/CSV
+- Scoring par lots (score_batch): un passage NumPy pour tout un fetch, repli item par item sans NumPy
+- Re-scoring d'archives CSV/JSONL sur un pool de processus (ordre conservé, débit par cœur)
+- Reprises d'une même dépêche regroupées (MinHash + LSH): une ligne par dépêche, N sources
+- Diagnostics: timers / histogrammes par étape (HTTP, parse, scoring, rendu), cProfile optionnel
+- Parseur dédié Google News RSS (expat, en flux sur les octets), repli feedparser
+- Mode serveur: une watchlist relevée une fois pour tous les postes, servie en JSON / RSS scoré
+  (ETag, gzip) et en temps réel (long-poll, SSE)
+
+Usage:
+  python rssreader4.py                                  # interface Tk
+  python rssreader4.py scan watchlist.txt -o out.jsonl  # headless
+  python rssreader4.py history --query AVGO --after 2025-12-01
+  python rssreader4.py serve watchlist.txt --port 8765     # serveur partagé (JSON / RSS / SSE)
+  python rssreader4.py score archive.csv --workers 8 -o rescored.jsonl  # backfill multi-process
+  python rssreader4.py bench --baseline bench.json                      # benchmarks + régressions
 
 Dépendances:
   pip install requests feedparser
 Optionnel:
-  pip install langdetect
+  pip install pyarrow      # export Parquet
+  pip install numpy        # scoring par lots vectorisé (score_batch)
 """
 
 import re
+import sys
+import bisect
+import calendar
 import csv
+import heapq
+import json
+import os
+import queue
+import itertools
 import threading
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from tkinter.scrolledtext import ScrolledText
-import webbrowser
-import requests
-from datetime import datetime, timezone
-from email.utils import parsedate_to_datetime
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urlencode
 from hashlib import sha1
 
-try:
-    import feedparser  # pip install feedparser
-except Exception:
-    feedparser = None
+# Modules lourds importés au premier usage (démarrage à froid: un job de scoring ou un
+# cron n'importe ni Tk, ni requests, ni feedparser; voir IMPORT_BUDGET_MS, bench --import-budget,
+# tests/test_import_budget.py).
+# requests: import local dans FetchEngine / LinkResolver / benchs.
+tk = ttk = messagebox = filedialog = ScrolledText = None  # _import_tk()
+np = None                                                # _import_numpy() (pip install numpy, scoring par lots)
+_LAZY = {}                                               # nom -> module (ou None s'il manque)
+
+
+def _import_tk():
+    """tkinter et ses sous-modules, importés par la GUI (et le bench de rendu) seulement."""
+    global tk, ttk, messagebox, filedialog, ScrolledText
+    if tk is None:
+        import tkinter
+        from tkinter import ttk as _ttk, messagebox as _mb, filedialog as _fd
+        from tkinter.scrolledtext import ScrolledText as _st
+        tk, ttk, messagebox, filedialog, ScrolledText = tkinter, _ttk, _mb, _fd, _st
+    return tk
+
+
+def _import_optional(name: str):
+    """Module optionnel importé une fois, au premier besoin; None s'il manque."""
+    if name not in _LAZY:
+        import importlib
+        try:
+            _LAZY[name] = importlib.import_module(name)
+        except Exception:
+            _LAZY[name] = None
+    return _LAZY[name]
+
+
+def _import_numpy():
+    global np
+    if np is None:
+        np = _import_optional("numpy")
+    return np
+
+
+def _import_feedparser():
+    """feedparser (pip install feedparser): repli du parseur dédié et benchs de parité."""
+    return _import_optional("feedparser")
 
-# Optionnel
-try:
-    from langdetect import detect as _ld_detect  # pip install langdetect
-except Exception:
-    _ld_detect = None
+
+def _has_module(name: str) -> bool:
+    """Disponibilité sans import (importlib.util.find_spec)."""
+    if name in _LAZY:
+        return _LAZY[name] is not None
+    import importlib.util
+    return importlib.util.find_spec(name) is not None
+
+
+def _ld_detect(text: str):
+    """langdetect.detect (pip install langdetect, bench_lang / detect_lang_simple); ImportError s'il manque."""
+    ld = _import_optional("langdetect")
+    if ld is None:
+        raise ImportError("langdetect")
+    return ld.detect(text)
 
 
 # -----------------------------
@@ -63,6 +136,12 @@ EDITION_EN = {"hl": "en", "gl": "US", "ceid": "US:en"}
 
 LANG_CHOICES = ["FR", "EN", "FR+EN"]
 
+ALL_SOURCES = "(toutes)"
+
+# Auto-refresh (polling incrémental), en secondes
+POLL_INTERVAL_S = 60
+POLL_MIN_S = 15
+
 
 # -----------------------------
 # LEXIQUES SENTIMENT (pondérés) + expressions
@@ -282,49 +361,122 @@ def build_rss_url(q: str, hl: str, gl: str, ceid: str) -> str:
     return f"{BASE_URL}?{urlencode(params)}"
 
 
-def parse_entry_datetime(entry) -> datetime:
+# Dates: epoch UTC (int) dans les items ("ts"), None si absente; chaînes formatées
+# mémoïsées par minute (les secondes sont ajoutées à la volée).
+DATE_CACHE_SIZE = 1 << 14
+TS_MISSING = -(1 << 62)        # clé de tri des dates absentes: toujours en dernier
+TS_MISSING_TEXT = "date inconnue".ljust(16)
+
+_RFC822_CACHE = {}
+_MINUTE_CACHE = {}
+
+
+def rfc822_epoch(s: str):
+    """Chaîne RFC 822 (pubDate) -> epoch UTC (int) ou None; mémoïsé (dates partagées FR/EN)."""
+    try:
+        return _RFC822_CACHE[s]
+    except KeyError:
+        pass
+    from email.utils import mktime_tz, parsedate_tz  # ~10 ms d'import: seulement au 1er parsing de date
+    t = parsedate_tz(s)
+    try:
+        ts = None if t is None else int(mktime_tz(t))
+    except (OverflowError, ValueError):
+        ts = None
+    if len(_RFC822_CACHE) >= DATE_CACHE_SIZE:
+        _RFC822_CACHE.clear()
+    _RFC822_CACHE[s] = ts
+    return ts
+
+
+def entry_timestamp(entry):
+    """
+    Date d'une entrée -> epoch UTC (int), ou None si absente / illisible
+    (plus de repli sur now(), qui faussait l'ordre par récence).
+    """
+    if type(entry) is FeedEntry:  # parseur Google News: calculé (et mémoïsé) au parse
+        if entry.ts is None:
+            METRICS.inc("date_missing")
+        return entry.ts
     for attr in ("published_parsed", "updated_parsed"):
         st = getattr(entry, attr, None)
         if st:
             try:
-                return datetime(*st[:6], tzinfo=timezone.utc)
-            except Exception:
+                return calendar.timegm(st)
+            except (TypeError, ValueError, OverflowError):
                 pass
 
+    # replis comptés (METRICS): chaîne RFC 822 à re-parser, ou date absente
     for attr in ("published", "updated"):
         s = getattr(entry, attr, None)
         if s:
-            try:
-                dt = parsedate_to_datetime(s)
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                return dt
-            except Exception:
-                pass
+            ts = rfc822_epoch(s)
+            if ts is not None:
+                METRICS.inc("date_fallback_string")
+                return ts
 
-    return datetime.now(timezone.utc)
+    METRICS.inc("date_missing")
+    return None
+
+
+def _minute_strings(m: int) -> tuple:
+    """Minute epoch -> (préfixe UTC, préfixe local, %z local, 'YYYY-MM-DD HH:MM' local)."""
+    t = _MINUTE_CACHE.get(m)
+    if t is None:
+        utc = datetime.fromtimestamp(m * 60, timezone.utc)
+        short, tz = utc.astimezone().strftime("%Y-%m-%d %H:%M|%z").split("|")
+        if len(_MINUTE_CACHE) >= DATE_CACHE_SIZE:
+            _MINUTE_CACHE.clear()
+        t = _MINUTE_CACHE[m] = (utc.strftime("%Y-%m-%d %H:%M:"), short + ":", tz, short)
+    return t
+
+
+def format_ts_pair(ts) -> tuple:
+    """epoch -> ('YYYY-MM-DD HH:MM:SS+0000', même instant en heure locale); ('', '') si None."""
+    if ts is None:
+        return "", ""
+    m, sec = divmod(ts, 60)
+    up, lp, lz, _ = _minute_strings(m)
+    return f"{up}{sec:02d}+0000", f"{lp}{sec:02d}{lz}"
+
+
+def format_ts_short(ts) -> str:
+    """epoch -> 'YYYY-MM-DD HH:MM' local (affichage terminal)."""
+    if ts is None:
+        return TS_MISSING_TEXT
+    return _minute_strings(ts // 60)[3]
+
+
+def ts_sort_key(it) -> int:
+    ts = it.ts
+    return TS_MISSING if ts is None else ts
+
+
+TOKEN_RE = re.compile(r"[a-zàâçéèêëîïôùûüÿñæœ']+")
+_ZEROS = itertools.repeat(0)
 
 
 def tokenize(text: str):
     text = (text or "").lower()
-    return re.findall(r"[a-zàâçéèêëîïôùûüÿñæœ']+", text)
+    return TOKEN_RE.findall(text)
+
+
+LANG_MARKERS_EN = [" the ", " shares", " earnings", " guidance", " outlook", " revenue", " quarter", " stock", " sec "]
+LANG_MARKERS_FR = [" le ", " la ", " les ", " hausse", " baisse", " résultats", " resultats", " prévisions", " previsions", " action"]
 
 
 def detect_lang_simple(text: str) -> str:
     t = (text or "").lower()
 
-    en_markers = [" the ", " shares", " earnings", " guidance", " outlook", " revenue", " quarter", " stock", " sec "]
-    fr_markers = [" le ", " la ", " les ", " hausse", " baisse", " résultats", " resultats", " prévisions", " previsions", " action"]
-
-    en_hits = sum(1 for m in en_markers if m in t)
-    fr_hits = sum(1 for m in fr_markers if m in t)
+    en_hits = sum(1 for m in LANG_MARKERS_EN if m in t)
+    fr_hits = sum(1 for m in LANG_MARKERS_FR if m in t)
 
     if en_hits > fr_hits:
         return "en"
     if fr_hits > en_hits:
         return "fr"
 
-    if _ld_detect is not None:
+    if _has_module("langdetect"):
         try:
             ld = _ld_detect(text)
             if ld.startswith("en"):
@@ -337,48 +489,491 @@ def detect_lang_simple(text: str) -> str:
     return "fr"
 
 
-def _apply_phrases(text_lc: str, phrases_w: dict) -> int:
-    sc = 0
-    for phr, w in phrases_w.items():
-        if phr in text_lc:
-            sc += w
-    return sc
+# Mots-outils exclusifs à une langue (complètent lexiques + marqueurs pour la détection)
+LANG_WORDS_EN = ["the", "of", "and", "to", "in", "for", "with", "as", "by", "at", "its", "is", "are", "from",
+                 "after", "amid", "over", "into", "than", "says", "said", "will", "has", "have", "was", "were",
+                 "new", "why", "how", "what", "this", "that", "'s"]
+LANG_WORDS_FR = ["le", "la", "les", "des", "du", "de", "un", "une", "et", "pour", "sur", "avec", "dans", "par",
+                 "au", "aux", "est", "sont", "son", "sa", "ses", "ce", "cette", "qui", "que", "pas", "après",
+                 "selon", "chez", "vers", "contre", "entre", "leur", "leurs", "sous", "mais", "nouveau",
+                 "nouvelle", "l'", "d'", "qu'"]
+
+LANG_WORD_W = 300    # mot connu exclusif à une langue (poids entiers: sommes exactes, lot == item)
+LANG_GUESS_MAX = 60  # mot inconnu: estimation trigrammes bornée (< un mot connu)
+LANG_MARGIN = 100    # |évidence| < marge -> a priori de la source si elle en a un
+LANG_PRIOR_MIN = 3   # décisions sûres requises avant d'utiliser l'a priori d'une source
+LANG_PRIOR_SHARE = 0.8
+LANG_MEMO_SIZE = 65536
+LANG_GUESS_CACHE = 200_000
+
+
+class LangDetector:
+    """
+    Détection FR/EN en un passage, sans langdetect (déterministe):
+    - évidence = somme des poids entiers des tokens (EN > 0, FR < 0); mots des lexiques,
+      marqueurs et mots-outils exclusifs -> ±LANG_WORD_W, mots inconnus -> log-ratio
+      moyen de trigrammes de caractères appris sur ces mêmes listes, borné
+    - mémo LRU de l'évidence, clé = texte minusculé aux espaces normalisés
+    - a priori par source (e.source.title): les décisions sûres sont comptées par
+      source; un titre ambigu (|évidence| < LANG_MARGIN) prend la langue dominante
+    lexicons: {"fr": (pos, neg, fin, phrases), "en": ...} (lexiques fusionnés avec les
+    packs, voir merge_lexicon); défaut: lexiques intégrés.
+    """
+
+    def __init__(self, memo_size: int = LANG_MEMO_SIZE, priors: dict = None, lexicons: dict = None):
+        import math
+        lexicons = lexicons or {"fr": (POS_WORDS_FR_W, NEG_WORDS_FR_W, FIN_WORDS_FR_W, PHRASES_FR_W),
+                                "en": (POS_WORDS_EN_W, NEG_WORDS_EN_W, FIN_WORDS_EN_W, PHRASES_EN_W)}
+        en, fr = set(), set()
+        for words, lang in ((en, "en"), (fr, "fr")):
+            for d in lexicons[lang]:
+                for k in d:
+                    words.update(TOKEN_RE.findall(k.lower()))
+        en.update(m.strip() for m in LANG_MARKERS_EN)
+        fr.update(m.strip() for m in LANG_MARKERS_FR)
+        en.update(LANG_WORDS_EN)
+        fr.update(LANG_WORDS_FR)
+        # "q1"/"t1" -> token "q"/"t" (TOKEN_RE sans chiffres): lettres isolées exclues
+        en, fr = {w for w in en - fr if len(w) > 1}, {w for w in fr - en if len(w) > 1}
+        self._known = {_SEP: 0}
+        self._known.update((w, LANG_WORD_W) for w in en)
+        self._known.update((w, -LANG_WORD_W) for w in fr)
+
+        counts = {}
+        for words, col in ((en, 0), (fr, 1)):
+            for w in words:
+                for g in self._trigrams(w):
+                    counts.setdefault(g, [0, 0])[col] += 1
+        n_en = sum(c[0] for c in counts.values())
+        n_fr = sum(c[1] for c in counts.values())
+        self._tri = {g: math.log((e + 1) / (n_en + len(counts))) - math.log((f + 1) / (n_fr + len(counts)))
+                     for g, (e, f) in counts.items()}
+        self._guess = {}
+
+        self.memo_size = memo_size
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self._priors = {src: list(c) for src, c in (priors or {}).items()}  # source -> [fr, en]
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    @staticmethod
+    def _trigrams(w: str):
+        w = f"^{w}$"
+        return [w[i:i + 3] for i in range(len(w) - 2)]
+
+    def token_weight(self, tok: str) -> int:
+        w = self._known.get(tok)
+        if w is None:
+            w = self._guess.get(tok)
+            if w is None:
+                tri = self._tri
+                gs = [tri[g] for g in self._trigrams(tok) if g in tri]
+                w = max(-LANG_GUESS_MAX, min(LANG_GUESS_MAX, round(50 * sum(gs) / len(gs)))) if gs else 0
+                if len(self._guess) >= LANG_GUESS_CACHE:
+                    self._guess.clear()
+                self._guess[tok] = w
+        return w
+
+    def evidence(self, text: str) -> int:
+        key = " ".join((text or "").lower().split())
+        with self._lock:
+            ev = self._memo.get(key)
+            if ev is not None:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return ev
+        ev = sum(map(self.token_weight, TOKEN_RE.findall(key)))
+        with self._lock:
+            self.memo_misses += 1
+            self._memo[key] = ev
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return ev
+
+    def prior(self, source: str):
+        c = self._priors.get(source)
+        if c is None or c[0] + c[1] < LANG_PRIOR_MIN:
+            return None
+        if c[1] >= LANG_PRIOR_SHARE * (c[0] + c[1]):
+            return "en"
+        if c[0] >= LANG_PRIOR_SHARE * (c[0] + c[1]):
+            return "fr"
+        return None
+
+    def _decide(self, ev: int, source: str, learn: bool) -> str:
+        if abs(ev) >= LANG_MARGIN:
+            lang = "en" if ev > 0 else "fr"
+            if learn and source:
+                self._priors.setdefault(source, [0, 0])[lang == "en"] += 1
+            return lang
+        if source:
+            lang = self.prior(source)
+            if lang is not None:
+                return lang
+        return "en" if ev > 0 else "fr"
+
+    def decide_many(self, evidences, sources, learn: bool = True) -> list:
+        """Décisions dans l'ordre (l'a priori évolue d'un item au suivant comme avec detect())."""
+        with self._lock:
+            return [self._decide(ev, src, learn) for ev, src in zip(evidences, sources)]
+
+    def detect(self, title: str, source: str = "", learn: bool = True) -> str:
+        ev = self.evidence(f"{title} {source}")
+        with self._lock:
+            return self._decide(ev, source, learn)
+
+    def priors(self) -> dict:
+        with self._lock:
+            return {src: list(c) for src, c in self._priors.items()}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"memo": len(self._memo), "memo_hits": self.memo_hits, "memo_misses": self.memo_misses,
+                    "sources": len(self._priors),
+                    "sources_with_prior": sum(1 for src in self._priors if self.prior(src) is not None)}
+
+
+_LANG_DETECTOR = None
+
+
+def get_lang_detector() -> LangDetector:
+    global _LANG_DETECTOR
+    if _LANG_DETECTOR is None:
+        _LANG_DETECTOR = LangDetector()
+    return _LANG_DETECTOR
+
+
+def detect_lang(title: str, source: str = "", learn: bool = True) -> str:
+    """Langue d'un titre (LangDetector partagé: mémo + a priori par source)."""
+    return get_lang_detector().detect(title, source, learn)
+
+
+def _trie_pattern(words) -> str:
+    # Alternance factorisée par préfixes communs: le moteur `re` n'essaie plus
+    # chaque expression à chaque position, seulement les branches du 1er caractère.
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node) -> str:
+        alts = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        if len(alts) == 1 and "" not in node:
+            return alts[0]
+        body = "(?:" + "|".join(alts) + ")"
+        return body + "?" if "" in node else body
+
+    return emit(trie)
+
+
+class _PhraseMatcher:
+    """
+    Toutes les occurrences (position, expression) d'un ensemble d'expressions, en un passage regex.
+    La regex est compilée au premier findall (et pas au chargement depuis le cache des lexiques:
+    re.compile d'un gros trie coûte plus cher que tout le reste du matcher).
+    """
+
+    def __init__(self, phrases):
+        phrases = [p for p in dict.fromkeys(phrases) if p]
+        # regroupées par préfixe de longueur k (= plus courte expression): vérification sélective
+        self._k = min(map(len, phrases), default=1)
+        self._by_head = {}
+        for p in phrases:
+            self._by_head.setdefault(p[:self._k], []).append(p)
+        self._pattern = _trie_pattern(phrases) if phrases else ""
+        self._re = None
+        # décalages d>0 où une expression q peut commencer à l'intérieur d'une occurrence de p:
+        # la fin p[d:] est préfixe d'une expression, ou une expression est préfixe de p[d:]
+        # (ensembles de préfixes: O(somme des longueurs²) au lieu de O(nb d'expressions²))
+        prefixes = {q[:i] for q in phrases for i in range(1, len(q) + 1)}
+        whole = set(phrases)
+        lens = sorted({len(q) for q in phrases})
+        self._inner = {}
+        for p in phrases:
+            offs = [0]
+            for d in range(1, len(p)):
+                tail = p[d:]
+                if tail in prefixes or any(tail[:n] in whole for n in lens if n < len(tail)):
+                    offs.append(d)
+            self._inner[p] = offs
+
+    def __getstate__(self):
+        return dict(self.__dict__, _re=None)
+
+    def to_state(self) -> dict:
+        """Données simples (JSON) pour le cache des lexiques: source de la regex + décalages internes."""
+        return {"pattern": self._pattern, "inner": self._inner}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "_PhraseMatcher":
+        self = cls.__new__(cls)
+        self._pattern = str(state["pattern"])
+        self._inner = {str(p): [int(d) for d in offs] for p, offs in state["inner"].items()}
+        self._k = min(map(len, self._inner), default=1)
+        self._by_head = {}
+        for p in self._inner:
+            self._by_head.setdefault(p[:self._k], []).append(p)
+        self._re = None
+        return self
+
+    def findall(self, text: str) -> tuple:
+        """-> ([positions], [expressions]), toutes occurrences, chevauchantes comprises."""
+        # Recherche regex non chevauchante (rapide), puis seuls les débuts compatibles *à l'intérieur*
+        # de chaque match sont vérifiés: aucune occurrence chevauchante n'est perdue.
+        positions, found = [], []
+        if not self._pattern:
+            return positions, found
+        if self._re is None:
+            self._re = re.compile(self._pattern)
+        by_head = self._by_head
+        inner = self._inner
+        k = self._k
+        search = self._re.search
+        pos = 0
+        while True:
+            m = search(text, pos)
+            if m is None:
+                return positions, found
+            i, pos = m.start(), m.end()
+            for d in inner[m.group()]:
+                j = i + d
+                bucket = by_head.get(text[j:j + k])
+                if bucket is not None:
+                    for p in bucket:
+                        if text.startswith(p, j):
+                            positions.append(j)
+                            found.append(p)
+
+
+class CompiledLexicon:
+    """
+    Lexique compilé une fois pour toutes:
+    - mots POS/NEG/FIN fusionnés en un seul dict mot -> poids net
+    - expressions: une regex d'alternance en trie qui repère en un passage les
+      positions où une expression peut commencer, puis vérification exacte par
+      startswith (chaque expression compte une seule fois, comme `in`).
+    """
+
+    def __init__(self, pos_w: dict, neg_w: dict, fin_w: dict, phrases_w: dict):
+        word_w = {}
+        for w, v in pos_w.items():
+            word_w[w] = word_w.get(w, 0) + v
+        for w, v in neg_w.items():
+            word_w[w] = word_w.get(w, 0) - v
+        for w, v in fin_w.items():
+            word_w[w] = word_w.get(w, 0) + v
+        self.word_w = {w: v for w, v in word_w.items() if v}
+
+        # "" in text est toujours vrai -> poids constant
+        self._const = sum(w for phr, w in phrases_w.items() if not phr)
+        self.phrases_w = {phr: w for phr, w in phrases_w.items() if phr}
+        self._phrases = _PhraseMatcher(self.phrases_w)
+
+    def phrase_score(self, text_lc: str) -> int:
+        found = self._phrases.findall(text_lc)[1]
+        if not found:
+            return self._const
+        w = self.phrases_w
+        return self._const + sum(w[phr] for phr in set(found))
+
+    def score_lc(self, text_lc: str) -> int:
+        return self.phrase_score(text_lc) + sum(map(self.word_w.get, TOKEN_RE.findall(text_lc), _ZEROS))
+
+    def score(self, title: str, source: str = "") -> int:
+        return self.score_lc(f"{title} {source}".strip().lower())
+
+    def to_state(self) -> dict:
+        return {"word_w": self.word_w, "const": self._const, "phrases_w": self.phrases_w,
+                "matcher": self._phrases.to_state()}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "CompiledLexicon":
+        self = cls.__new__(cls)
+        self.word_w = {str(w): int(v) for w, v in state["word_w"].items()}
+        self._const = int(state["const"])
+        self.phrases_w = {str(p): int(v) for p, v in state["phrases_w"].items()}
+        self._phrases = _PhraseMatcher.from_state(state["matcher"])
+        return self
+
+
+_LEXICONS = {}
+
+
+def get_lexicon(lang: str) -> CompiledLexicon:
+    lex = _LEXICONS.get(lang)
+    if lex is None:
+        if lang == "en":
+            lex = CompiledLexicon(POS_WORDS_EN_W, NEG_WORDS_EN_W, FIN_WORDS_EN_W, PHRASES_EN_W)
+        else:
+            lex = CompiledLexicon(POS_WORDS_FR_W, NEG_WORDS_FR_W, FIN_WORDS_FR_W, PHRASES_FR_W)
+        _LEXICONS[lang] = lex
+    return lex
 
 
 def score_text_fr(title: str, source: str = "") -> int:
-    text = f"{title} {source}".strip()
-    text_lc = text.lower()
-    tokens = tokenize(text)
-
-    score = 0
-    score += _apply_phrases(text_lc, PHRASES_FR_W)
-
-    for t in tokens:
-        score += POS_WORDS_FR_W.get(t, 0)
-        score -= NEG_WORDS_FR_W.get(t, 0)  # NEG weights are positive -> subtract
-        score += FIN_WORDS_FR_W.get(t, 0)
-
-    return score
+    return get_lexicon("fr").score(title, source)
 
 
 def score_text_en(title: str, source: str = "") -> int:
-    text = f"{title} {source}".strip()
-    text_lc = text.lower()
-    tokens = tokenize(text)
-
-    score = 0
-    score += _apply_phrases(text_lc, PHRASES_EN_W)
-
-    for t in tokens:
-        score += POS_WORDS_EN_W.get(t, 0)
-        score -= NEG_WORDS_EN_W.get(t, 0)
-        score += FIN_WORDS_EN_W.get(t, 0)
-
-    return score
+    return get_lexicon("en").score(title, source)
+
+
+_SEP = "\x00"  # séparateur de documents: hors classe de tokens, absent des expressions/marqueurs
+_BATCH_TOKEN_RE = re.compile(TOKEN_RE.pattern + "|" + _SEP)
+
+
+class BatchScorer:
+    """
+    Scoring vectorisé d'un lot de titres (NumPy):
+    - tous les textes sont joints (séparateur \\x00) et minusculés en une fois
+    - un seul findall pour tout le lot; tokens -> ids entiers via un vocabulaire
+      commun FR/EN (map(dict.get) côté C), doc de chaque token = cumsum des séparateurs
+    - poids: matrice [langue, id] -> np.bincount(doc, weights) par document
+    - langue: poids LangDetector des mêmes tokens, sommés par document
+    - expressions: un passage regex (trie) sur le lot, comptées une fois
+      par (document, expression) comme avec `in`
+    Résultats identiques à score_text_auto.
+    """
+
+    LANGS = ("fr", "en")
+
+    def __init__(self, lexicons: dict):
+        self.vocab = {_SEP: 1}  # 0 = hors lexique
+        for lang in self.LANGS:
+            for w in lexicons[lang].word_w:
+                self.vocab.setdefault(w, len(self.vocab) + 1)
+        self.W = np.zeros((len(self.LANGS), len(self.vocab) + 1), dtype=np.int64)
+        for li, lang in enumerate(self.LANGS):
+            for w, v in lexicons[lang].word_w.items():
+                self.W[li, self.vocab[w]] = v
+
+        self.phrase_w = [lexicons[lang].phrases_w for lang in self.LANGS]
+        self.const = np.array([lexicons[lang]._const for lang in self.LANGS], dtype=np.int64)
+        phrases = list(dict.fromkeys(p for d in self.phrase_w for p in d))
+        self.phrase_ids = {p: i for i, p in enumerate(phrases)}
+        self.PW = np.array([[d.get(p, 0) for p in phrases] for d in self.phrase_w], dtype=np.int64).reshape(
+            len(self.LANGS), len(phrases))
+        self.phrases = _PhraseMatcher(phrases)
+        # expressions sensibles aux espaces de bord -> matcher sur le texte strip() comme score_text_*
+        self._strip_phrases = any(p != p.strip() for p in phrases)
+
+    @staticmethod
+    def _join(texts) -> tuple:
+        joined = _SEP.join(texts)
+        if joined.count(_SEP) != len(texts) - 1:
+            joined = _SEP.join(t.replace(_SEP, "\x01") for t in texts)
+        joined = joined.lower()
+        seps = np.fromiter((m.start() for m in re.finditer(_SEP, joined)), dtype=np.int64)
+        return joined, seps
+
+    @staticmethod
+    def _pairs(matcher: _PhraseMatcher, ids: dict, text: str, seps) -> tuple:
+        """-> (docs, ids) des couples (document, marqueur/expression) distincts."""
+        positions, found = matcher.findall(text)
+        if not positions:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        docs = np.searchsorted(seps, np.array(positions, dtype=np.int64), side="right")
+        mids = np.fromiter(map(ids.__getitem__, found), dtype=np.int64, count=len(found))
+        keys = np.unique(docs * len(ids) + mids)
+        return keys // len(ids), keys % len(ids)
+
+    def score(self, titles, sources=None, learn: bool = True):
+        """-> (scores int64[n], labels '<U3'[n], langs '<U2'[n])"""
+        n = len(titles)
+        if sources is None:
+            sources = [""] * n
+        if n == 0:
+            return np.zeros(0, dtype=np.int64), np.array([], dtype="<U3"), np.array([], dtype="<U2")
+        text, seps = self._join([f"{t} {src}" for t, src in zip(titles, sources)])
+
+        # mots: un findall pour tout le lot
+        toks = _BATCH_TOKEN_RE.findall(text)
+        ids = np.fromiter(map(self.vocab.get, toks, itertools.repeat(0)), dtype=np.int64, count=len(toks))
+        doc = np.cumsum(ids == 1)
+
+        # langue (LangDetector): évidence par document = somme des poids de ses tokens
+        det = get_lang_detector()
+        lw = np.fromiter(map(det.token_weight, toks), dtype=np.int64, count=len(toks))
+        ev = np.bincount(doc, weights=lw, minlength=n)[:n].astype(np.int64)
+        is_en = np.array([lg == "en" for lg in det.decide_many(ev.tolist(), sources, learn)], dtype=bool)
+        lang_idx = is_en.astype(np.int64)  # 0 = fr, 1 = en
+
+        scores = np.bincount(doc, weights=self.W[lang_idx[doc], ids], minlength=n)[:n]
+
+        # expressions: une fois par (document, expression), poids de la langue du document
+        if self._strip_phrases:
+            ptext, pseps = self._join([f"{t} {src}".strip() for t, src in zip(titles, sources)])
+        else:
+            ptext, pseps = text, seps
+        docs, pids = self._pairs(self.phrases, self.phrase_ids, ptext, pseps)
+        scores += np.bincount(docs, weights=self.PW[lang_idx[docs], pids], minlength=n)
+        scores = scores.astype(np.int64) + self.const[lang_idx]
+
+        labels = np.where(scores > 0, "POS", np.where(scores < 0, "NEG", "NEU"))
+        langs = np.where(is_en, "en", "fr")
+        return scores, labels, langs
+
+    def to_state(self) -> dict:
+        return {"vocab": self.vocab, "W": self.W.tolist(), "phrase_w": self.phrase_w, "const": self.const.tolist(),
+                "phrases": list(self.phrase_ids), "PW": self.PW.tolist(), "matcher": self.phrases.to_state()}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "BatchScorer":
+        self = cls.__new__(cls)
+        self.vocab = {str(w): int(i) for w, i in state["vocab"].items()}
+        self.W = np.array(state["W"], dtype=np.int64).reshape(len(cls.LANGS), len(self.vocab) + 1)
+        self.phrase_w = [{str(p): int(v) for p, v in d.items()} for d in state["phrase_w"]]
+        self.const = np.array(state["const"], dtype=np.int64)
+        phrases = [str(p) for p in state["phrases"]]
+        self.phrase_ids = {p: i for i, p in enumerate(phrases)}
+        self.PW = np.array(state["PW"], dtype=np.int64).reshape(len(cls.LANGS), len(phrases))
+        self.phrases = _PhraseMatcher.from_state(state["matcher"])
+        self._strip_phrases = any(p != p.strip() for p in phrases)
+        return self
+
+
+_BATCH_SCORER = None
+# sous ce nombre de titres, score_text_auto item par item bat BatchScorer (coût fixe du join,
+# des tableaux et des bincount): croisement ~50-75 titres (benchmarks/bench.py: bench_batch_crossover)
+BATCH_MIN = 64
+
+
+def score_batch(titles, sources=None, learn: bool = True):
+    """
+    Score d'un lot: (scores, labels, langs). Tableaux NumPy si NumPy est installé,
+    sinon listes (repli sur score_text_auto item par item).
+    learn=False: l'a priori de langue par source est utilisé sans être mis à jour.
+    """
+    global _BATCH_SCORER
+    if _import_numpy() is None:
+        scores, langs = [], []
+        for t, src in zip(titles, sources if sources is not None else itertools.repeat("")):
+            sc, lg = score_text_auto(t, src, learn)
+            scores.append(sc)
+            langs.append(lg)
+        return scores, [label_from_score(sc) for sc in scores], langs
+    scorer = _BATCH_SCORER
+    if scorer is None:
+        lexicons = {lang: get_lexicon(lang) for lang in BatchScorer.LANGS}
+        digests = [getattr(lex, "digest", None) for lex in lexicons.values()]
+        if all(digests):
+            # lexiques de packs: BatchScorer (vocabulaire, matrices, matcher commun) aussi en cache
+            scorer = _compiled_cached("batch", _lexicon_digest(*digests), lambda: BatchScorer(lexicons),
+                                      BatchScorer.from_state, _LEXICON_STATE["cache_dir"])
+        else:
+            scorer = BatchScorer(lexicons)
+        _BATCH_SCORER = scorer
+    return scorer.score(titles, sources, learn)
 
 
-def score_text_auto(title: str, source: str = "") -> tuple[int, str]:
-    lang = detect_lang_simple(f"{title} {source}")
+def score_text_auto(title: str, source: str = "", learn: bool = True) -> tuple[int, str]:
+    lang = detect_lang(title, source, learn)
     if lang == "en":
         return score_text_en(title, source), "en"
     return score_text_fr(title, source), "fr"
@@ -397,11 +992,3120 @@ def dedup_key(title: str, link: str) -> str:
     return sha1(base.encode("utf-8", errors="ignore")).hexdigest()
 
 
+# -----------------------------
+# Packs de lexiques externes (fichiers JSON, cache compilé, rechargement à chaud)
+# -----------------------------
+LEXICON_FORMAT = 2             # à incrémenter si CompiledLexicon / BatchScorer changent (invalide le cache)
+LEXICON_POLL_MS = 2000         # GUI: surveillance du dossier de packs
+LEXICON_CACHE_KEEP = 16        # lexiques compilés gardés sur disque (les plus récents)
+LEXICON_KINDS = ("pos", "neg", "fin", "phrases")
+LEXICON_GENERAL = "general"
+
+_LEXICON_STATE = {"path": None, "sectors": None, "packs": [], "cache_dir": None, "version": 0}
+
+
+def default_lexicon_dir() -> str:
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "rssreader4", "lexicons")
+
+
+def _builtin_lexicon(lang: str) -> tuple:
+    if lang == "en":
+        return POS_WORDS_EN_W, NEG_WORDS_EN_W, FIN_WORDS_EN_W, PHRASES_EN_W
+    return POS_WORDS_FR_W, NEG_WORDS_FR_W, FIN_WORDS_FR_W, PHRASES_FR_W
+
+
+def lexicon_signature(path: str) -> tuple:
+    """(nom, mtime_ns, taille) des *.json du dossier: change dès qu'un pack est ajouté / modifié / supprimé."""
+    try:
+        names = sorted(fn for fn in os.listdir(path) if fn.endswith(".json"))
+    except OSError:
+        return ()
+    sig = []
+    for fn in names:
+        try:
+            st = os.stat(os.path.join(path, fn))
+        except OSError:
+            continue
+        sig.append((fn, st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+def read_lexicon_packs(path: str, sectors=None) -> list:
+    """
+    Packs *.json du dossier `path`, triés par nom (un pack plus loin l'emporte):
+        {"lang": "fr" | "en", "sector": "semis", "pos": {mot: poids}, "neg": {...},
+         "fin": {...}, "phrases": {expression: poids}}
+    Mots et expressions en minuscules; un poids remplace celui du lexique intégré
+    (0 = retiré). sectors: None = tous les packs, sinon ceux de ces secteurs + "general".
+    ValueError (avec le nom du fichier) si un pack est invalide.
+    """
+    packs = []
+    for fn, _mtime, _size in lexicon_signature(path):
+        file = os.path.join(path, fn)
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"{fn}: {e}") from None
+        if not isinstance(raw, dict) or raw.get("lang") not in ("fr", "en"):
+            raise ValueError(f"{fn}: \"lang\" doit valoir \"fr\" ou \"en\"")
+        sector = str(raw.get("sector") or LEXICON_GENERAL)
+        if sectors is not None and sector != LEXICON_GENERAL and sector not in sectors:
+            continue
+        pack = {"file": fn, "lang": raw["lang"], "sector": sector}
+        for kind in LEXICON_KINDS:
+            entries = raw.get(kind) or {}
+            if not isinstance(entries, dict) or not all(isinstance(w, int) and not isinstance(w, bool)
+                                                        for w in entries.values()):
+                raise ValueError(f"{fn}: \"{kind}\" doit être un objet {{texte: poids entier}}")
+            pack[kind] = {k.lower(): w for k, w in entries.items()}
+        packs.append(pack)
+    return packs
+
+
+def merge_lexicon(lang: str, packs) -> tuple:
+    """Lexique intégré de `lang` + packs de cette langue -> (pos, neg, fin, phrases)."""
+    merged = [dict(d) for d in _builtin_lexicon(lang)]
+    for pack in packs:
+        if pack["lang"] != lang:
+            continue
+        for d, kind in zip(merged, LEXICON_KINDS):
+            for k, w in pack[kind].items():
+                if w:
+                    d[k] = w
+                else:
+                    d.pop(k, None)
+    return tuple(merged)
+
+
+def _lexicon_digest(*parts) -> str:
+    return sha1(json.dumps([LEXICON_FORMAT, *parts], sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _compiled_cached(kind: str, digest: str, build, load, cache_dir: str = None):
+    """
+    Objet compilé (CompiledLexicon / BatchScorer) reconstruit par load(état) depuis le cache
+    disque <cache>/lexicons/<kind>-<digest>.json, sinon construit par build() puis écrit.
+    Le cache ne contient que des données (JSON: poids, source de la regex, décalages), jamais
+    d'objets: un fichier modifié ne peut pas exécuter de code. Ligne 1 = en-tête (format,
+    empreinte des lexiques, sha1 du corps), ligne 2 = état; en-tête ou sha1 faux -> recompilé.
+    Cache inutilisable -> simple compilation.
+    """
+    d = cache_dir or os.path.join(default_cache_dir(), "lexicons")
+    file = os.path.join(d, f"{kind}-{digest}.json")
+    try:
+        with open(file, "rb") as f:
+            head, _, body = f.read().partition(b"\n")
+        meta = json.loads(head)
+        if meta != {"format": LEXICON_FORMAT, "kind": kind, "digest": digest, "sha1": sha1(body).hexdigest()}:
+            raise ValueError("en-tête de cache invalide")
+        obj = load(json.loads(body))
+        os.utime(file)
+        METRICS.inc("lexicon_cache_hit")
+        return obj
+    except FileNotFoundError:
+        pass
+    except Exception:
+        METRICS.inc("lexicon_cache_errors")
+    METRICS.inc("lexicon_cache_miss")
+    with METRICS.timer("lexicon_compile"):
+        obj = build()
+    try:
+        body = json.dumps(obj.to_state(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        head = json.dumps({"format": LEXICON_FORMAT, "kind": kind, "digest": digest,
+                           "sha1": sha1(body).hexdigest()}).encode("utf-8")
+        os.makedirs(d, exist_ok=True)
+        tmp = f"{file}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(head + b"\n" + body)
+        os.replace(tmp, file)
+        for fn in os.listdir(d):
+            if fn.endswith(".pkl"):  # ancien format (pickle): jamais relu
+                os.remove(os.path.join(d, fn))
+        old = sorted((os.stat(os.path.join(d, fn)).st_mtime, fn) for fn in os.listdir(d) if fn.endswith(".json"))
+        for _mtime, fn in old[:-LEXICON_CACHE_KEEP]:
+            os.remove(os.path.join(d, fn))
+    except OSError:
+        pass
+    return obj
+
+
+def load_lexicons(path: str = None, sectors=None, cache_dir: str = None) -> dict:
+    """
+    {langue: CompiledLexicon} = lexiques intégrés + packs de `path` (défaut:
+    default_lexicon_dir(), ignoré s'il n'existe pas). Compilation mise en cache
+    par empreinte du contenu: un démarrage avec de gros lexiques ne recompile rien.
+    """
+    path = path or default_lexicon_dir()
+    packs = read_lexicon_packs(path, sectors) if os.path.isdir(path) else []
+    out = {"parts": {}}
+    for lang in BatchScorer.LANGS:
+        parts = out["parts"][lang] = merge_lexicon(lang, packs)
+        digest = _lexicon_digest(*parts)
+        lex = _compiled_cached(f"lex-{lang}", digest, lambda: CompiledLexicon(*parts), CompiledLexicon.from_state,
+                               cache_dir)
+        lex.digest = digest
+        out[lang] = lex
+    out["packs"] = [{"file": p["file"], "lang": p["lang"], "sector": p["sector"]} for p in packs]
+    out["cache_dir"] = cache_dir
+    return out
+
+
+def install_lexicons(lexicons: dict, path: str = None, sectors=None):
+    """
+    Remplace les lexiques utilisés par score_text_* / score_batch (les scorings en cours finissent
+    avec les anciens). Le LangDetector est reconstruit sur le vocabulaire des packs (a priori par
+    source conservés, mémo vidé: l'évidence d'un titre peut changer).
+    """
+    global _LEXICONS, _BATCH_SCORER, _LANG_DETECTOR
+    _LEXICONS = {lang: lexicons[lang] for lang in BatchScorer.LANGS}
+    _BATCH_SCORER = None
+    old = _LANG_DETECTOR
+    _LANG_DETECTOR = LangDetector(priors=None if old is None else old.priors(), lexicons=lexicons.get("parts"))
+    _LEXICON_STATE.update(path=path, sectors=None if sectors is None else sorted(sectors),
+                          packs=lexicons.get("packs", []), cache_dir=lexicons.get("cache_dir"),
+                          version=_LEXICON_STATE["version"] + 1)
+    METRICS.inc("lexicon_reloads")
+
+
+def lexicon_spec() -> tuple:
+    """(dossier, secteurs) des packs installés, ou None: à transmettre aux processus de scoring."""
+    if _LEXICON_STATE["path"] is None:
+        return None
+    return _LEXICON_STATE["path"], _LEXICON_STATE["sectors"]
+
+
+class LexiconWatcher:
+    """
+    Surveille un dossier de packs (signature nom/mtime/taille, sans dépendance):
+    changed() est bon marché (listdir + stat) et peut être appelé à chaque tour
+    de polling; reload() recompile (ou relit du cache) puis installe les lexiques.
+    Un pack invalide lève ValueError et laisse les lexiques en place.
+    """
+
+    def __init__(self, path: str = None, sectors=None, cache_dir: str = None):
+        self.path = path or default_lexicon_dir()
+        self.sectors = sectors
+        self.cache_dir = cache_dir
+        self._sig = ()  # dossier absent / vide: les lexiques intégrés sont déjà en place
+
+    def changed(self) -> bool:
+        return lexicon_signature(self.path) != self._sig
+
+    def reload(self) -> dict:
+        sig = lexicon_signature(self.path)
+        try:
+            lexicons = load_lexicons(self.path, self.sectors, self.cache_dir)
+        finally:
+            self._sig = sig  # même en erreur: pas de nouvel essai tant que le dossier ne change pas
+        install_lexicons(lexicons, self.path, self.sectors)
+        return lexicons
+
+
+# -----------------------------
+# Instrumentation (timers, compteurs, histogrammes, cProfile)
+# -----------------------------
+METRIC_BUCKETS_MS = (0.1, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Durées (ms) par buckets fixes METRIC_BUCKETS_MS (+ un bucket +Inf)."""
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(METRIC_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect.bisect_left(METRIC_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum += ms
+        if ms > self.max:
+            self.max = ms
+
+    def quantile(self, q: float) -> float:
+        """Borne haute du bucket contenant le quantile q (max observé pour +Inf)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= rank and c:
+                return min(METRIC_BUCKETS_MS[i], self.max) if i < len(METRIC_BUCKETS_MS) else self.max
+        return self.max
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "name", "t0")
+
+    def __init__(self, metrics, name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.name, time.perf_counter() - self.t0)
+
+
+class Metrics:
+    """
+    Compteurs + jauges + histogrammes de durée par étape, partagés entre threads.
+    with METRICS.timer("http"): ...   METRICS.inc("entries", n)   METRICS.set("sched_queue_depth", 3)
+    snapshot() -> dict (panneau Diagnostics, JSON); to_prometheus() -> texte d'exposition.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.stages = {}
+
+    def inc(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name: str, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            h = self.stages.get(name)
+            if h is None:
+                h = self.stages[name] = Histogram()
+            h.observe(seconds * 1000.0)
+
+    def timer(self, name: str) -> _StageTimer:
+        return _StageTimer(self, name)
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.gauges = {}
+            self.stages = {}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {
+                name: {"count": h.count, "total_ms": round(h.sum, 3), "mean_ms": round(h.sum / h.count, 3),
+                       "p50_ms": round(h.quantile(0.5), 3), "p95_ms": round(h.quantile(0.95), 3), "max_ms": round(h.max, 3)}
+                for name, h in self.stages.items() if h.count
+            }
+            return {"counters": dict(self.counters), "gauges": dict(self.gauges), "stages": stages}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix: str = "rssreader") -> str:
+        lines = []
+        with self._lock:
+            for name in sorted(self.counters):
+                metric = f"{prefix}_{name}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {self.counters[name]}"]
+            for name in sorted(self.gauges):
+                metric = f"{prefix}_{name}"
+                lines += [f"# TYPE {metric} gauge", f"{metric} {self.gauges[name]}"]
+            if self.stages:
+                metric = f"{prefix}_stage_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+            for name in sorted(self.stages):
+                h = self.stages[name]
+                acc = 0
+                for le, c in zip(METRIC_BUCKETS_MS + (None,), h.counts):
+                    acc += c
+                    le = "+Inf" if le is None else repr(le / 1000.0)
+                    lines.append(f'{metric}_bucket{{stage="{name}",le="{le}"}} {acc}')
+                lines.append(f'{metric}_sum{{stage="{name}"}} {h.sum / 1000.0:.6f}')
+                lines.append(f'{metric}_count{{stage="{name}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def profile_call(fn, *args, path: str = None, top: int = 25, **kwargs):
+    """
+    cProfile d'un cycle (thread appelant uniquement) -> (résultat, texte pstats trié par
+    temps cumulé). path: dump .prof en plus (snakeviz, pstats).
+    """
+    import cProfile
+    import io
+    import pstats
+    prof = cProfile.Profile()
+    try:
+        result = prof.runcall(fn, *args, **kwargs)
+    finally:
+        if path:
+            prof.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(top)
+    return result, out.getvalue()
+
+
+# -----------------------------
+# Fetch (session HTTP partagée + éditions en parallèle)
+# -----------------------------
+FETCH_TIMEOUT = (5, 20)  # (connect, read) en secondes, par requête
+FETCH_WORKERS = 4
+
+
+CACHE_TTL = 24 * 3600          # une entrée non revalidée depuis 24h est jetée
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "rssreader4")
+
+
+class FeedCache:
+    """
+    Cache disque des réponses RSS, clé = URL (build_rss_url).
+    Un fichier JSON par URL: {url, etag, last_modified, entries}; entrées réduites aux
+    champs utilisés (titre, lien, date, source) et relues en FeedEntry. Données seulement:
+    un fichier du cache modifié ne peut pas exécuter de code (illisible -> simple miss).
+    - validators(): en-têtes If-None-Match / If-Modified-Since à envoyer
+    - sur 304, les entrées déjà parsées sont réutilisées (pas de feedparser)
+    - `fresh_for` > 0: pas de requête du tout tant que l'entrée est assez récente
+    - TTL + éviction LRU bornée en octets (ordre LRU persistant via mtime)
+    """
+
+    def __init__(self, path: str = None, ttl: float = CACHE_TTL, fresh_for: float = 0.0,
+                 max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path or os.path.join(default_cache_dir(), "http")
+        self.ttl = ttl
+        self.fresh_for = fresh_for
+        self.max_bytes = max_bytes
+        self.hits = 0          # servi depuis le cache (frais ou 304)
+        self.not_modified = 0  # dont 304
+        self.misses = 0        # corps téléchargé et parsé
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> [taille, mtime]; du moins au plus récemment utilisé.
+        # mtime du fichier = date du dernier 200/304 (sert au TTL et à l'ordre LRU au redémarrage)
+        self._lru = OrderedDict()
+        self._bytes = 0
+        os.makedirs(self.path, exist_ok=True)
+        found = []
+        for fn in os.listdir(self.path):
+            if fn.endswith(".pkl"):  # ancien format (pickle): jamais relu
+                try:
+                    os.remove(os.path.join(self.path, fn))
+                except OSError:
+                    pass
+            elif fn.endswith(".json"):
+                try:
+                    st = os.stat(os.path.join(self.path, fn))
+                except OSError:
+                    continue
+                found.append((st.st_mtime, fn[:-5], st.st_size))
+        for mtime, key, size in sorted(found):
+            self._lru[key] = [size, mtime]
+            self._bytes += size
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key + ".json")
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return sha1(url.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _entry_row(e) -> list:
+        """Entrée (FeedEntry ou feedparser) -> [titre, lien, published, ts, [source, href] | None]."""
+        if type(e) is FeedEntry:
+            return list(e.__getstate__())
+        src = getattr(e, "source", None)
+        return [str(getattr(e, "title", "") or ""), str(getattr(e, "link", "") or ""),
+                str(getattr(e, "published", "") or ""), entry_timestamp(e),
+                None if src is None else [entry_source(e), str(getattr(src, "href", "") or "")]]
+
+    @staticmethod
+    def _entry_from_row(row) -> "FeedEntry":
+        title, link, published, ts, src = row
+        if not (isinstance(title, str) and isinstance(link, str) and isinstance(published, str)
+                and (ts is None or type(ts) is int)):
+            raise ValueError("entrée de cache invalide")
+        return FeedEntry(title, link, published, ts, None if src is None else FeedSource(str(src[0]), str(src[1])))
+
+    def _drop(self, key: str):
+        self._bytes -= self._lru.pop(key, (0, 0))[0]
+        try:
+            os.remove(self._file(key))
+        except OSError:
+            pass
+
+    def get(self, url: str):
+        key = self._key(url)
+        with self._lock:
+            meta = self._lru.get(key)
+            if meta is None:
+                return None
+            if time.time() - meta[1] > self.ttl:
+                self._drop(key)
+                return None
+            try:
+                with open(self._file(key), "rb") as f:
+                    raw = json.load(f)
+                rec = {"url": str(raw["url"]), "etag": raw["etag"], "last_modified": raw["last_modified"],
+                       "entries": [self._entry_from_row(row) for row in raw["entries"]]}
+            except Exception:
+                self._drop(key)
+                return None
+            rec["fetched_at"] = meta[1]
+            self._lru.move_to_end(key)
+            return rec
+
+    def is_fresh(self, rec: dict) -> bool:
+        return self.fresh_for > 0 and time.time() - rec["fetched_at"] <= self.fresh_for
+
+    @staticmethod
+    def validators(rec: dict) -> dict:
+        headers = {}
+        if rec and rec.get("etag"):
+            headers["If-None-Match"] = rec["etag"]
+        if rec and rec.get("last_modified"):
+            headers["If-Modified-Since"] = rec["last_modified"]
+        return headers
+
+    def put(self, url: str, etag: str, last_modified: str, entries):
+        try:
+            rec = {"url": url, "etag": etag, "last_modified": last_modified,
+                   "entries": [self._entry_row(e) for e in entries]}
+            data = json.dumps(rec, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        except Exception:
+            return
+        key = self._key(url)
+        with self._lock:
+            tmp = self._file(key) + ".tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, self._file(key))
+            except OSError:
+                return
+            self._bytes += len(data) - self._lru.pop(key, (0, 0))[0]
+            self._lru[key] = [len(data), time.time()]
+            while self._bytes > self.max_bytes and len(self._lru) > 1:
+                self._drop(next(iter(self._lru)))
+                self.evictions += 1
+
+    def touch(self, url: str):
+        """Revalidation réussie (304): repart pour un TTL sans réécrire les entrées."""
+        key = self._key(url)
+        with self._lock:
+            meta = self._lru.get(key)
+            if meta is None:
+                return
+            try:
+                os.utime(self._file(key))
+            except OSError:
+                return
+            meta[1] = time.time()
+            self._lru.move_to_end(key)
+
+    def count(self, hit: bool, not_modified: bool = False):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                if not_modified:
+                    self.not_modified += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "not_modified": self.not_modified, "misses": self.misses,
+                    "evictions": self.evictions, "entries": len(self._lru), "bytes": self._bytes}
+
+
+def open_feed_cache(path: str = None, **kw):
+    """FeedCache, ou None si le dossier de cache n'est pas utilisable (lecture seule, etc.)."""
+    try:
+        return FeedCache(path, **kw)
+    except OSError:
+        return None
+
+
+class FetchResult:
+    __slots__ = ("label", "url", "entries", "error", "elapsed")
+
+    def __init__(self, label: str, url: str, entries=None, error: Exception = None, elapsed: float = 0.0):
+        self.label = label
+        self.url = url
+        self.entries = entries or []
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+FAST_PARSE = True  # flux Google News: parseur expat dédié (repli feedparser si schéma inattendu)
+
+
+class FeedSource:
+    __slots__ = ("title", "href")
+
+    def __init__(self, title: str = "", href: str = ""):
+        self.title = title
+        self.href = href
+
+
+class FeedEntry:
+    """
+    Entrée minimale (interface feedparser utilisée ici): title, link, published(_parsed), source.
+    La date est gardée en epoch UTC (ts); published_parsed n'est recalculé qu'à la demande.
+    """
+    __slots__ = ("title", "link", "published", "ts", "source")
+
+    def __init__(self, title="", link="", published="", ts=None, source=None):
+        self.title = title
+        self.link = link
+        self.published = published
+        self.ts = ts
+        self.source = source
+
+    @property
+    def published_parsed(self):
+        return None if self.ts is None else time.gmtime(self.ts)
+
+    def __getstate__(self):
+        return (self.title, self.link, self.published, self.ts,
+                None if self.source is None else (self.source.title, self.source.href))
+
+    def __setstate__(self, st):
+        self.title, self.link, self.published, self.ts, src = st
+        self.source = None if src is None else FeedSource(*src)
+
+
+class UnexpectedFeed(ValueError):
+    """Flux hors schéma Google News RSS: à confier à feedparser."""
+
+
+def iter_google_news(data: bytes):
+    """
+    Lecture en flux (expat via XMLPullParser) d'un RSS Google News en octets:
+    yield FeedEntry au fil des </item>, sans décoder tout le corps en str.
+    UnexpectedFeed si un <item> est inattendu ou si la racine n'est pas <rss>
+    (vérifiée à la fin: seuls les événements "end" sont demandés).
+    """
+    import xml.etree.ElementTree as ET
+    parser = ET.XMLPullParser(events=("end",))
+    step = 1 << 16
+    el = None
+    for i in range(0, len(data), step):
+        try:
+            parser.feed(data[i:i + step])
+            for _ev, el in parser.read_events():
+                if el.tag == "item":
+                    yield _google_news_entry(el)
+                    el.clear()
+        except ET.ParseError as e:
+            raise UnexpectedFeed(str(e)) from None
+    try:
+        parser.close()
+        for _ev, el in parser.read_events():
+            pass
+    except ET.ParseError as e:
+        raise UnexpectedFeed(str(e)) from None
+    if el is None or el.tag != "rss":
+        raise UnexpectedFeed(f"racine <{getattr(el, 'tag', '')}>")
+
+
+def _google_news_entry(el) -> FeedEntry:
+    title = link = pub = None
+    source = None
+    for child in el:
+        tag = child.tag
+        if tag == "title":
+            title = child.text or ""
+        elif tag == "link":
+            link = child.text or ""
+        elif tag == "pubDate":
+            pub = child.text or ""
+        elif tag == "source":
+            source = FeedSource((child.text or "").strip(), child.get("url", ""))
+        elif tag in ("description", "guid") or tag.startswith("{"):
+            continue
+        else:
+            raise UnexpectedFeed(f"<item><{tag}>")
+    if title is None or link is None:
+        raise UnexpectedFeed("<item> sans title/link")
+    pub = (pub or "").strip()
+    return FeedEntry(title.strip(), link.strip(), pub, rfc822_epoch(pub) if pub else None, source)
+
+
+def parse_feed(data: bytes, fast: bool = None):
+    """Octets RSS -> entrées: parseur Google News (FAST_PARSE) puis repli feedparser."""
+    if fast is None:
+        fast = FAST_PARSE
+    if fast:
+        try:
+            entries = list(iter_google_news(data))
+            METRICS.inc("parse_fast")
+            return entries
+        except UnexpectedFeed:
+            METRICS.inc("parse_fallback")
+    feedparser = _import_feedparser()
+    if feedparser is None:
+        raise RuntimeError("flux non reconnu et feedparser manquant (pip install feedparser)")
+    feed = feedparser.parse(data)
+    return getattr(feed, "entries", []) or []
+
+
+class FetchEngine:
+    """
+    Session requests keep-alive partagée (pool de connexions) + fetch parallèle
+    des éditions. Chaque URL a son propre timeout et sa propre erreur: un échec
+    FR n'efface pas les entrées EN (et inversement).
+    """
+
+    def __init__(self, max_workers: int = FETCH_WORKERS, timeout=FETCH_TIMEOUT, limiter=None, cache: FeedCache = None,
+                 fast_parse: bool = None, links=None):
+        self.timeout = timeout
+        import requests
+        self.fast_parse = FAST_PARSE if fast_parse is None else fast_parse
+        self.limiter = limiter  # RateLimiter optionnel, partagé entre threads
+        self.cache = cache      # FeedCache optionnel (GET conditionnel)
+        self.links = links      # LinkResolver optionnel (liens de redirection -> URL canonique)
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = UA
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rss-fetch")
+
+    def fetch_entries(self, url: str):
+        cache = self.cache
+        rec = cache.get(url) if cache is not None else None
+        if rec is not None and cache.is_fresh(rec):
+            cache.count(hit=True)
+            METRICS.inc("cache_fresh")
+            return rec["entries"]
+
+        if self.limiter is not None:
+            with METRICS.timer("rate_wait"):
+                self.limiter.acquire()
+        with METRICS.timer("http"):
+            r = self.session.get(url, headers=FeedCache.validators(rec), timeout=self.timeout)
+        METRICS.inc("http_requests")
+        if r.status_code == 304:
+            if rec is not None:
+                cache.touch(url)
+                cache.count(hit=True, not_modified=True)
+                METRICS.inc("http_304")
+                return rec["entries"]
+            # 304 sans entrée en cache (proxy, cache vidé entre-temps): miss, relu sans validateurs
+            METRICS.inc("http_304_orphan")
+            with METRICS.timer("http"):
+                r = self.session.get(url, headers={"Cache-Control": "no-cache"}, timeout=self.timeout)
+            METRICS.inc("http_requests")
+            if r.status_code == 304:
+                raise ValueError(f"304 sans entrée en cache: {url}")
+        r.raise_for_status()
+        METRICS.inc("http_bytes", len(r.content))
+        with METRICS.timer("parse"):
+            entries = parse_feed(r.content, self.fast_parse)
+        if cache is not None:
+            cache.count(hit=False)
+            cache.put(url, r.headers.get("ETag"), r.headers.get("Last-Modified"), entries)
+        return entries
+
+    def _fetch_result(self, label: str, url: str) -> FetchResult:
+        t0 = time.perf_counter()
+        try:
+            entries = self.fetch_entries(url)
+        except Exception as e:
+            METRICS.inc("fetch_errors")
+            return FetchResult(label, url, error=e, elapsed=time.perf_counter() - t0)
+        el = time.perf_counter() - t0
+        METRICS.observe("fetch", el)
+        return FetchResult(label, url, entries=entries, elapsed=el)
+
+    def fetch_many(self, urls, parallel: bool = True):
+        """urls: [(label, url), ...] -> [FetchResult, ...] dans le même ordre."""
+        if len(urls) <= 1 or not parallel:
+            return [self._fetch_result(lab, url) for lab, url in urls]
+        futures = [self._pool.submit(self._fetch_result, lab, url) for lab, url in urls]
+        return [f.result() for f in futures]
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.session.close()
+
+
+# -----------------------------
+# Liens canoniques (redirections Google News)
+# -----------------------------
+LINK_REDIRECT_HOSTS = ("news.google.com",)
+LINK_WORKERS = 8
+LINK_RATE = 5.0                # requêtes HEAD/s (moyenne), tous hôtes confondus
+LINK_TIMEOUT = (5, 10)
+LINK_CACHE_MAX = 50_000        # URLs gardées (LRU)
+LINK_RETRY_S = 3600            # lien non résolu: pas de nouvel essai avant 1h
+_GNEWS_TOKEN_RE = re.compile(r"/(?:rss/)?(?:articles|read)/([A-Za-z0-9_-]+)")
+
+
+def decode_gnews_link(url: str):
+    """
+    Décode hors ligne un lien news.google.com/rss/articles/<jeton>: ancien format
+    = base64url d'un protobuf 08 13 22 <varint longueur> <URL>. Renvoie None si le
+    jeton n'est pas décodable (format chiffré "AU_yqL…" récent: passer par HEAD).
+    """
+    import base64
+    import binascii
+    m = _GNEWS_TOKEN_RE.search(url.split("?", 1)[0])
+    if m is None:
+        return None
+    tok = m.group(1)
+    try:
+        raw = base64.urlsafe_b64decode(tok + "=" * (-len(tok) % 4))
+    except (ValueError, binascii.Error):
+        return None
+    if raw[:3] != b"\x08\x13\x22":
+        return None
+    n, shift, i = 0, 0, 3
+    while i < len(raw):
+        b = raw[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        shift += 7
+        if not b & 0x80:
+            break
+    else:
+        return None
+    body = raw[i:i + n]
+    if len(body) != n:  # longueur en octets (URL non ASCII: plus d'octets que de caractères)
+        return None
+    try:
+        out = body.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    return out if out.startswith(("http://", "https://")) else None
+
+
+class LinkCache:
+    """
+    Table persistante lien de redirection -> URL canonique (JSON: [[lien, url], ...]
+    dans l'ordre LRU, écrit par save() de façon atomique). Clé = lien sans la query
+    string (?oc=5, hl=...: même jeton = même article). Éviction LRU au-delà de `max_entries`.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = LINK_CACHE_MAX):
+        if path is None:
+            path = os.path.join(default_cache_dir(), "links.json")
+            try:
+                os.remove(os.path.join(default_cache_dir(), "links.pkl"))  # ancien format (pickle): jamais relu
+            except OSError:
+                pass
+        self.path = path
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._map = OrderedDict()  # du moins au plus récemment utilisé
+        self._dirty = False
+        try:
+            with open(self.path, "rb") as f:
+                rows = json.load(f)
+            if not isinstance(rows, list) or not all(isinstance(k, str) and isinstance(v, str) for k, v in rows):
+                raise ValueError("table de liens invalide")
+            self._map.update(rows)
+            while len(self._map) > self.max_entries:
+                self._map.popitem(last=False)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            self._map.clear()
+            self._dirty = True  # fichier illisible: réécrit au prochain save()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return url.split("?", 1)[0]
+
+    def __len__(self):
+        return len(self._map)
+
+    def get(self, url: str):
+        key = self._key(url)
+        with self._lock:
+            out = self._map.get(key)
+            if out is not None:
+                self._map.move_to_end(key)
+            return out
+
+    def put(self, url: str, canonical: str):
+        key = self._key(url)
+        with self._lock:
+            self._map[key] = canonical
+            self._map.move_to_end(key)
+            while len(self._map) > self.max_entries:
+                self._map.popitem(last=False)
+                self.evictions += 1
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(list(self._map.items()), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            self._dirty = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.path)
+        except OSError:
+            with self._lock:
+                self._dirty = True
+
+
+def open_link_cache(path: str = None, **kw):
+    """LinkCache, ou None si le dossier de cache n'est pas utilisable."""
+    try:
+        cache = LinkCache(path, **kw)
+        os.makedirs(os.path.dirname(os.path.abspath(cache.path)), exist_ok=True)
+        return cache
+    except OSError:
+        return None
+
+
+class LinkResolver:
+    """
+    Remplace les liens de redirection (news.google.com/rss/articles/...) par
+    l'URL de l'article, pour dedup_key, l'historique et les exports:
+    1. canonical(): sans réseau (décodage du jeton, sinon LinkCache);
+    2. resolve_items(): le reste en HEAD (redirections suivies) sur un pool
+       borné + limite de débit; résultats mis en cache.
+    Un lien non résolu (toujours sur un hôte de redirection, erreur HTTP) est
+    gardé tel quel et pas réessayé avant LINK_RETRY_S.
+    """
+
+    def __init__(self, cache: LinkCache = None, workers: int = LINK_WORKERS, rate: float = LINK_RATE,
+                 timeout=LINK_TIMEOUT, hosts=LINK_REDIRECT_HOSTS):
+        import requests
+        self.cache = cache
+        self.timeout = timeout
+        self.hosts = frozenset(hosts)
+        self.limiter = RateLimiter(rate, burst=workers) if rate > 0 else None
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = UA
+        adapter = requests.adapters.HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="rss-links")
+        self._failed = {}  # clé -> time.time() du dernier échec
+        self._lock = threading.Lock()
+        self._stats = {"decoded": 0, "cached": 0, "head": 0, "resolved": 0, "failed": 0, "duplicates": 0}
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._stats[name] += n
+        METRICS.inc("links_" + name, n)
+
+    def is_redirect(self, url: str) -> bool:
+        if not url:
+            return False
+        from urllib.parse import urlsplit
+        try:
+            return urlsplit(url).hostname in self.hosts
+        except ValueError:
+            return False
+
+    def canonical(self, url: str) -> str:
+        """URL canonique si connue sans réseau, sinon `url` inchangée."""
+        if not self.is_redirect(url):
+            return url
+        out = decode_gnews_link(url)
+        if out is not None:
+            self._count("decoded")
+            return out
+        if self.cache is not None:
+            out = self.cache.get(url)
+            if out is not None:
+                self._count("cached")
+                return out
+        return url
+
+    def _head(self, url: str) -> str:
+        import requests
+        key = LinkCache._key(url)
+        with self._lock:
+            last = self._failed.get(key)
+        if last is not None and time.time() - last < LINK_RETRY_S:
+            return url
+        if self.limiter is not None:
+            self.limiter.acquire()
+        self._count("head")
+        t0 = time.perf_counter()
+        try:
+            r = self.session.head(url, allow_redirects=True, timeout=self.timeout)
+            if r.status_code in (403, 405, 501):
+                # HEAD refusé par certains sites: GET sans lire le corps
+                r = self.session.get(url, allow_redirects=True, timeout=self.timeout, stream=True)
+                r.close()
+            final = r.url if r.status_code < 400 else ""
+        except requests.RequestException:
+            final = ""
+        METRICS.observe("link_head", time.perf_counter() - t0)
+        if not final or self.is_redirect(final):
+            self._count("failed")
+            with self._lock:
+                self._failed[key] = time.time()
+            return url
+        self._count("resolved")
+        if self.cache is not None:
+            self.cache.put(url, final)
+        return final
+
+    def resolve(self, url: str) -> str:
+        out = self.canonical(url)
+        return self._head(out) if self.is_redirect(out) else out
+
+    def resolve_many(self, urls) -> dict:
+        """{url: canonique}; une requête HEAD par lien distinct, en parallèle sur le pool."""
+        out, todo = {}, []
+        for url in dict.fromkeys(urls):
+            c = self.canonical(url)
+            if self.is_redirect(c):
+                todo.append(url)
+            else:
+                out[url] = c
+        for url, c in zip(todo, self._pool.map(self._head, todo)):
+            out[url] = c
+        if todo and self.cache is not None:
+            self.cache.save()
+        return out
+
+    def resolve_items(self, items, seen: set = None) -> list:
+        """
+        Réécrit it.link en URL canonique et redédoublonne: un item dont l'URL
+        canonique est déjà dans `seen` (clés dedup_key, complété au passage) est retiré.
+        """
+        if seen is None:
+            seen = set()
+        with METRICS.timer("links"):
+            canon = self.resolve_many(it.link for it in items if self.is_redirect(it.link))
+        kept = []
+        for it in items:
+            link = canon.get(it.link)
+            if link is not None and link != it.link:
+                it.link = link
+                k = dedup_key(it.title, link)
+                if k in seen:
+                    self._count("duplicates")
+                    continue
+                seen.add(k)
+            kept.append(it)
+        return kept
+
+    def stats(self) -> dict:
+        with self._lock:
+            st = dict(self._stats)
+        if self.cache is not None:
+            st["cache_entries"] = len(self.cache)
+            st["cache_evictions"] = self.cache.evictions
+        return st
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.save()
+
+
+# -----------------------------
+# Pipeline headless (fetch -> parse -> dédup -> score)
+# -----------------------------
+CSV_FIELDS = ["dt_utc", "dt_local", "lang", "label", "score", "source", "title", "url", "query"]
+
+
+def edition_urls(q: str, mode: str):
+    if mode not in LANG_CHOICES:
+        mode = "FR+EN"
+    urls = []
+    if mode in ("FR", "FR+EN"):
+        urls.append(("FR", build_rss_url(q, **EDITION_FR)))
+    if mode in ("EN", "FR+EN"):
+        urls.append(("EN", build_rss_url(q, **EDITION_EN)))
+    return urls
+
+
+def entry_source(e) -> str:
+    try:
+        if hasattr(e, "source") and hasattr(e.source, "title"):
+            return safe_strip(str(e.source.title))
+    except Exception:
+        pass
+    return ""
+
+
+class Item:
+    """
+    Un article scoré. Objet à __slots__ plutôt qu'un dict par item (mémoire,
+    accès attribut au rendu / aux filtres / à l'export); source, label et langue
+    sont internés (une seule chaîne partagée par valeur). to_dict() /
+    Item.from_dict() pour les échanges (JSON, anciens appels).
+    """
+    __slots__ = ("ts", "title", "source", "link", "score", "label", "lang", "query", "story")
+    FIELDS = ("ts", "title", "source", "link", "score", "label", "lang", "query")
+
+    def __init__(self, ts=None, title="", source="", link="", score=0, label="", lang="", query="", story=None):
+        self.ts = ts
+        self.title = title
+        self.source = sys.intern(source)
+        self.link = link
+        self.score = score
+        self.label = sys.intern(label)
+        self.lang = sys.intern(lang)
+        self.query = query
+        self.story = story
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Item":
+        return cls(**{k: d[k] for k in cls.FIELDS if k in d})
+
+    def __repr__(self):
+        return f"Item({self.to_dict()!r})"
+
+
+def items_from_entries(entries, seen: set = None, links: LinkResolver = None):
+    """
+    Entrées feedparser -> items scorés, dédoublonnés (avant scoring) via `seen`.
+    `links`: liens de redirection remplacés par l'URL canonique quand elle est
+    connue sans réseau (jeton décodable, LinkCache) avant le calcul de dedup_key.
+    """
+    if seen is None:
+        seen = set()
+    items = []
+    t0 = time.perf_counter()
+    for e in entries:
+        title = safe_strip(getattr(e, "title", ""))
+        link = safe_strip(getattr(e, "link", ""))
+        if links is not None:
+            link = links.canonical(link)
+
+        k = dedup_key(title, link)
+        if k in seen:
+            continue
+        seen.add(k)
+
+        items.append(Item(entry_timestamp(e), title, entry_source(e), link))
+    METRICS.observe("entries", time.perf_counter() - t0)
+    METRICS.inc("entries", len(entries))
+    METRICS.inc("duplicates", len(entries) - len(items))
+
+    # scoring du lot entier en un passage (score_batch), item par item sous BATCH_MIN
+    with METRICS.timer("score"):
+        if len(items) < BATCH_MIN:
+            for it in items:
+                sc, lang = score_text_auto(it.title, it.source)
+                it.score = sc
+                it.label = label_from_score(sc)
+                it.lang = lang
+        else:
+            scores, labels, langs = score_batch([it.title for it in items], [it.source for it in items])
+            for it, sc, lab, lang in zip(items, scores, labels, langs):
+                it.score = int(sc)
+                it.label = sys.intern(str(lab))
+                it.lang = sys.intern(str(lang))
+    METRICS.inc("scored", len(items))
+    return items
+
+
+def sort_items(items):
+    """Tri par date décroissante (stable); les items sans date passent en dernier."""
+    items.sort(key=ts_sort_key, reverse=True)
+    return items
+
+
+def fetch_query(fetcher: FetchEngine, urls, parallel: bool = True, seen: set = None):
+    """
+    -> (items triés, [FetchResult]); les éditions en échec sont simplement absentes des items.
+    `seen` (clés dedup_key) peut être conservé entre deux polls: seules les entrées
+    jamais vues sont alors scorées et renvoyées. Avec fetcher.links, les liens encore
+    en redirection sont résolus (HEAD) puis redédoublonnés sur l'URL canonique.
+    """
+    results = fetcher.fetch_many(urls, parallel=parallel)
+    if seen is None:
+        seen = set()
+    links = fetcher.links
+    items = []
+    for res in results:
+        items.extend(items_from_entries(res.entries, seen, links))
+    if links is not None:
+        items = links.resolve_items(items, seen)
+    return sort_items(items), results
+
+
+def item_row(it: Item, query: str = "") -> list:
+    dt_utc, dt_local = format_ts_pair(it.ts)
+    return [
+        dt_utc,
+        dt_local,
+        it.lang,
+        it.label,
+        it.score,
+        it.source,
+        it.title,
+        it.link,
+        query,
+    ]
+
+
+RENDER_CHUNK = 2000  # lignes par appel Text.insert
+
+
+def item_line_args(it: Item, row_tags: tuple = ()) -> tuple:
+    """
+    Une ligne du terminal sous forme d'arguments Text.insert (texte, tags, ...):
+    [YYYY-MM-DD HH:MM] [POS +4] [EN] Source (+N sources) – Titre [i]
+    Le [i] porte le tag partagé "ilink" (l'URL est retrouvée via le n° de ligne).
+    `row_tags` est posé sur toute la ligne (filtres par elide).
+    """
+    ts = format_ts_short(it.ts)
+    lab = it.label
+    tag = "pos" if lab == "POS" else "neg" if lab == "NEG" else "neu"
+    src = it.source or "Source?"
+    story = it.story
+    if story is not None and story.lead is it and story.n_sources > 1:
+        src = f"{src} (+{story.n_sources - 1} sources)"
+    title = it.title or "(sans titre)"
+    lang = it.lang.upper()
+    return (f"[{ts}] [{lab} {it.score:+d}] [{lang}] {src} – {title} ", (tag,) + row_tags,
+            "[i]", ("ilink",) + row_tags, " \n", row_tags)
+
+
+class ItemIndex:
+    """
+    Index des items par label (POS/NEU/NEG), langue et source, tenus à jour à
+    l'ingestion. Sert aux filtres (liste des sources, compteurs) sans parcourir
+    tous les items.
+    """
+
+    def __init__(self):
+        self.by_label = {"POS": [], "NEU": [], "NEG": []}
+        self.by_lang = {}
+        self.by_source = {}
+        self.duplicates = 0
+
+    def clear(self):
+        self.__init__()
+
+    def add(self, it: Item):
+        self.by_label.setdefault(it.label, []).append(it)
+        self.by_lang.setdefault(it.lang, []).append(it)
+        self.by_source.setdefault(it.source, []).append(it)
+
+    def extend(self, items):
+        for it in items:
+            self.add(it)
+
+    def add_duplicate(self, it: Item):
+        """Reprise d'une dépêche déjà indexée: compte seulement sa source (labels/langues: une fois par dépêche)."""
+        self.by_source.setdefault(it.source, []).append(it)
+        self.duplicates += 1
+
+    def sources(self):
+        """Sources triées par nombre d'items décroissant."""
+        return sorted(self.by_source, key=lambda k: (-len(self.by_source[k]), k))
+
+    def counts(self, field: str) -> dict:
+        return {k: len(v) for k, v in getattr(self, "by_" + field).items()}
+
+
+# Agrégats d'ambiance glissants (par requête / source / langue), mis à jour à l'ingestion
+AGG_WINDOWS = {"1h": (3600, 60), "24h": (86400, 900), "7d": (7 * 86400, 3600)}  # nom -> (durée, pas) en s
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+class RollingWindow:
+    """
+    Somme des scores / nb / POS / NEG sur une fenêtre glissante: anneau de buckets
+    de `step` secondes, totaux tenus à jour. add() et advance() en O(1) amorti
+    (chaque bucket n'est vidé qu'une fois quand le temps avance).
+    """
+    __slots__ = ("step", "n", "head", "sums", "counts", "pos", "neg", "total")
+
+    def __init__(self, span: int, step: int):
+        self.step = step
+        self.n = max(1, span // step)
+        self.head = None  # index (temps // step) du bucket le plus récent
+        self.sums = [0] * self.n
+        self.counts = [0] * self.n
+        self.pos = [0] * self.n
+        self.neg = [0] * self.n
+        self.total = [0, 0, 0, 0]  # somme, nb, POS, NEG
+
+    def advance(self, now: float):
+        t = int(now) // self.step
+        if self.head is None or t - self.head >= self.n:
+            self.head = t
+            self.sums = [0] * self.n
+            self.counts = [0] * self.n
+            self.pos = [0] * self.n
+            self.neg = [0] * self.n
+            self.total = [0, 0, 0, 0]
+            return
+        tot = self.total
+        for j in range(self.head + 1, t + 1):
+            k = j % self.n
+            if self.counts[k]:
+                tot[0] -= self.sums[k]
+                tot[1] -= self.counts[k]
+                tot[2] -= self.pos[k]
+                tot[3] -= self.neg[k]
+                self.sums[k] = self.counts[k] = self.pos[k] = self.neg[k] = 0
+        self.head = max(self.head, t)
+
+    def add(self, ts: int, score: int, pos: int, neg: int, now: float):
+        step = self.step
+        head = self.head
+        if head is None or int(now) // step > head:
+            self.advance(now)
+            head = self.head
+        i = min(ts // step, head)  # date future (horloges décalées): bucket courant
+        if i <= head - self.n:
+            return  # hors fenêtre
+        k = i % self.n
+        self.sums[k] += score
+        self.counts[k] += 1
+        self.pos[k] += pos
+        self.neg[k] += neg
+        tot = self.total
+        tot[0] += score
+        tot[1] += 1
+        tot[2] += pos
+        tot[3] += neg
+
+    def series(self, bins: int, now: float) -> list:
+        """[(somme, nb)] du plus ancien au plus récent, buckets regroupés en `bins` tranches."""
+        self.advance(now)
+        order = [(self.head - self.n + 1 + j) % self.n for j in range(self.n)]
+        per = max(1, self.n // bins)
+        out = []
+        for b in range(self.n % per, self.n, per):  # reste éventuel: buckets les plus anciens écartés
+            ks = order[b:b + per]
+            out.append((sum(self.sums[k] for k in ks), sum(self.counts[k] for k in ks)))
+        return out
+
+
+def _agg_stats(tot) -> dict:
+    s, n, p, g = tot
+    return {"count": n, "sum": s, "mean": round(s / n, 3) if n else 0.0, "pos": p, "neg": g,
+            "pos_ratio": round(p / n, 3) if n else 0.0, "neg_ratio": round(g / n, 3) if n else 0.0}
+
+
+def sparkline(values) -> str:
+    """Moyennes (None = tranche vide) -> '▁▃▅█ ▂': échelle symétrique autour de 0 (milieu = neutre)."""
+    m = max((abs(v) for v in values if v is not None), default=0) or 1
+    top = len(SPARK_CHARS) - 1
+    return "".join(" " if v is None else SPARK_CHARS[round((v / m + 1) / 2 * top)] for v in values)
+
+
+class SentimentAggregator:
+    """
+    Agrégats d'ambiance incrémentaux, sans re-parcourir les items:
+    clés ("all", ""), ("query", q), ("lang", l) comptées une fois par dépêche (lead),
+    ("source", s) pour chaque item (reprises comprises). Pour chaque clé: fenêtres
+    AGG_WINDOWS (selon la date de publication, items sans date exclus) + total
+    depuis le début (window="all").
+    add() en O(1): nb de clés x nb de fenêtres mises à jour.
+    """
+
+    def __init__(self, windows=None, clock=time.time):
+        self.windows = dict(AGG_WINDOWS if windows is None else windows)
+        self.clock = clock
+        self._keys = {}  # (dim, valeur) -> ({nom: RollingWindow}, total [somme, nb, POS, NEG])
+
+    def clear(self):
+        self._keys = {}
+
+    def _entry(self, key):
+        e = self._keys.get(key)
+        if e is None:
+            e = self._keys[key] = ({name: RollingWindow(span, step) for name, (span, step) in self.windows.items()},
+                                   [0, 0, 0, 0])
+        return e
+
+    def add(self, it: Item, lead: bool = True, query: str = None, now: float = None):
+        now = self.clock() if now is None else now
+        score = int(it.score)
+        pos = it.label == "POS"
+        neg = it.label == "NEG"
+        keys = [("source", it.source)]
+        if lead:
+            keys += [("all", ""), ("query", it.query if query is None else query), ("lang", it.lang)]
+        for key in keys:
+            wins, tot = self._entry(key)
+            tot[0] += score
+            tot[1] += 1
+            tot[2] += pos
+            tot[3] += neg
+            if it.ts is not None:
+                for w in wins.values():
+                    w.add(it.ts, score, pos, neg, now)
+
+    def get(self, dim: str = "all", value: str = "", window: str = "24h", now: float = None) -> dict:
+        """{count, sum, mean, pos, neg, pos_ratio, neg_ratio} d'une clé; window: nom de AGG_WINDOWS ou 'all'."""
+        e = self._keys.get((dim, value))
+        if e is None:
+            return _agg_stats((0, 0, 0, 0))
+        if window == "all":
+            return _agg_stats(e[1])
+        w = e[0][window]
+        w.advance(self.clock() if now is None else now)
+        return _agg_stats(w.total)
+
+    def values(self, dim: str) -> list:
+        return [v for d, v in self._keys if d == dim]
+
+    def table(self, dim: str, window: str = "24h", now: float = None) -> dict:
+        """{valeur: stats} pour toutes les valeurs d'une dimension (parcourt les clés, pas les items)."""
+        now = self.clock() if now is None else now
+        return {v: self.get(dim, v, window, now) for v in self.values(dim)}
+
+    def trend(self, window: str = "24h", bins: int = 12, dim: str = "all", value: str = "", now: float = None) -> list:
+        """Moyenne par tranche (None si vide), de la plus ancienne à la plus récente."""
+        e = self._keys.get((dim, value))
+        if e is None:
+            return []
+        series = e[0][window].series(bins, self.clock() if now is None else now)
+        return [s / n if n else None for s, n in series]
+
+
+# Recherche locale: index inversé des titres (tokens de tokenize), sans réseau
+SEARCH_LIMIT = 500
+_SEARCH_RE = re.compile(r'(-?)"([^"]*)"?|(\S+)')
+_SEARCH_FIELDS = ("label", "lang", "source", "after", "before")
+
+
+def _day_ts(s: str):
+    """'YYYY-MM-DD' -> epoch de minuit (heure locale, comme l'affichage), None si invalide."""
+    try:
+        return int(datetime.strptime(s, "%Y-%m-%d").timestamp())
+    except ValueError:
+        return None
+
+
+def parse_search(text: str):
+    """
+    Requête de recherche -> (clauses, filtres). Une clause = liste de (négatif?, tokens):
+    les termes d'une clause sont en ET (implicite; 'AND' explicite accepté), les clauses
+    en OU ('OR'). '-mot' / 'NOT mot' excluent, "plusieurs mots" = expression exacte. Filtres globaux:
+    label:POS lang:fr source:reuters after:YYYY-MM-DD before:YYYY-MM-DD (before exclu).
+    """
+    clauses, filters = [[]], {}
+    neg_next = False
+    for m in _SEARCH_RE.finditer(text or ""):
+        neg = neg_next or m.group(1) == "-"
+        neg_next = False
+        if m.group(3) is None:
+            toks = tokenize(m.group(2))
+        else:
+            w = m.group(3)
+            if w == "OR":
+                if clauses[-1]:
+                    clauses.append([])
+                continue
+            if w == "AND":  # ET implicite: opérateur sans effet, jamais indexé comme terme
+                continue
+            if w == "NOT":
+                neg_next = True
+                continue
+            if w.startswith("-") and len(w) > 1:
+                neg, w = True, w[1:]
+            field, sep, val = w.partition(":")
+            if sep and field.lower() in _SEARCH_FIELDS and val:
+                filters[field.lower()] = val
+                continue
+            toks = tokenize(w)
+        if toks:
+            clauses[-1].append((neg, tuple(toks)))
+    return [c for c in clauses if c], filters
+
+
+def _has_phrase(toks, phrase) -> bool:
+    n = len(phrase)
+    return any(toks[i:i + n] == phrase for i in range(len(toks) - n + 1))
+
+
+class SearchIndex:
+    """
+    Index inversé en mémoire des titres, mis à jour à l'ingestion (add / extend):
+    token -> [n° de doc croissants]. Les expressions exactes sont vérifiées sur les
+    seuls candidats (intersection des tokens). Dates: liste (ts, doc) triée à la
+    demande, élaguée par bisect pour after: / before:. save() / load(): JSON à
+    côté d'un export (données seulement: un .idx reçu ne peut pas exécuter de code).
+    """
+    VERSION = 2
+
+    def __init__(self):
+        self.docs = []        # n° de doc -> Item
+        self.postings = {}    # token -> [n° de doc]
+        self._keys = set()    # dedup_key déjà indexées
+        self._facets = {}     # ("label", "POS") / ("lang", "fr") -> {n° de doc}
+        self._by_ts = []      # [(ts, doc)] des items datés
+        self._sorted = True
+
+    def clear(self):
+        self.__init__()
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, it: Item) -> bool:
+        k = dedup_key(it.title, it.link)
+        if k in self._keys:
+            return False
+        self._keys.add(k)
+        doc = len(self.docs)
+        self.docs.append(it)
+        postings = self.postings
+        for tok in set(tokenize(it.title)):
+            lst = postings.get(tok)
+            if lst is None:
+                postings[tok] = [doc]
+            else:
+                lst.append(doc)
+        self._facet_add(doc, it)
+        if it.ts is not None:
+            if self._by_ts and it.ts < self._by_ts[-1][0]:
+                self._sorted = False
+            self._by_ts.append((it.ts, doc))
+        return True
+
+    def extend(self, items) -> int:
+        return sum(self.add(it) for it in items)
+
+    def _facet_add(self, doc: int, it: Item):
+        for key in (("label", it.label), ("lang", it.lang)):
+            s = self._facets.get(key)
+            if s is None:
+                s = self._facets[key] = set()
+            s.add(doc)
+
+    def _newest(self, hits: set, limit: int) -> list:
+        """Les `limit` hits les plus récents: parcours de la liste triée depuis la fin (arrêt anticipé)."""
+        if not self._sorted:
+            self._by_ts.sort()
+            self._sorted = True
+        out = []
+        for _ts, doc in reversed(self._by_ts):
+            if len(out) >= limit:
+                return out
+            if doc in hits:
+                out.append(doc)
+        # items sans date: en dernier
+        dated = set(out) if len(out) < len(hits) else hits
+        out.extend(sorted((d for d in hits if d not in dated and self.docs[d].ts is None), reverse=True))
+        return out[:limit]
+
+    def _docs_for(self, toks) -> set:
+        """Docs contenant tous les tokens (et l'expression exacte si plusieurs)."""
+        lists = sorted((self.postings.get(t, ()) for t in set(toks)), key=len)
+        found = set(lists[0])
+        for lst in lists[1:]:
+            if not found:
+                break
+            found.intersection_update(lst)
+        if len(toks) > 1:
+            docs = self.docs
+            found = {d for d in found if _has_phrase(tokenize(docs[d].title), list(toks))}
+        return found
+
+    def _date_range(self, lo, hi) -> set:
+        if not self._sorted:
+            self._by_ts.sort()
+            self._sorted = True
+        by_ts = self._by_ts
+        i = 0 if lo is None else bisect.bisect_left(by_ts, (lo, -1))
+        j = len(by_ts) if hi is None else bisect.bisect_left(by_ts, (hi, -1))
+        return {doc for _ts, doc in by_ts[i:j]}
+
+    def search(self, text: str, limit: int = SEARCH_LIMIT) -> dict:
+        """-> {"items": [Item] (plus récents d'abord, <= limit), "total", "facets": {label, lang}, "ms"}."""
+        t0 = time.perf_counter()
+        clauses, filters = parse_search(text)
+        hits = None
+        for clause in clauses:
+            found = None
+            for neg, toks in sorted(clause, key=lambda c: c[0]):  # positifs d'abord
+                if neg:
+                    if found is None:
+                        found = set(range(len(self.docs)))
+                    found -= self._docs_for(toks)
+                else:
+                    docs = self._docs_for(toks)
+                    found = docs if found is None else found & docs
+            hits = found if hits is None else hits | found
+
+        lo = _day_ts(filters["after"]) if "after" in filters else None
+        hi = _day_ts(filters["before"]) if "before" in filters else None
+        if lo is not None or hi is not None:
+            rng = self._date_range(lo, hi)
+            hits = rng if hits is None else hits & rng
+        if hits is None:
+            hits = set(range(len(self.docs)))
+
+        docs = self.docs
+        for field, val in (("label", filters.get("label", "").upper()), ("lang", filters.get("lang", "").lower())):
+            if val:
+                hits = hits & self._facets.get((field, val), set())
+        source = filters.get("source", "").casefold()
+        if source:
+            hits = {d for d in hits if source in docs[d].source.casefold()}
+
+        facets = {"label": {}, "lang": {}}
+        for (field, val), s in self._facets.items():
+            n = len(hits & s) if len(hits) < len(s) else len(s & hits)
+            if n:
+                facets[field][val] = n
+        top = self._newest(hits, limit)
+        ms = (time.perf_counter() - t0) * 1000
+        METRICS.observe("search", ms / 1000)
+        return {"items": [docs[d] for d in top], "total": len(hits), "facets": facets, "ms": round(ms, 3)}
+
+    def save(self, path: str):
+        rows = [[getattr(it, f) for f in Item.FIELDS] for it in self.docs]
+        data = json.dumps({"version": self.VERSION, "fields": Item.FIELDS, "docs": rows, "postings": self.postings},
+                          ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SearchIndex":
+        """ValueError si le fichier n'est pas un index JSON de cette version (ancien .idx pickle compris)."""
+        bad = ValueError(f"Index de recherche illisible ou d'une autre version: {path}")
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            rec = json.loads(data)
+        except ValueError:
+            raise bad from None
+        if (not isinstance(rec, dict) or rec.get("version") != cls.VERSION
+                or rec.get("fields") != list(Item.FIELDS)):
+            raise bad
+        idx = cls()
+        try:
+            for ts, title, source, link, score, label, lang, query in rec["docs"]:
+                idx.docs.append(Item(None if ts is None else int(ts), str(title), str(source), str(link),
+                                     int(score), str(label), str(lang), str(query)))
+            n = len(idx.docs)
+            for tok, docs in rec["postings"].items():
+                if not all(type(d) is int and 0 <= d < n for d in docs):
+                    raise ValueError(tok)
+                idx.postings[tok] = docs
+        except (TypeError, ValueError, AttributeError, KeyError):
+            raise bad from None
+        idx._keys = {dedup_key(it.title, it.link) for it in idx.docs}
+        for d, it in enumerate(idx.docs):
+            idx._facet_add(d, it)
+        idx._by_ts = [(it.ts, d) for d, it in enumerate(idx.docs) if it.ts is not None]
+        idx._sorted = False
+        return idx
+
+
+# Regroupement des reprises d'une même dépêche (MinHash + LSH sur les tokens du titre)
+STORY_BANDS = 12        # LSH: 12 bandes x 3 lignes -> P(candidat) ~0.95 à Jaccard 0.6, ~0.25 à 0.3
+STORY_ROWS = 3
+STORY_JACCARD = 0.6     # seuil vérifié exactement sur les ensembles de tokens
+STORY_MIN_TOKENS = 3    # titres plus courts: jamais regroupés (trop peu d'indices)
+STORY_BUCKET_MAX = 64   # entrées gardées par bucket (les plus récentes): coût par item borné
+_MH_MASK = (1 << 64) - 1
+
+
+class Story:
+    """Une dépêche: l'item affiché (lead, le premier vu), ses reprises et leurs sources."""
+    __slots__ = ("lead", "items", "sources")
+
+    def __init__(self, lead: Item):
+        self.lead = lead
+        self.items = [lead]
+        self.sources = {lead.source}
+
+    @property
+    def n_sources(self) -> int:
+        return len(self.sources)
+
+
+def story_tokens(title: str, source: str = "") -> frozenset:
+    """Tokens (tokenize) du titre, sans le suffixe Google News " - Source"."""
+    t = title or ""
+    if source and t.endswith(" - " + source):
+        t = t[:-len(source) - 3]
+    return frozenset(w for w in tokenize(t) if len(w) > 1)
+
+
+class StoryClusterer:
+    """
+    Regroupe les quasi-doublons (même dépêche reprise par N médias, titres
+    légèrement différents, liens différents). Signature MinHash des tokens du
+    titre, découpée en STORY_BANDS bandes -> buckets LSH: un nouvel item n'est
+    comparé (Jaccard exact) qu'aux items partageant au moins une bande, coût
+    indépendant du nombre d'items déjà vus.
+    add(it) -> (story, nouvelle_story?) et pose it.story.
+    """
+
+    def __init__(self, bands: int = STORY_BANDS, rows: int = STORY_ROWS, threshold: float = STORY_JACCARD):
+        import random
+        rnd = random.Random(0x5EED)
+        self.bands = bands
+        self.rows = rows
+        self.threshold = threshold
+        # permutations approchées par XOR de masques aléatoires sur un hash 64 bits
+        self._masks = [rnd.getrandbits(64) for _ in range(bands * rows)]
+        self._np_masks = None  # masques en uint64 NumPy, au premier signature() (import paresseux)
+        self._buckets = {}  # (bande, valeurs) -> [(tokens, story)]
+        self.stories = 0
+        self.merged = 0
+
+    def signature(self, tokens) -> list:
+        # hash() salé par processus: signatures valables en mémoire uniquement (jamais persistées)
+        hs = [hash(w) & _MH_MASK for w in tokens]
+        if self._np_masks is None and _import_numpy() is not None:
+            self._np_masks = np.array(self._masks, dtype=np.uint64)
+        if self._np_masks is not None:
+            return np.bitwise_xor.outer(self._np_masks, np.array(hs, dtype=np.uint64)).min(axis=1).tolist()
+        return [min(map(m.__xor__, hs)) for m in self._masks]
+
+    def add(self, it: Item) -> tuple:
+        tokens = story_tokens(it.title, it.source)
+        story = None
+        keys = ()
+        if len(tokens) >= STORY_MIN_TOKENS:
+            sig = self.signature(tokens)
+            r = self.rows
+            keys = [(b, tuple(sig[b * r:(b + 1) * r])) for b in range(self.bands)]
+            best = self.threshold
+            checked = set()
+            for k in keys:
+                for toks, cand in self._buckets.get(k, ()):
+                    if id(toks) in checked:
+                        continue
+                    checked.add(id(toks))
+                    j = len(tokens & toks) / len(tokens | toks)
+                    if j >= best:
+                        best, story = j, cand
+        new = story is None
+        if new:
+            story = Story(it)
+            self.stories += 1
+        else:
+            story.items.append(it)
+            story.sources.add(it.source)
+            self.merged += 1
+        for k in keys:
+            bucket = self._buckets.setdefault(k, [])
+            bucket.append((tokens, story))
+            if len(bucket) > STORY_BUCKET_MAX:
+                del bucket[:len(bucket) - STORY_BUCKET_MAX // 2]
+        it.story = story
+        return story, new
+
+
+def cluster_items(items, clusterer: StoryClusterer = None) -> list:
+    """Items (triés) -> leads, un par dépêche, dans le même ordre."""
+    if clusterer is None:
+        clusterer = StoryClusterer()
+    return [it for it in items if clusterer.add(it)[1]]
+
+
+class RateLimiter:
+    """Token bucket thread-safe: `rate` requêtes/s en moyenne, rafales jusqu'à `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def scan_queries(queries, mode: str = "FR+EN", workers: int = 8, rate: float = 5.0,
+                 on_result=None, fetcher: FetchEngine = None, cache: FeedCache = None,
+                 seen_by_query: dict = None, fast_parse: bool = None, links: LinkResolver = None) -> dict:
+    """
+    Lance `queries` (déjà construites via build_query) en parallèle sur un pool
+    borné, avec une limite de débit globale sur les requêtes HTTP.
+    on_result(query, items, results) est appelé dès qu'une requête est terminée
+    (depuis le thread appelant, dans l'ordre de complétion).
+    seen_by_query {query: set()} conservé entre appels -> seuls les items nouveaux sont renvoyés.
+    """
+    own = fetcher is None
+    if own:
+        fetcher = FetchEngine(max_workers=workers, limiter=RateLimiter(rate, burst=workers) if rate > 0 else None,
+                              cache=cache, fast_parse=fast_parse, links=links)
+    stats = {"queries": 0, "failed_queries": 0, "failed_requests": 0, "items": 0, "elapsed_s": 0.0}
+
+    def done(q, items, results):
+        n_failed = sum(1 for res in results if not res.ok)
+        stats["queries"] += 1
+        stats["items"] += len(items)
+        stats["failed_requests"] += n_failed
+        if n_failed == len(results):
+            stats["failed_queries"] += 1
+        if on_result is not None:
+            on_result(q, items, results)
+
+    def seen_for(q):
+        return None if seen_by_query is None else seen_by_query.setdefault(q, set())
+
+    t0 = time.perf_counter()
+    try:
+        if workers <= 1:
+            # tout dans le thread appelant (séquentiel; c'est aussi ce que voit cProfile)
+            for q in queries:
+                done(q, *fetch_query(fetcher, edition_urls(q, mode), False, seen_for(q)))
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rss-scan") as pool:
+                futures = {pool.submit(fetch_query, fetcher, edition_urls(q, mode), False, seen_for(q)): q
+                           for q in queries}
+                for fut in as_completed(futures):
+                    done(futures[fut], *fut.result())
+    finally:
+        if own:
+            fetcher.close()
+    el = time.perf_counter() - t0
+    stats["elapsed_s"] = round(el, 3)
+    stats["queries_per_s"] = round(stats["queries"] / max(el, 1e-9), 2)
+    stats["items_per_s"] = round(stats["items"] / max(el, 1e-9), 2)
+    if fetcher.cache is not None:
+        stats["cache"] = fetcher.cache.stats()
+    if fetcher.links is not None:
+        stats["links"] = fetcher.links.stats()
+    return stats
+
+
+# -----------------------------
+# Planificateur asyncio (requêtes sauvegardées, intervalle par requête)
+# -----------------------------
+SCHED_INTERVAL = 300.0      # s entre deux passages d'une requête (défaut)
+SCHED_RATE = 1.0            # requêtes HTTP/s par hôte (moyenne)
+SCHED_BURST = 2
+SCHED_BACKOFF_BASE = 5.0    # 429 / 5xx: 1er délai ~[2.5, 5] s, doublé à chaque échec consécutif
+SCHED_BACKOFF_MAX = 600.0
+SCHED_BOOST_SCORE = 3       # un nouvel item à |score| >= 3 rend la requête "chaude"
+SCHED_BOOST_FACTOR = 0.5    # requête chaude: intervalle x 0.5 et passe devant les autres
+SCHED_BOOST_RUNS = 3        # passages boostés après le dernier item fort
+
+
+def backoff_delay(attempt: int, base: float = SCHED_BACKOFF_BASE, cap: float = SCHED_BACKOFF_MAX,
+                  rnd=None) -> float:
+    """Backoff exponentiel à jitter: uniforme dans [d/2, d], d = min(cap, base * 2^(attempt-1))."""
+    import random
+    d = min(cap, base * (2 ** max(0, attempt - 1)))
+    return d / 2 + (rnd or random).uniform(0, d / 2)
+
+
+def _http_status(err):
+    return getattr(getattr(err, "response", None), "status_code", None)
+
+
+def _retry_after(err) -> float:
+    """En-tête Retry-After (secondes) d'une erreur HTTP, 0 si absent / date HTTP."""
+    try:
+        return max(0.0, float(err.response.headers.get("Retry-After", 0)))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket pour la boucle asyncio (un par hôte). Les demandeurs sont servis dans
+    l'ordre d'arrivée (asyncio.Lock est équitable): pas de famine sous contention.
+    penalize(delay) bloque l'hôte jusqu'à maintenant + delay (backoff 429 / 5xx).
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self.blocked_until = 0.0
+        self.failures = 0
+        self._last = time.monotonic()
+        self._lock = None  # créé dans la boucle asyncio
+
+    async def acquire(self) -> float:
+        """Attend un jeton (et la fin d'un éventuel backoff) -> secondes attendues."""
+        import asyncio
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            return await self._take()
+
+    async def _take(self) -> float:
+        import asyncio
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            wait = self.blocked_until - now
+            if wait <= 0:
+                if self.rate <= 0:
+                    return waited
+                self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def penalize(self, delay: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+
+class SavedQuery:
+    """Requête sauvegardée (construite via build_query) + son état de planification."""
+    __slots__ = ("query", "mode", "interval", "runs", "failures", "boost", "last_strength", "next_due", "seen")
+
+    def __init__(self, query: str, interval: float = SCHED_INTERVAL, mode: str = "FR+EN"):
+        self.query = query
+        self.mode = mode
+        self.interval = float(interval)
+        self.runs = 0
+        self.failures = 0
+        self.boost = 0            # passages boostés restants
+        self.last_strength = 0    # max |score| des nouveaux items du dernier passage
+        self.next_due = None      # horloge de la boucle asyncio
+        self.seen = set()         # clés dedup_key déjà émises
+
+    @property
+    def priority(self) -> int:
+        return self.last_strength if self.boost else 0
+
+    def effective_interval(self) -> float:
+        return self.interval * (SCHED_BOOST_FACTOR if self.boost else 1.0)
+
+
+class QueryScheduler:
+    """
+    Relance chaque requête sauvegardée à son propre intervalle, sur une boucle asyncio:
+    - token bucket par hôte avant chaque requête HTTP (AsyncTokenBucket)
+    - 429 / 5xx: backoff exponentiel avec jitter, sur l'hôte (Retry-After respecté)
+      et sur la requête (relancée avant son intervalle normal, puis de plus en plus tard)
+    - priorité: une requête dont les nouveaux items ont un |score| >= SCHED_BOOST_SCORE
+      passe devant les autres requêtes dues et revient deux fois plus vite
+      pendant SCHED_BOOST_RUNS passages
+    - exception pendant un passage (parsing, scoring, on_result): journalisée sur stderr,
+      comptée (sched_errors), la requête repart en backoff; les autres continuent
+    - METRICS: sched_lag (retard au démarrage, histogramme), jauges sched_queue_depth /
+      sched_running, compteurs sched_runs / sched_throttled / sched_backoff_s / sched_errors
+    Les requêtes HTTP restent celles de FetchEngine (requests), exécutées dans un pool de
+    threads; on_result(query, items, results) est appelé depuis le thread de la boucle.
+    `url_for(query, mode)` -> [(label, url)] (défaut: edition_urls).
+    """
+
+    def __init__(self, workers: int = 4, rate: float = SCHED_RATE, burst: int = SCHED_BURST,
+                 on_result=None, fetcher: FetchEngine = None, cache: FeedCache = None,
+                 fast_parse: bool = None, url_for=None, backoff_base: float = SCHED_BACKOFF_BASE,
+                 backoff_max: float = SCHED_BACKOFF_MAX, seed: int = None, links: LinkResolver = None):
+        import random
+        self.workers = max(1, int(workers))
+        self.rate = rate
+        self.burst = burst
+        self.on_result = on_result
+        self._own = fetcher is None
+        self.fetcher = fetcher or FetchEngine(max_workers=2 * self.workers, cache=cache, fast_parse=fast_parse,
+                                              links=links)
+        self.url_for = url_for or edition_urls
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jobs = []
+        self.hosts = {}
+        self._rnd = random.Random(seed)
+        self._pool = ThreadPoolExecutor(max_workers=2 * self.workers, thread_name_prefix="rss-sched")
+        self._seq = itertools.count()
+        self._wake = None
+        self._timeline = []
+        self._stats = {"runs": 0, "items": 0, "failed_requests": 0, "throttled": 0, "errors": 0,
+                       "max_queue_depth": 0}
+
+    def add(self, query: str, interval: float = SCHED_INTERVAL, mode: str = "FR+EN") -> SavedQuery:
+        job = SavedQuery(query, interval, mode)
+        self.jobs.append(job)
+        return job
+
+    def _bucket(self, url: str) -> AsyncTokenBucket:
+        from urllib.parse import urlsplit
+        host = urlsplit(url).netloc
+        b = self.hosts.get(host)
+        if b is None:
+            b = self.hosts[host] = AsyncTokenBucket(self.rate, self.burst)
+        return b
+
+    async def _fetch(self, label: str, url: str) -> FetchResult:
+        import asyncio
+        bucket = self._bucket(url)
+        with METRICS.timer("rate_wait"):
+            await bucket.acquire()
+        res = await asyncio.get_running_loop().run_in_executor(self._pool, self.fetcher._fetch_result, label, url)
+        status = _http_status(res.error)
+        if status == 429 or (status is not None and status >= 500):
+            bucket.failures += 1
+            delay = max(_retry_after(res.error),
+                        backoff_delay(bucket.failures, self.backoff_base, self.backoff_max, self._rnd))
+            bucket.penalize(delay)
+            self._stats["throttled"] += 1
+            METRICS.inc("sched_throttled")
+            METRICS.inc("sched_backoff_s", round(delay, 3))
+        elif res.ok:
+            bucket.failures = 0
+        return res
+
+    def _items(self, job: SavedQuery, results) -> list:
+        links = self.fetcher.links
+        items = []
+        for res in results:
+            items.extend(items_from_entries(res.entries, job.seen, links))
+        if links is not None:
+            items = links.resolve_items(items, job.seen)
+        return sort_items(items)
+
+    async def _run(self, job: SavedQuery, due: float):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        METRICS.observe("sched_lag", max(0.0, loop.time() - due))
+        delay = job.effective_interval()
+        try:
+            with METRICS.timer("sched_run"):
+                results = await asyncio.gather(*(self._fetch(lab, url) for lab, url in self.url_for(job.query, job.mode)))
+                items = await loop.run_in_executor(self._pool, self._items, job, results)
+            n_failed = sum(1 for res in results if not res.ok)
+            job.runs += 1
+            self._stats["runs"] += 1
+            self._stats["items"] += len(items)
+            self._stats["failed_requests"] += n_failed
+            METRICS.inc("sched_runs")
+
+            strength = max((abs(it.score) for it in items), default=0)
+            if strength >= SCHED_BOOST_SCORE:
+                job.boost = SCHED_BOOST_RUNS
+                job.last_strength = strength
+            elif job.boost:
+                job.boost -= 1
+            if n_failed:
+                job.failures += 1
+                delay = min(job.effective_interval(),
+                            backoff_delay(job.failures, self.backoff_base, self.backoff_max, self._rnd))
+            else:
+                job.failures = 0
+                delay = job.effective_interval()
+            if self.on_result is not None:
+                self.on_result(job.query, items, results)
+        except Exception as e:
+            # erreur de parsing / scoring / callback: la requête repart en backoff, la boucle continue
+            job.failures += 1
+            self._stats["errors"] += 1
+            METRICS.inc("sched_errors")
+            delay = min(job.effective_interval(),
+                        backoff_delay(job.failures, self.backoff_base, self.backoff_max, self._rnd))
+            print(f"[sched] {job.query}: {type(e).__name__}: {e} (relance dans {delay:.1f}s)", file=sys.stderr)
+        finally:
+            job.next_due = loop.time() + delay
+            heapq.heappush(self._timeline, (job.next_due, next(self._seq), job))
+
+    async def run(self, duration: float = None, max_runs: int = None):
+        """Boucle de planification; s'arrête après `duration` s ou `max_runs` passages (sinon jamais)."""
+        import asyncio
+        if not self.jobs:
+            return
+        loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        now = loop.time()
+        end = None if duration is None else now + duration
+        self._timeline = []
+        for job in self.jobs:
+            if job.next_due is None:
+                job.next_due = now
+            heapq.heappush(self._timeline, (job.next_due, next(self._seq), job))
+        ready, running = [], set()
+        started = 0
+        try:
+            while True:
+                now = loop.time()
+                if end is not None and now >= end:
+                    break
+                timeline = self._timeline
+                while timeline and timeline[0][0] <= now:
+                    due, seq, job = heapq.heappop(timeline)
+                    heapq.heappush(ready, (-job.priority, due, seq, job))
+                while ready and len(running) < self.workers and (max_runs is None or started < max_runs):
+                    _p, due, _s, job = heapq.heappop(ready)
+                    task = loop.create_task(self._run(job, due))
+                    running.add(task)
+                    task.add_done_callback(lambda t: (running.discard(t), self._wake.set()))
+                    started += 1
+                METRICS.set("sched_queue_depth", len(ready))
+                self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(ready))
+                METRICS.set("sched_running", len(running))
+                if max_runs is not None and started >= max_runs and not running:
+                    break
+                timeout = None
+                if timeline and not (ready and len(running) >= self.workers):
+                    timeout = max(0.0, timeline[0][0] - now)
+                if end is not None:
+                    timeout = end - now if timeout is None else min(timeout, end - now)
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for task in list(running):
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            for _p, due, _s, job in ready:
+                job.next_due = due
+            METRICS.set("sched_queue_depth", 0)
+            METRICS.set("sched_running", 0)
+
+    def run_sync(self, duration: float = None, max_runs: int = None):
+        import asyncio
+        asyncio.run(self.run(duration, max_runs))
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        queries = [{"query": j.query, "interval_s": j.interval, "runs": j.runs, "failures": j.failures,
+                    "boost": j.boost} for j in self.jobs]
+        hosts = {h: {"failures": b.failures, "blocked_s": round(max(0.0, b.blocked_until - now), 2)}
+                 for h, b in self.hosts.items()}
+        st = dict(self._stats, queries=queries, hosts=hosts)
+        if self.fetcher.links is not None:
+            st["links"] = self.fetcher.links.stats()
+        return st
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        if self._own:
+            self.fetcher.close()
+
+
+# -----------------------------
+# Serveur de flux partagé (API JSON, RSS re-publié, long-poll / SSE)
+# -----------------------------
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8765
+SERVE_KEEP = 500               # items gardés par requête (les plus récemment publiés)
+SERVE_LIMIT = 200              # items par réponse JSON / RSS (défaut de ?limit=)
+SERVE_WAIT_MAX = 60.0          # long-poll: attente max (?wait=)
+SERVE_HEARTBEAT_S = 15.0       # SSE: commentaire keep-alive quand rien de neuf
+SERVE_GZIP_MIN = 512           # corps plus petits envoyés non compressés
+SERVE_RENDER_CACHE = 256       # réponses encodées gardées (LRU)
+SERVE_RSS_NS = "urn:rssreader4:sentiment"
+
+
+class FeedHub:
+    """
+    Derniers items scorés par requête, publiés par le planificateur et lus par les
+    clients HTTP. Chaque item publié reçoit un numéro de séquence global croissant:
+    ?since= (JSON, long-poll) et Last-Event-ID (SSE) ne renvoient que ce qui suit.
+    Les réponses sont encodées une fois par état du hub (corps, gzip, ETag calculé sur
+    le contenu) puis servies telles quelles à tous les clients; l'ETag d'une requête
+    ne change que si ses propres items changent (304 pour les autres).
+    """
+
+    def __init__(self, keep: int = SERVE_KEEP):
+        self.keep = max(1, int(keep))
+        self.seq = 0
+        self.queries = {}           # requête -> deque[(seq, Item)], ordre de publication
+        self.updated = {}           # requête -> epoch du dernier passage
+        self.closed = False
+        self._cond = threading.Condition()
+        self._render_lock = threading.Lock()
+        self._render = OrderedDict()
+        self._stats = {"published": 0, "renders": 0, "render_hits": 0}
+
+    def add_query(self, query: str):
+        with self._cond:
+            self.queries.setdefault(query, deque(maxlen=self.keep))
+
+    def publish(self, query: str, items) -> int:
+        """Ajoute les nouveaux items d'un passage (triés par date décroissante) -> dernière séquence."""
+        with self._cond:
+            dq = self.queries.get(query)
+            if dq is None:
+                dq = self.queries[query] = deque(maxlen=self.keep)
+            for it in reversed(items):
+                if not it.query:
+                    it.query = query
+                self.seq += 1
+                dq.append((self.seq, it))
+            self.updated[query] = time.time()
+            self._stats["published"] += len(items)
+            if items:
+                self._cond.notify_all()
+            return self.seq
+
+    def wait(self, since: int, timeout: float) -> int:
+        """Bloque jusqu'à une séquence > since, la fermeture du hub ou `timeout` -> séquence courante."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > since or self.closed, timeout)
+            return self.seq
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def select(self, query: str = None, since: int = 0, limit: int = SERVE_LIMIT, label: str = "",
+               lang: str = "") -> tuple:
+        """-> (séquence du hub, [(seq, Item)]): les `limit` derniers publiés après `since`, ordre de publication."""
+        with self._cond:
+            seq = self.seq
+            sources = self.queries.values() if query is None else [self.queries.get(query, ())]
+            rows = [r for dq in sources for r in dq if r[0] > since]
+        if label or lang:
+            rows = [r for r in rows if (not label or r[1].label == label) and (not lang or r[1].lang == lang)]
+        rows.sort(key=lambda r: r[0])
+        if limit:
+            rows = rows[-limit:]
+        return seq, rows
+
+    def render(self, key: tuple, build) -> tuple:
+        """
+        Réponse encodée pour `key` à l'état courant du hub -> (corps, corps gzip ou None, etag).
+        build(seq) -> bytes; un seul encodage par état, même si des centaines de clients
+        arrivent juste après une publication (les autres attendent puis lisent le cache).
+        """
+        import gzip
+        with self._render_lock:
+            ck = (self.seq,) + key
+            hit = self._render.get(ck)
+            if hit is not None:
+                self._render.move_to_end(ck)
+                self._stats["render_hits"] += 1
+                return hit
+            with METRICS.timer("serve_render"):
+                body = build()
+                gz = gzip.compress(body, 6) if len(body) >= SERVE_GZIP_MIN else None
+            res = (body, gz, '"' + sha1(body).hexdigest()[:20] + '"')
+            self._render[ck] = res
+            while len(self._render) > SERVE_RENDER_CACHE:
+                self._render.popitem(last=False)
+            self._stats["renders"] += 1
+            return res
+
+    def index(self) -> list:
+        with self._cond:
+            return [{"query": q, "items": len(dq), "last_seq": dq[-1][0] if dq else 0,
+                     "updated": self.updated.get(q)} for q, dq in self.queries.items()]
+
+    def stats(self) -> dict:
+        with self._cond:
+            return dict(self._stats, seq=self.seq, queries=len(self.queries),
+                        items=sum(len(dq) for dq in self.queries.values()))
+
+
+def _item_json(seq: int, it: Item) -> dict:
+    d = it.to_dict()
+    d["seq"] = seq
+    return d
+
+
+def render_items_json(rows, query: str = None, since: int = 0) -> bytes:
+    """Réponse /items: items du plus récent au plus ancien; "seq" = curseur pour ?since= suivant."""
+    items = sort_items([it for _s, it in rows])
+    seq_of = {id(it): s for s, it in rows}
+    doc = {"query": query, "seq": rows[-1][0] if rows else since, "count": len(items),
+           "items": [_item_json(seq_of[id(it)], it) for it in items]}
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def render_items_rss(rows, query: str = None, link: str = "") -> bytes:
+    """
+    Flux RSS 2.0 re-publié: titre préfixé du label et du score ("[POS +3] ..."),
+    <category> = label, score / label / langue dans l'espace de noms SERVE_RSS_NS.
+    """
+    from email.utils import format_datetime
+    from xml.sax.saxutils import escape
+    items = sort_items([it for _s, it in rows])
+    title = f"{query} – scoré" if query else "Toutes les requêtes – scoré"
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>',
+             f'<rss version="2.0" xmlns:s="{SERVE_RSS_NS}"><channel>',
+             f"<title>{escape(title)}</title><link>{escape(link)}</link>",
+             "<description>Google News RSS – PRO: items scorés (sentiment FR/EN)</description>",
+             "<generator>rssreader4</generator>"]
+    if items and items[0].ts is not None:
+        parts.append(f"<pubDate>{format_datetime(datetime.fromtimestamp(items[0].ts, timezone.utc), usegmt=True)}"
+                     f"</pubDate>")
+    for it in items:
+        parts.append(f"<item><title>{escape(f'[{it.label} {it.score:+d}] {it.title}')}</title>"
+                     f"<link>{escape(it.link)}</link>"
+                     f'<guid isPermaLink="false">{dedup_key(it.title, it.link)}</guid>')
+        if it.ts is not None:
+            parts.append(f"<pubDate>{format_datetime(datetime.fromtimestamp(it.ts, timezone.utc), usegmt=True)}"
+                         f"</pubDate>")
+        if it.source:
+            parts.append(f"<author>{escape(it.source)}</author>")
+        parts.append(f"<category>{escape(it.label)}</category>"
+                     f"<description>{escape(f'{it.label} {it.score:+d} · {it.lang} · {it.source}')}</description>"
+                     f"<s:score>{it.score}</s:score><s:label>{escape(it.label)}</s:label>"
+                     f"<s:lang>{escape(it.lang)}</s:lang><s:query>{escape(it.query)}</s:query></item>")
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+class FeedServer:
+    """
+    Serveur HTTP (thread par connexion, keep-alive) au-dessus d'un FeedHub:
+      GET /                 requêtes servies (nb d'items, dernière séquence, dernier passage)
+      GET /items            JSON; ?q= &since= &limit= &label= &lang= ; &wait=S: long-poll
+      GET /rss              RSS 2.0 re-publié (mêmes filtres que /items, sans since)
+      GET /events           Server-Sent Events (event: item, id: séquence); Last-Event-ID
+                            ou ?since= pour reprendre, sinon uniquement les nouveaux items
+      GET /stats, /metrics  état du hub / du planificateur (JSON), METRICS (Prometheus)
+    /items et /rss: ETag + If-None-Match (304), gzip si Accept-Encoding le permet.
+    `stats`: f() -> dict ajouté à /stats (ex: QueryScheduler.stats).
+    """
+
+    def __init__(self, hub: FeedHub, host: str = SERVE_HOST, port: int = SERVE_PORT, stats=None,
+                 heartbeat: float = SERVE_HEARTBEAT_S):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        from urllib.parse import urlsplit, parse_qs
+        server = self
+        self.hub = hub
+        self.heartbeat = heartbeat
+        self._stats = stats
+        self._sse = 0
+        self._lock = threading.Lock()
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            server_version = "rssreader4"
+
+            def log_message(self, *_a):
+                pass
+
+            def do_GET(self):
+                METRICS.inc("serve_requests")
+                parts = urlsplit(self.path)
+                route = getattr(server, "_get_" + parts.path.strip("/").replace("/", "_"), None)
+                if parts.path == "/":
+                    route = server._get_index
+                if route is None:
+                    self.send_error(404)
+                    return
+                params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+                try:
+                    with METRICS.timer("serve"):
+                        route(self, params)
+                except ValueError as e:
+                    self.send_error(400, str(e))
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+
+        class _Server(ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 256
+
+        self._httpd = _Server((host, port), _Handler)
+        self.url = f"http://{host}:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True, name="rss-serve")
+
+    def start(self) -> "FeedServer":
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.hub.close()  # libère long-polls et flux SSE
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    # -- réponses
+    @staticmethod
+    def _send(h, body: bytes, ctype: str, etag: str = None, gz: bytes = None):
+        use_gz = gz is not None and "gzip" in h.headers.get("Accept-Encoding", "")
+        if etag is not None:
+            # variante gzip: même ETag suffixé "-gz" (une représentation = un ETag)
+            tag = etag[:-1] + '-gz"' if use_gz else etag
+            inm = h.headers.get("If-None-Match", "")
+            if inm.strip() == "*" or etag in [t.strip().removeprefix("W/").replace('-gz"', '"')
+                                              for t in inm.split(",")]:
+                METRICS.inc("serve_not_modified")
+                h.send_response(304)
+                h.send_header("ETag", tag)
+                h.send_header("Content-Length", "0")
+                h.end_headers()
+                return
+            etag = tag
+        h.send_response(200)
+        if use_gz:
+            METRICS.inc("serve_gzip")
+            body = gz
+            h.send_header("Content-Encoding", "gzip")
+        h.send_header("Content-Type", ctype)
+        h.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            h.send_header("ETag", etag)
+            h.send_header("Cache-Control", "no-cache")
+            h.send_header("Vary", "Accept-Encoding")
+        h.end_headers()
+        h.wfile.write(body)
+
+    def _send_json(self, h, doc):
+        self._send(h, json.dumps(doc, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+    @staticmethod
+    def _num(params: dict, name: str, default: int = 0, hi: float = None):
+        try:
+            v = float(params.get(name, default))
+        except ValueError:
+            raise ValueError(f"{name}: nombre attendu") from None
+        if v < 0:
+            raise ValueError(f"{name}: doit être >= 0")
+        return min(v, hi) if hi is not None else int(v)
+
+    def _filters(self, params: dict) -> tuple:
+        q = params.get("q") or None
+        if q is not None and q not in self.hub.queries:
+            raise ValueError(f"requête inconnue: {q}")
+        label, lang = params.get("label", ""), params.get("lang", "")
+        if label not in ("", "POS", "NEU", "NEG") or lang not in ("", "fr", "en"):
+            raise ValueError("label: POS|NEU|NEG, lang: fr|en")
+        return q, label, lang
+
+    # -- routes
+    def _get_index(self, h, _params):
+        self._send_json(h, {"queries": self.hub.index(), "seq": self.hub.seq,
+                            "endpoints": ["/items", "/rss", "/events", "/stats", "/metrics"]})
+
+    def _get_items(self, h, params):
+        q, label, lang = self._filters(params)
+        since = self._num(params, "since")
+        limit = self._num(params, "limit", SERVE_LIMIT)
+        wait = self._num(params, "wait", 0, hi=SERVE_WAIT_MAX)
+        if wait:
+            # long-poll: rend la main dès qu'un item correspondant est publié
+            deadline = time.monotonic() + wait
+            cur, rows = self.hub.select(q, since, 1, label, lang)
+            while not rows and not self.hub.closed and time.monotonic() < deadline:
+                cur = self.hub.wait(cur, deadline - time.monotonic())
+                _cur, rows = self.hub.select(q, since, 1, label, lang)
+        body, gz, etag = self.hub.render(
+            ("items", q, since, limit, label, lang),
+            lambda: render_items_json(self.hub.select(q, since, limit, label, lang)[1], q, since))
+        self._send(h, body, "application/json; charset=utf-8", etag, gz)
+
+    def _get_rss(self, h, params):
+        q, label, lang = self._filters(params)
+        limit = self._num(params, "limit", SERVE_LIMIT)
+        link = self.url + h.path
+        body, gz, etag = self.hub.render(
+            ("rss", q, limit, label, lang),
+            lambda: render_items_rss(self.hub.select(q, 0, limit, label, lang)[1], q, link))
+        self._send(h, body, "application/rss+xml; charset=utf-8", etag, gz)
+
+    def _get_events(self, h, params):
+        q, label, lang = self._filters(params)
+        last = h.headers.get("Last-Event-ID") or params.get("since")
+        try:
+            since = self.hub.seq if last is None else max(0, int(last))
+        except ValueError:
+            raise ValueError("Last-Event-ID / since: entier attendu") from None
+        h.send_response(200)
+        h.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        h.send_header("Cache-Control", "no-cache")
+        h.send_header("Connection", "close")
+        h.end_headers()
+        h.close_connection = True
+        with self._lock:
+            self._sse += 1
+            METRICS.set("serve_sse_clients", self._sse)
+        try:
+            h.wfile.write(f"retry: 3000\nevent: hello\ndata: {json.dumps({'seq': since})}\n\n".encode("utf-8"))
+            h.wfile.flush()
+            while not self.hub.closed:
+                cur, rows = self.hub.select(q, since, 0, label, lang)
+                if rows:
+                    h.wfile.write("".join(
+                        f"id: {s}\nevent: item\ndata: {json.dumps(_item_json(s, it), ensure_ascii=False)}\n\n"
+                        for s, it in rows).encode("utf-8"))
+                    h.wfile.flush()
+                    METRICS.inc("serve_sse_events", len(rows))
+                since = cur
+                if self.hub.wait(since, self.heartbeat) == since and not self.hub.closed:
+                    h.wfile.write(b": ping\n\n")
+                    h.wfile.flush()
+        finally:
+            with self._lock:
+                self._sse -= 1
+                METRICS.set("serve_sse_clients", self._sse)
+
+    def _get_stats(self, h, _params):
+        doc = {"hub": self.hub.stats(), "sse_clients": self._sse}
+        if self._stats is not None:
+            doc["scheduler"] = self._stats()
+        self._send_json(h, doc)
+
+    def _get_metrics(self, h, _params):
+        self._send(h, METRICS.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+
+
+# -----------------------------
+# Export (CSV / JSONL / Parquet) + writer en arrière-plan
+# -----------------------------
+EXPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".parquet": "parquet", ".json": "columns"}
+
+
+def export_format_for(path: str) -> str:
+    return EXPORT_FORMATS.get(os.path.splitext(path)[1].lower(), "csv")
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except Exception:
+        return None
+    return pyarrow
+
+
+class _CsvSink:
+    def __init__(self, f, fresh: bool):
+        self.f = f
+        self.w = csv.writer(f)
+        if fresh:
+            self.w.writerow(CSV_FIELDS)
+
+    def write(self, items, query: str):
+        self.w.writerows(item_row(it, query) for it in items)
+        self.f.flush()
+
+    def close(self):
+        pass
+
+
+class _JsonlSink:
+    def __init__(self, f, fresh: bool):
+        self.f = f
+
+    def write(self, items, query: str):
+        dumps = json.dumps
+        self.f.writelines(dumps(dict(zip(CSV_FIELDS, item_row(it, query))), ensure_ascii=False) + "\n"
+                          for it in items)
+        self.f.flush()
+
+    def close(self):
+        pass
+
+
+class _ParquetSink:
+    """
+    Un row group par lot écrit: l'ajout continu ne réécrit jamais le fichier.
+    append=True sur un fichier existant: ses lignes sont relues et recopiées en tête
+    d'un fichier temporaire qui remplace l'original à la fermeture (un Parquet n'a
+    pas d'ajout en place). ValueError si le fichier n'est pas un export de ce schéma.
+    """
+
+    def __init__(self, path: str, pa, append: bool = False):
+        self.pa = pa
+        self.path = path
+        self.schema = pa.schema([
+            ("dt_utc", pa.timestamp("s", tz="UTC")), ("dt_local", pa.string()),
+            ("lang", pa.string()), ("label", pa.string()), ("score", pa.int32()),
+            ("source", pa.string()), ("title", pa.string()), ("url", pa.string()), ("query", pa.string()),
+        ])
+        old = None
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            try:
+                old = pa.parquet.read_table(path)
+                old = old.select(CSV_FIELDS).cast(self.schema)
+            except Exception as e:
+                raise ValueError(f"{path}: ajout impossible, pas un export Parquet compatible ({e})") from None
+        self._tmp = path + ".tmp" if old is not None else None
+        self.w = pa.parquet.ParquetWriter(self._tmp or path, self.schema)
+        if old is not None:
+            self.w.write_table(old)
+
+    def write(self, items, query: str):
+        rows = [item_row(it, query) for it in items]
+        cols = [list(c) for c in zip(*rows)] if rows else [[] for _ in CSV_FIELDS]
+        cols[0] = [it.ts for it in items]
+        self.w.write_table(self.pa.Table.from_arrays(cols, schema=self.schema))
+
+    def close(self):
+        self.w.close()
+        if self._tmp is not None:
+            os.replace(self._tmp, self.path)
+
+
+class _ColumnsJsonSink:
+    """
+    Repli colonnaire sans pyarrow: {"columns": [...], "data": {col: [...]}} écrit à la fermeture.
+    append=True: les colonnes d'un fichier existant sont relues et complétées (ValueError
+    si ce n'est pas un export colonnaire).
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.data = {c: [] for c in CSV_FIELDS}
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    doc = json.load(f)
+                data = doc["data"]
+                ok = doc["columns"] == CSV_FIELDS and len({len(data[c]) for c in CSV_FIELDS}) == 1
+            except (OSError, ValueError, KeyError, TypeError):
+                ok = False
+            if not ok:
+                raise ValueError(f"{path}: ajout impossible, pas un export JSON colonnaire")
+            self.data = {c: list(data[c]) for c in CSV_FIELDS}
+
+    def write(self, items, query: str):
+        cols = [self.data[c] for c in CSV_FIELDS]
+        for it in items:
+            for col, v in zip(cols, item_row(it, query)):
+                col.append(v)
+
+    def close(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"columns": CSV_FIELDS, "data": self.data}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+class ExportWriter:
+    """
+    Écriture d'items vers `path` au format csv | jsonl | parquet | columns (JSON colonnaire).
+    append=True: ajoute à un CSV/JSONL existant (pas de ré-écriture); Parquet et JSON
+    colonnaire reprennent les lignes existantes (fichier remplacé à la fermeture),
+    ValueError si le fichier existant n'a pas ce format. Parquet sans pyarrow -> repli
+    JSON colonnaire (même nom, extension .json), signalé par `fallback`.
+    """
+
+    def __init__(self, path: str, fmt: str = None, append: bool = False, stream=None):
+        self.fmt = fmt or export_format_for(path)
+        self.path = path
+        self.fallback = ""
+        self._f = None
+        if self.fmt == "parquet":
+            pa = _import_pyarrow()
+            if pa is not None:
+                self.sink = _ParquetSink(path, pa, append)
+                return
+            self.fallback = "pyarrow absent: export JSON colonnaire"
+            self.fmt = "columns"
+            self.path = os.path.splitext(path)[0] + ".json"
+        if self.fmt == "columns":
+            self.sink = _ColumnsJsonSink(self.path, append)
+            return
+        if stream is not None:
+            f, fresh = stream, True
+        else:
+            fresh = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+            f = self._f = open(path, "a" if append else "w", newline="", encoding="utf-8")
+        self.sink = _CsvSink(f, fresh) if self.fmt == "csv" else _JsonlSink(f, fresh)
+
+    def write(self, items, query: str = ""):
+        self.sink.write(items, query)
+
+    def close(self):
+        try:
+            self.sink.close()
+        finally:
+            if self._f is not None:
+                self._f.close()
+
+
+class BackgroundExporter:
+    """
+    Thread d'écriture dédié: submit() met un lot en file et rend la main tout de
+    suite (thread Tk libre). on_progress(écrits, soumis) est appelé depuis le
+    thread d'écriture; on_done(erreur|None) à la fermeture. Après une erreur
+    d'écriture, le writer est fermé et submit() lève l'erreur (RuntimeError)
+    au lieu de mettre en file des lots qui ne seraient jamais écrits.
+    """
+
+    CHUNK = 2000
+
+    def __init__(self, writer: ExportWriter, on_progress=None, on_done=None):
+        self.writer = writer
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.submitted = 0
+        self.written = 0
+        self.error = None
+        self._q = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="rss-export", daemon=True)
+        self._thread.start()
+
+    def submit(self, items, query: str = ""):
+        if self.error is not None:
+            raise RuntimeError(f"export interrompu: {self.error}") from self.error
+        items = list(items)
+        self.submitted += len(items)
+        self._q.put((items, query))
+
+    def close(self):
+        """Termine l'écriture de la file puis ferme le fichier (non bloquant)."""
+        self._q.put(None)
+
+    def join(self, timeout: float = None):
+        self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            while True:
+                job = self._q.get()
+                if job is None:
+                    break
+                items, query = job
+                for i in range(0, len(items), self.CHUNK):
+                    chunk = items[i:i + self.CHUNK]
+                    self.writer.write(chunk, query)
+                    self.written += len(chunk)
+                    if self.on_progress is not None:
+                        self.on_progress(self.written, self.submitted)
+        except Exception as e:
+            self.error = e
+        finally:
+            try:
+                self.writer.close()
+            except Exception as e:
+                self.error = self.error or e
+            if self.on_done is not None:
+                self.on_done(self.error)
+
+
+# -----------------------------
+# Historique SQLite
+# -----------------------------
+STORE_BATCH = 5000
+
+
+def default_data_dir() -> str:
+    base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "rssreader4")
+
+
+class ArticleStore:
+    """
+    Stockage local des items scorés (SQLite, WAL). Clé primaire = dedup_key;
+    index sur dt / query / label / lang / source pour les requêtes d'historique
+    (dt = epoch UTC; 0 pour une date absente, relu comme ts=None).
+    Écritures par lots (executemany dans une transaction), upsert: le score /
+    label / langue sont mis à jour, first_seen conservé. articles.query garde la
+    première requête; article_queries liste toutes celles qui ont ramené l'article
+    (un même article remonte souvent sous AVGO et sous NVDA), history(query=)
+    filtre sur cette table.
+    """
+
+    VERSION = 1  # PRAGMA user_version; 0 = base d'avant article_queries (migrée à l'ouverture)
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS articles (
+            key        TEXT PRIMARY KEY,
+            dt         INTEGER NOT NULL,
+            query      TEXT NOT NULL DEFAULT '',
+            lang       TEXT NOT NULL DEFAULT '',
+            label      TEXT NOT NULL DEFAULT '',
+            score      INTEGER NOT NULL DEFAULT 0,
+            source     TEXT NOT NULL DEFAULT '',
+            title      TEXT NOT NULL DEFAULT '',
+            link       TEXT NOT NULL DEFAULT '',
+            first_seen INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_articles_dt ON articles(dt);
+        CREATE INDEX IF NOT EXISTS idx_articles_query ON articles(query, dt);
+        CREATE INDEX IF NOT EXISTS idx_articles_label ON articles(label, dt);
+        CREATE INDEX IF NOT EXISTS idx_articles_lang ON articles(lang, dt);
+        CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source, dt);
+        CREATE TABLE IF NOT EXISTS article_queries (
+            query TEXT NOT NULL,
+            key   TEXT NOT NULL,
+            PRIMARY KEY (query, key)
+        ) WITHOUT ROWID;
+    """
+
+    UPSERT = """
+        INSERT INTO articles (key, dt, query, lang, label, score, source, title, link, first_seen)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(key) DO UPDATE SET
+            dt = excluded.dt, lang = excluded.lang, label = excluded.label, score = excluded.score,
+            source = excluded.source, title = excluded.title, link = excluded.link
+    """
+
+    MEMBER = "INSERT OR IGNORE INTO article_queries (query, key) VALUES (?, ?)"
+
+    def __init__(self, path: str = None):
+        import sqlite3
+        self.path = path or os.path.join(default_data_dir(), "articles.db")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA cache_size=-65536")  # 64 Mo: les index restent en cache pendant les gros upserts
+        self.db.executescript(self.SCHEMA)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < self.VERSION:
+            with self.db:
+                self.db.execute("INSERT OR IGNORE INTO article_queries (query, key) "
+                                "SELECT query, key FROM articles WHERE query != ''")
+                self.db.execute(f"PRAGMA user_version = {self.VERSION}")
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+    @staticmethod
+    def _row(it: Item, query: str, now: int) -> tuple:
+        ts = it.ts
+        return (dedup_key(it.title, it.link), 0 if ts is None else ts, query,
+                it.lang, it.label, int(it.score), it.source, it.title, it.link, now)
+
+    def upsert_rows(self, rows) -> int:
+        """rows: tuples (key, dt, query, lang, label, score, source, title, link, first_seen)."""
+        n = 0
+        it = iter(rows)
+        with self._lock:
+            while True:
+                batch = list(itertools.islice(it, STORE_BATCH))
+                if not batch:
+                    break
+                with self.db:
+                    self.db.executemany(self.UPSERT, batch)
+                    self.db.executemany(self.MEMBER, [(r[2], r[0]) for r in batch if r[2]])
+                n += len(batch)
+        return n
+
+    def upsert(self, items, query: str = "") -> int:
+        now = int(time.time())
+        return self.upsert_rows(self._row(it, query, now) for it in items)
+
+    def rescore(self, rows) -> int:
+        """rows: tuples (score, label, lang, key) -> articles déjà stockés mis à jour (lexiques rechargés)."""
+        n = 0
+        it = iter(rows)
+        with self._lock:
+            while True:
+                batch = list(itertools.islice(it, STORE_BATCH))
+                if not batch:
+                    break
+                with self.db:
+                    n += self.db.executemany("UPDATE articles SET score = ?, label = ?, lang = ? WHERE key = ?",
+                                             batch).rowcount
+        return n
+
+    def known_keys(self, keys) -> set:
+        keys = list(keys)
+        found = set()
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                found.update(k for (k,) in self.db.execute(
+                    f"SELECT key FROM articles WHERE key IN ({marks})", chunk))
+        return found
+
+    def history(self, since: datetime = None, until: datetime = None, query: str = None,
+                label: str = None, lang: str = None, source: str = None, limit: int = None):
+        """
+        Items triés par date décroissante. Item.query = requête filtrée (toute requête
+        ayant ramené l'article, via article_queries), sinon la première requête.
+        """
+        where, args = [], []
+        if since is not None:
+            where.append("a.dt >= ?")
+            args.append(int(since.timestamp()))
+        if until is not None:
+            where.append("a.dt < ?")
+            args.append(int(until.timestamp()))
+        for col, val in (("label", label), ("lang", lang), ("source", source)):
+            if val:
+                where.append(f"a.{col} = ?")
+                args.append(val)
+        if query:
+            # requête exacte, ou suivie d'opérateurs ("AVGO when:1d"): plage indexable sur article_queries
+            sql = ("SELECT a.dt, a.title, a.source, a.link, a.score, a.label, a.lang, MIN(m.query) "
+                   "FROM article_queries m JOIN articles a ON a.key = m.key")
+            where.insert(0, "(m.query = ? OR (m.query >= ? AND m.query < ?))")
+            args[:0] = (query, query + " ", query + "!")
+        else:
+            sql = "SELECT a.dt, a.title, a.source, a.link, a.score, a.label, a.lang, a.query FROM articles a"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if query:
+            sql += " GROUP BY a.key"
+        sql += " ORDER BY a.dt DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self.db.execute(sql, args).fetchall()
+        return [Item(dt or None, t, src, ln, sc, lab, lg, q) for dt, t, src, ln, sc, lab, lg, q in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+
+def history_range(after: str, before: str, default_days: int = 7):
+    """Bornes [since, until) UTC depuis des dates YYYY-MM-DD (until exclusif, comme before:)."""
+    def day(s):
+        return datetime.strptime(s, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+    until = day(before) if before else None
+    if after:
+        since = day(after)
+    else:
+        since = (until or datetime.now(timezone.utc)) - timedelta(days=default_days)
+    return since, until
+
+
+def open_article_store(path: str = None):
+    """ArticleStore, ou None si la base n'est pas ouvrable (disque en lecture seule, etc.)."""
+    try:
+        return ArticleStore(path)
+    except Exception:
+        return None
+
+
+# -----------------------------
+# Scoring multi-process (backfill d'archives)
+# -----------------------------
+SCORE_CHUNK = 5000  # titres par tâche envoyée à un worker
+
+
+def _score_worker_init(priors: dict, lexicons=None):
+    # lexiques compilés (et BatchScorer) construits une seule fois par processus;
+    # a priori de langue figé = celui du parent -> résultats indépendants du découpage
+    global _LANG_DETECTOR
+    _LANG_DETECTOR = LangDetector(priors=priors)
+    if lexicons is not None:
+        # mêmes packs que le parent, relus depuis le cache compilé
+        path, sectors = lexicons
+        install_lexicons(load_lexicons(path, sectors), path, sectors)
+    score_batch(["init"], [""], learn=False)
+
+
+def _score_chunk(chunk):
+    titles, sources = chunk
+    t0 = time.process_time()
+    scores, labels, langs = score_batch(titles, sources, learn=False)
+    if np is not None:
+        scores, labels, langs = scores.tolist(), labels.tolist(), langs.tolist()
+    return scores, labels, langs, os.getpid(), time.process_time() - t0
+
+
+class ScoringPool:
+    """
+    Scoring par lots de SCORE_CHUNK titres sur un pool de processus (hors GIL).
+    L'ordre d'entrée est conservé; au plus 2 lots par worker sont en vol, ce qui
+    borne la mémoire sur un flux d'archives. workers=0 -> scoring dans le processus.
+    """
+
+    def __init__(self, workers: int = None, chunk: int = SCORE_CHUNK):
+        self.workers = (os.cpu_count() or 1) if workers is None else max(0, workers)
+        self.chunk = max(1, chunk)
+        self._pool = None
+        if self.workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_score_worker_init,
+                                             initargs=(get_lang_detector().priors(), lexicon_spec()))
+        self._lock = threading.Lock()
+        self._per_worker = {}  # pid -> [items, cpu_s]
+        self._items = 0
+        self._t0 = None
+
+    def _account(self, res) -> tuple:
+        scores, labels, langs, pid, cpu = res
+        with self._lock:
+            acc = self._per_worker.setdefault(pid, [0, 0.0])
+            acc[0] += len(scores)
+            acc[1] += cpu
+            self._items += len(scores)
+        return scores, labels, langs
+
+    def _results(self, chunks):
+        if self._t0 is None:
+            self._t0 = time.perf_counter()
+        if self._pool is None:
+            for c in chunks:
+                yield self._account(_score_chunk(c))
+            return
+        pending = deque()
+        for c in chunks:
+            pending.append(self._pool.submit(_score_chunk, c))
+            if len(pending) >= 2 * self.workers:
+                yield self._account(pending.popleft().result())
+        while pending:
+            yield self._account(pending.popleft().result())
+
+    def score(self, titles, sources=None) -> tuple:
+        """-> (scores, labels, langs) en listes, dans l'ordre de `titles`."""
+        if sources is None:
+            sources = [""] * len(titles)
+        step = self.chunk
+        chunks = ((titles[i:i + step], sources[i:i + step]) for i in range(0, len(titles), step))
+        scores, labels, langs = [], [], []
+        for sc, lab, lg in self._results(chunks):
+            scores.extend(sc)
+            labels.extend(lab)
+            langs.extend(lg)
+        return scores, labels, langs
+
+    def score_items(self, items):
+        """Itérable d'items (title/source) -> lots d'items complétés (score/label/lang), dans l'ordre."""
+        batches = deque()
+
+        def chunks():
+            it = iter(items)
+            while True:
+                batch = list(itertools.islice(it, self.chunk))
+                if not batch:
+                    return
+                batches.append(batch)
+                yield [x.title for x in batch], [x.source for x in batch]
+
+        for scores, labels, langs in self._results(chunks()):
+            batch = batches.popleft()
+            for x, sc, lab, lg in zip(batch, scores, labels, langs):
+                x.score = sc
+                x.label = sys.intern(lab)
+                x.lang = sys.intern(lg)
+            yield batch
+
+    def stats(self) -> dict:
+        """Débit global et par cœur (items / seconde CPU de worker) pour dimensionner un backfill."""
+        with self._lock:
+            per_worker = {pid: {"items": n, "cpu_s": round(cpu, 3), "items_per_cpu_s": round(n / max(cpu, 1e-9), 1)}
+                          for pid, (n, cpu) in self._per_worker.items()}
+            items = self._items
+            cpu = sum(c for _n, c in self._per_worker.values())
+        el = time.perf_counter() - self._t0 if self._t0 is not None else 0.0
+        return {
+            "workers": self.workers,
+            "items": items,
+            "elapsed_s": round(el, 3),
+            "items_per_s": round(items / max(el, 1e-9), 1),
+            "per_core_items_per_s": round(items / max(cpu, 1e-9), 1),
+            "per_worker": per_worker,
+        }
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_ROW_MINUTE_CACHE = {}
+
+
+def _parse_row_ts(v):
+    """'YYYY-MM-DD HH:MM:SS+zzzz' (item_row) -> epoch; strptime une fois par minute."""
+    if not v or len(v) < 19 or v[16] != ":":
+        return None
+    try:
+        sec = int(v[17:19])
+        key = v[:16] + v[19:]
+        base = _ROW_MINUTE_CACHE.get(key)
+        if base is None:
+            base = int(datetime.strptime(key, "%Y-%m-%d %H:%M%z").timestamp())
+            if len(_ROW_MINUTE_CACHE) >= DATE_CACHE_SIZE:
+                _ROW_MINUTE_CACHE.clear()
+            _ROW_MINUTE_CACHE[key] = base
+        return base + sec
+    except ValueError:
+        return None
+
+
+def read_export(path: str, skipped: list = None):
+    """
+    Relit un export CSV/JSONL (colonnes CSV_FIELDS) -> items. Les lignes à la
+    date illisible sont ignorées et comptées dans skipped[0]; une date vide
+    (absente du flux d'origine) donne ts=None.
+    """
+    fmt = "jsonl" if path == "-" else export_format_for(path)
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Entrée non supportée: {path} (csv ou jsonl attendu)")
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", newline="")
+    try:
+        rows = csv.DictReader(f) if fmt == "csv" else (json.loads(line) for line in f if line.strip())
+        for row in rows:
+            raw = row.get("dt_utc") or row.get("dt_local")
+            ts = _parse_row_ts(row.get("dt_utc")) or _parse_row_ts(row.get("dt_local"))
+            if ts is None and raw:
+                if skipped is not None:
+                    skipped[0] += 1
+                continue
+            yield Item(ts, safe_strip(row.get("title")), safe_strip(row.get("source")),
+                       safe_strip(row.get("url")), query=row.get("query") or "")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+# -----------------------------
+# Benchmarks (sous-commande bench; mesures: benchmarks/bench.py, tests: tests/)
+# -----------------------------
+BENCH_SIZES = (100, 1000, 10_000)  # + 100_000 via --sizes (feedparser: ~1 min)
+BENCH_TOLERANCE = 0.25             # régression si temps > baseline * (1 + tolérance)
+BENCH_MIN_S = 0.002                # cas plus rapides: bruit de mesure, jamais signalés
+IMPORT_BUDGET_MS = 150             # `import rssreader4` (cumul -X importtime, meilleur de 5 processus)
+IMPORT_FORBIDDEN = ("tkinter", "requests", "feedparser", "langdetect")  # jamais chargés pour scorer
+
+
+def _import_benchmarks():
+    """
+    benchmarks/bench.py, à côté de ce script (jamais chargé par la GUI ni par scan).
+    Lancé comme script, ce module est __main__: il est enregistré sous le nom rssreader4
+    pour que les benchs mesurent ces objets-ci (METRICS, caches), pas une seconde copie.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    if here not in sys.path:
+        sys.path.insert(0, here)
+    sys.modules.setdefault("rssreader4", sys.modules[__name__])
+    from benchmarks import bench
+    return bench
+
+
 # -----------------------------
 # App
 # -----------------------------
 class GoogleRssProApp:
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: "tk.Tk"):
+        _import_tk()
         self.root = root
         self.root.title("Google News RSS – PRO (FR/EN/DUAL + tri + POS/NEG + CSV)")
         self.root.geometry("1260x760")
@@ -411,7 +4115,26 @@ class GoogleRssProApp:
         self.last_url_en = ""
         self.last_query = ""
 
-        self._tag_counter = 0
+        # Une ligne par dépêche (ligne N = self.items[N-1], le lead; reprises dans it.story);
+        # les filtres masquent des lignes via des tags "elide" (lab_*, lang_*, src_*) sans réafficher.
+        self.index = ItemIndex()
+        self.agg = SentimentAggregator()
+        self.search_index = SearchIndex()
+        self._search_hits = None  # dépêches affichées par la recherche locale (None: vue normale)
+        self.stories = StoryClusterer()
+        self._src_tags = {}
+        self._src_shown = None
+        self._rendered = False
+        self.fetcher = FetchEngine(cache=open_feed_cache())
+        self._links = None  # LinkResolver, créé à la première activation de "Liens canoniques"
+        self.store = open_article_store()
+
+        # Polling incrémental: dedup_key déjà vus + clé (requête, URLs) du dernier fetch complet
+        self.seen = set()
+        self._order = []  # -timestamp des items, croissant (parallèle à self.items) pour bisect
+        self._poll_key = None
+        self._poll_job = None
+        self._fetching = False
 
         # ===== Top config =====
         top = ttk.Frame(root, padding=10)
@@ -454,18 +4177,60 @@ class GoogleRssProApp:
 
         self.var_show_pos = tk.BooleanVar(value=True)
         self.var_show_neg = tk.BooleanVar(value=True)
-        ttk.Checkbutton(filters, text="POS", variable=self.var_show_pos, command=self.refresh_view).pack(side="left", padx=(0, 10))
-        ttk.Checkbutton(filters, text="NEG", variable=self.var_show_neg, command=self.refresh_view).pack(side="left")
+        ttk.Checkbutton(filters, text="POS", variable=self.var_show_pos, command=self.apply_filters).pack(side="left", padx=(0, 10))
+        ttk.Checkbutton(filters, text="NEG", variable=self.var_show_neg, command=self.apply_filters).pack(side="left")
+
+        self.var_watch = tk.BooleanVar(value=False)
+        self.var_poll_s = tk.IntVar(value=POLL_INTERVAL_S)
+        ttk.Checkbutton(filters, text="Auto-refresh", variable=self.var_watch,
+                        command=self.on_toggle_watch).pack(side="left", padx=(20, 4))
+        ttk.Spinbox(filters, from_=POLL_MIN_S, to=3600, increment=15, width=6,
+                    textvariable=self.var_poll_s).pack(side="left")
+        ttk.Label(filters, text="s").pack(side="left", padx=(2, 0))
+        self.var_export_continuous = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filters, text="Export continu", variable=self.var_export_continuous,
+                        command=self.on_toggle_export_continuous).pack(side="left", padx=(20, 0))
+        self.var_profile = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filters, text="Profiler (cProfile)", variable=self.var_profile).pack(side="left", padx=(20, 0))
+        self.var_resolve_links = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filters, text="Liens canoniques", variable=self.var_resolve_links,
+                        command=self.on_toggle_resolve_links).pack(side="left", padx=(20, 0))
+
+        filters2 = ttk.Frame(top)
+        filters2.grid(row=3, column=0, columnspan=6, sticky="w", pady=(8, 0))
+
+        ttk.Label(filters2, text="Afficher langue:").pack(side="left")
+        self.var_show_fr = tk.BooleanVar(value=True)
+        self.var_show_en = tk.BooleanVar(value=True)
+        ttk.Checkbutton(filters2, text="FR", variable=self.var_show_fr, command=self.apply_filters).pack(side="left", padx=(6, 10))
+        ttk.Checkbutton(filters2, text="EN", variable=self.var_show_en, command=self.apply_filters).pack(side="left")
+
+        ttk.Label(filters2, text="Source:").pack(side="left", padx=(20, 6))
+        self.var_source_filter = tk.StringVar(value=ALL_SOURCES)
+        self.cmb_source = ttk.Combobox(filters2, textvariable=self.var_source_filter, values=[ALL_SOURCES],
+                                       width=32, state="readonly", postcommand=self._refresh_source_choices)
+        self.cmb_source.pack(side="left")
+        self.cmb_source.bind("<<ComboboxSelected>>", lambda _e: self.apply_filters())
+
+        ttk.Label(filters2, text="Recherche:").pack(side="left", padx=(20, 6))
+        self.var_search = tk.StringVar(value="")
+        ent_search = ttk.Entry(filters2, textvariable=self.var_search, width=32)
+        ent_search.pack(side="left")
+        ent_search.bind("<Return>", lambda _e: self.on_search())
+        ttk.Button(filters2, text="🔎", width=3, command=self.on_search).pack(side="left", padx=(4, 0))
+        ttk.Button(filters2, text="✕", width=3, command=self.on_search_clear).pack(side="left", padx=(2, 0))
 
         # Buttons
         btns = ttk.Frame(top)
-        btns.grid(row=0, column=6, rowspan=3, padx=(12, 0), sticky="ns")
+        btns.grid(row=0, column=6, rowspan=4, padx=(12, 0), sticky="ns")
 
         ttk.Button(btns, text="▶ Fetch", command=self.on_fetch).pack(fill="x", pady=(0, 6))
-        ttk.Button(btns, text="💾 SAVE CSV", command=self.on_save_csv).pack(fill="x", pady=(0, 6))
+        ttk.Button(btns, text="💾 SAVE", command=self.on_save_csv).pack(fill="x", pady=(0, 6))
         ttk.Button(btns, text="📋 Copier URL(s)", command=self.on_copy_url).pack(fill="x", pady=(0, 6))
         ttk.Button(btns, text="🌐 Ouvrir", command=self.on_open_browser).pack(fill="x", pady=(0, 6))
-        ttk.Button(btns, text="🧹 Clear", command=self.clear_terminal).pack(fill="x")
+        ttk.Button(btns, text="🕘 Historique", command=self.on_history).pack(fill="x", pady=(0, 6))
+        ttk.Button(btns, text="🧹 Clear", command=self.clear_terminal).pack(fill="x", pady=(0, 6))
+        ttk.Button(btns, text="📊 Diagnostics", command=self.on_diagnostics).pack(fill="x")
 
         top.columnconfigure(1, weight=1)
 
@@ -479,21 +4244,35 @@ class GoogleRssProApp:
         self.terminal.tag_configure("pos", foreground="#0b3d0b")
         self.terminal.tag_configure("neg", foreground="#5a0b0b")
         self.terminal.tag_configure("neu", foreground="#333333")
+        self.terminal.tag_configure("ilink", foreground="#1a73e8", underline=True)
+        self.terminal.tag_bind("ilink", "<Button-1>", self._on_link_click)
+        # Priorité croissante: row < src_* < lab_* / lang_* (un label/langue masqué l'emporte)
+        for t in ("row", "lab_POS", "lab_NEU", "lab_NEG", "lang_fr", "lang_en"):
+            self.terminal.tag_configure(t)
 
         # ===== Status bar =====
         bottom = ttk.Frame(root, padding=(10, 6, 10, 10))
         bottom.pack(side="bottom", fill="x")
 
         self.status_var = tk.StringVar(value="News traitées: 0 | Ambiance: [NEUTRE]")
-        ttk.Label(bottom, textvariable=self.status_var, anchor="w").pack(fill="x")
+        self.progress = ttk.Progressbar(bottom, mode="determinate", length=160, maximum=100)
+        ttk.Label(bottom, textvariable=self.status_var, anchor="w").pack(side="left", fill="x", expand=True)
+
+        self._exporter = None  # BackgroundExporter ouvert en mode export continu
+        self._last_profile = ""  # texte pstats du dernier cycle profilé
+        self._diag = None        # fenêtre Diagnostics (Toplevel, texte)
+        self._export_seen = set()
+
+        self.items = []  # leads (Item; reprises dans it.story)
 
-        self.items = []  # {dt,title,source,link,score,label,lang}
+        # Packs de lexiques (default_lexicon_dir): surveillés, rechargés et re-scorés en arrière-plan
+        self.lexicons = LexiconWatcher()
+        self._lex_busy = False
+        self.root.after(0, self._lexicon_poll)
 
         self.log("Prêt. Mode langue: FR / EN / FR+EN.\n")
-        if feedparser is None:
+        if not _has_module("feedparser"):
             self.log("⚠️ feedparser manquant. Installe: pip install feedparser\n")
-        if _ld_detect is None:
-            self.log("ℹ️ Détection langue: heuristique (langdetect optionnel: pip install langdetect)\n")
 
     def log(self, msg: str, tag: str = None):
         if tag:
@@ -504,6 +4283,7 @@ class GoogleRssProApp:
 
     def clear_terminal(self):
         self.terminal.delete("1.0", "end")
+        self._rendered = False
 
     def build_and_validate(self):
         if not validate_date_or_empty(self.var_after.get()):
@@ -521,26 +4301,13 @@ class GoogleRssProApp:
         if not q:
             raise ValueError("La requête est vide.")
 
-        mode = self.var_lang_mode.get().strip()
-        if mode not in LANG_CHOICES:
-            mode = "FR+EN"
-
-        urls = []
-        self.last_url_fr = ""
-        self.last_url_en = ""
+        urls = edition_urls(q, self.var_lang_mode.get().strip())
+        by_label = dict(urls)
+        self.last_url_fr = by_label.get("FR", "")
+        self.last_url_en = by_label.get("EN", "")
         self.last_url = ""
         self.last_query = q
 
-        if mode in ("FR", "FR+EN"):
-            ufr = build_rss_url(q, **EDITION_FR)
-            urls.append(("FR", ufr))
-            self.last_url_fr = ufr
-
-        if mode in ("EN", "FR+EN"):
-            uen = build_rss_url(q, **EDITION_EN)
-            urls.append(("EN", uen))
-            self.last_url_en = uen
-
         if len(urls) == 1:
             self.last_url = urls[0][1]
 
@@ -567,180 +4334,1103 @@ class GoogleRssProApp:
         except Exception as e:
             messagebox.showerror("Erreur", str(e))
             return
+        import webbrowser
         for _lab, url in urls:
             webbrowser.open(url)
 
     def compute_overall_label(self) -> str:
-        if not self.items:
+        # moyenne par dépêche tenue à jour par l'agrégateur (pas de parcours des items)
+        tot = self.agg.get("all", window="all")
+        if not tot["count"]:
             return "[NEUTRE]"
-        avg = sum(it["score"] for it in self.items) / max(1, len(self.items))
+        avg = tot["mean"]
         if avg > 0.25:
             return "[POS]"
         if avg < -0.25:
             return "[NEG]"
         return "[NEUTRE]"
 
+    def all_items(self):
+        """Tous les items, reprises comprises (export), dépêche par dépêche."""
+        for lead in self.items:
+            story = lead.story
+            yield from (story.items if story is not None else (lead,))
+
     def update_status(self, extra: str = ""):
-        base = f"News traitées: {len(self.items)} | Ambiance: {self.compute_overall_label()}"
+        lab = self.index.counts("label")
+        n = len(self.items) + self.index.duplicates
+        base = (f"News traitées: {n} / {len(self.items)} dépêches (POS {lab.get('POS', 0)} / NEG {lab.get('NEG', 0)})"
+                f" | Ambiance: {self.compute_overall_label()}")
+        trend = self.agg.trend("24h", bins=12)
+        if any(v is not None for v in trend):
+            base += f" 24h [{sparkline(trend)}]"
         self.status_var.set(f"{extra} | {base}" if extra else base)
 
-    def refresh_view(self):
-        self.clear_terminal()
-
-        show_pos = self.var_show_pos.get()
-        show_neg = self.var_show_neg.get()
-
-        filtered = []
-        for it in self.items:
-            if it["label"] == "POS" and not show_pos:
+    def set_items(self, items, extra: str = ""):
+        """Remplace tous les items (Fetch complet) et réaffiche, une ligne par dépêche."""
+        self.stories = StoryClusterer()
+        self.items = cluster_items(items, self.stories)
+        self._order = [-ts_sort_key(it) for it in self.items]
+        self._rebuild_indexes(items)
+        self.refresh_view()
+        self._export_new(items)
+        if extra:
+            self.update_status(extra=extra)
+
+    def _rebuild_indexes(self, items):
+        """Index (compteurs, sources), ambiance glissante et recherche depuis `items` (reprises comprises)."""
+        self.index.clear()
+        self.agg.clear()
+        self.search_index.clear()
+        self.search_index.extend(items)
+        for it in items:
+            lead = it.story is None or it.story.lead is it
+            if lead:
+                self.index.add(it)
+            else:
+                self.index.add_duplicate(it)
+            self.agg.add(it, lead, query=it.query or self.last_query)
+
+    def merge_items(self, new_items, extra: str = ""):
+        """
+        Polling: insère seulement les nouveaux items, à leur place (tri par date
+        décroissante) dans self.items et dans le terminal, sans tout réafficher.
+        """
+        t0 = time.perf_counter()
+        for it in new_items:
+            story, new = self.stories.add(it)
+            self.agg.add(it, new, query=it.query or self.last_query)
+            self.search_index.add(it)
+            if not new:
+                # reprise d'une dépêche affichée: seule la ligne du lead change (nb de sources)
+                self.index.add_duplicate(it)
+                self._redraw_lead(story.lead)
                 continue
-            if it["label"] == "NEG" and not show_neg:
-                continue
-            filtered.append(it)
+            key = -ts_sort_key(it)
+            i = bisect.bisect_right(self._order, key)
+            self._order.insert(i, key)
+            self.items.insert(i, it)
+            self.index.add(it)
+            if self._rendered:
+                self.print_item(it, f"{i + 1}.0")
+        METRICS.observe("render_merge", time.perf_counter() - t0)
+        self._export_new(new_items)
+
+        msg = f"+{len(new_items)} nouvelle(s)"
+        self.update_status(extra=f"{msg} | {extra}" if extra else msg)
+
+    def _redraw_lead(self, lead: Item):
+        if not self._rendered:
+            return
+        key = -ts_sort_key(lead)
+        for i in range(bisect.bisect_left(self._order, key), bisect.bisect_right(self._order, key)):
+            if self.items[i] is lead:
+                self.terminal.delete(f"{i + 1}.0", f"{i + 2}.0")
+                self.print_item(lead, f"{i + 1}.0")
+                return
+
+    def _src_tag(self, src: str) -> str:
+        stag = self._src_tags.get(src)
+        if stag is None:
+            stag = f"src_{len(self._src_tags)}"
+            self._src_tags[src] = stag
+            self.terminal.tag_configure(stag)
+            self.terminal.tag_lower(stag, "lab_POS")
+            if src == self._src_shown:
+                self.terminal.tag_configure(stag, elide=False)
+        return stag
+
+    def _row_tags(self, it: Item) -> tuple:
+        # une ligne de dépêche porte le tag de chacune de ses sources (filtre par source)
+        story = it.story
+        sources = sorted(story.sources) if story is not None else (it.source,)
+        return ("row", f"lab_{it.label}", f"lang_{it.lang}") + tuple(map(self._src_tag, sources))
 
-        for it in filtered:
-            self.print_item(it)
+    def refresh_view(self):
+        self.clear_terminal()
+        self._search_hits = None
+
+        items = self.items
+        with METRICS.timer("render"):
+            for i in range(0, len(items), RENDER_CHUNK):
+                args = []
+                for it in itertools.islice(items, i, i + RENDER_CHUNK):
+                    args.extend(item_line_args(it, self._row_tags(it)))
+                self.terminal.insert("end", *args)
+        METRICS.inc("rendered_lines", len(items))
+        self._rendered = True
+        self.apply_filters()
+        self.terminal.see("end")
 
         self.update_status()
 
-    def _add_clickable_info(self, link: str):
-        self._tag_counter += 1
-        tag = f"i_link_{self._tag_counter}"
-        start = self.terminal.index("end-1c")
-        self.terminal.insert("end", "[i]")
-        end = self.terminal.index("end-1c")
-
-        self.terminal.tag_add(tag, start, end)
-        self.terminal.tag_configure(tag, foreground="#1a73e8", underline=True)
-        self.terminal.tag_bind(tag, "<Button-1>", lambda _e, u=link: webbrowser.open(u))
-        self.terminal.insert("end", " ")
-
-    def print_item(self, it: dict):
-        dt_local = it["dt"].astimezone()
-        ts = dt_local.strftime("%Y-%m-%d %H:%M")
-        prefix = f"[{ts}] [{it['label']} {it['score']:+d}]"
-
-        tag = "neu"
-        if it["label"] == "POS":
-            tag = "pos"
-        elif it["label"] == "NEG":
-            tag = "neg"
-
-        src = it["source"] or "Source?"
-        title = it["title"] or "(sans titre)"
-        lang = it.get("lang", "?").upper()
-
-        self.log(f"{prefix} [{lang}] ", tag)
-        self.log(f"{src} – {title} ", tag)
-        self._add_clickable_info(it["link"])
-        self.log("\n")
+    def apply_filters(self):
+        """Filtres POS/NEG, langue, source: quelques tag_configure(elide=...), sans toucher au texte."""
+        # elide="" (non spécifié) et pas False: un label visible ne doit pas l'emporter sur "row"
+        t = self.terminal
+        t.tag_configure("lab_POS", elide="" if self.var_show_pos.get() else True)
+        t.tag_configure("lab_NEG", elide="" if self.var_show_neg.get() else True)
+        t.tag_configure("lang_fr", elide="" if self.var_show_fr.get() else True)
+        t.tag_configure("lang_en", elide="" if self.var_show_en.get() else True)
+
+        src = self.var_source_filter.get()
+        src = None if src == ALL_SOURCES else src
+        if src != self._src_shown:
+            old = self._src_tags.get(self._src_shown)
+            if old is not None:
+                t.tag_configure(old, elide="")
+            # Une source choisie: toutes les lignes masquées ("row") sauf son tag src_* (prioritaire)
+            t.tag_configure("row", elide=src is not None)
+            new = self._src_tags.get(src)
+            if new is not None:
+                t.tag_configure(new, elide=False)
+            self._src_shown = src
+
+    def _refresh_source_choices(self):
+        self.cmb_source.configure(values=[ALL_SOURCES] + self.index.sources())
+
+    def _on_link_click(self, event):
+        # Tag "ilink" partagé: ligne cliquée -> self.items[ligne - 1] (ou hit de recherche)
+        line = int(self.terminal.index(f"@{event.x},{event.y}").split(".")[0])
+        rows = self._search_hits if self._search_hits is not None else (self.items if self._rendered else ())
+        if 0 < line <= len(rows):
+            link = rows[line - 1].link
+            if link:
+                import webbrowser
+                webbrowser.open(link)
+
+    def on_search(self):
+        """Recherche locale dans les titres collectés (index inversé), sans refetch."""
+        text = self.var_search.get().strip()
+        if not text:
+            self.on_search_clear()
+            return
+        res = self.search_index.search(text)
+        # une ligne par dépêche: les reprises trouvées renvoient vers leur lead
+        hits, seen = [], set()
+        for it in res["items"]:
+            lead = it.story.lead if it.story is not None else it
+            if id(lead) not in seen:
+                seen.add(id(lead))
+                hits.append(lead)
+
+        self.clear_terminal()  # _rendered=False: le polling n'insère pas dans la vue de recherche
+        args = []
+        for it in hits:
+            args.extend(item_line_args(it, self._row_tags(it)))
+        if args:
+            self.terminal.insert("end", *args)
+        self._search_hits = hits
+        self.apply_filters()
+
+        facets = " ".join(f"{k}={v}" for f in ("label", "lang") for k, v in sorted(res["facets"][f].items()))
+        shown = f", {len(hits)} affichés" if res["total"] > len(hits) else ""
+        self.status_var.set(f"Recherche « {text} »: {res['total']} résultat(s){shown} ({res['ms']:.1f} ms)"
+                            + (f" | {facets}" if facets else ""))
+
+    def on_search_clear(self):
+        self.var_search.set("")
+        if self._search_hits is not None:
+            self.refresh_view()
+
+    def print_item(self, it: Item, index: str = "end"):
+        self.terminal.insert(index, *item_line_args(it, self._row_tags(it)))
+        if index == "end":
+            self.terminal.see("end")
 
     def _fetch_one(self, url: str):
-        r = requests.get(url, headers={"User-Agent": UA}, timeout=20)
-        r.raise_for_status()
-        feed = feedparser.parse(r.text)
-        return getattr(feed, "entries", []) or []
+        return self.fetcher.fetch_entries(url)
 
-    def on_fetch(self):
-        def worker():
-            if feedparser is None:
-                self.root.after(0, lambda: messagebox.showerror("Erreur", "feedparser manquant. Fais: pip install feedparser"))
-                return
+    def on_fetch(self, incremental: bool = False):
+        if self._fetching:
+            return
+        self._fetching = True
 
+        def worker():
             try:
-                _q, urls = self.build_and_validate()
-            except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Erreur", str(e)))
+                fetch(incremental)
+            finally:
+                self._fetching = False
+                if self.var_watch.get():
+                    self.root.after(0, self._schedule_poll)
+
+        def fetch(incremental):
+            if not _has_module("feedparser"):
+                self.root.after(0, lambda: messagebox.showerror("Erreur", "feedparser manquant. Fais: pip install feedparser"))
                 return
 
-            all_entries = []
             try:
-                for _label, url in urls:
-                    all_entries.extend(self._fetch_one(url))
+                q, urls = self.build_and_validate()
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Erreur HTTP", str(e)))
+                # `e` est effacé à la sortie du except: message lié avant l'appel différé
+                msg = str(e)
+                self.root.after(0, lambda m=msg: messagebox.showerror("Erreur", m))
                 return
 
-            seen = set()
-            new_items = []
-            for e in all_entries:
-                title = safe_strip(getattr(e, "title", ""))
-                link = safe_strip(getattr(e, "link", ""))
-
-                src = ""
+            # Requête modifiée depuis le dernier fetch complet -> on repart de zéro
+            key = (q, tuple(urls))
+            incremental = incremental and key == self._poll_key
+            seen = self.seen if incremental else set()
+
+            t0 = time.perf_counter()
+            if self.var_profile.get():
+                # cProfile ne voit que le thread courant: éditions fetchées en séquentiel
+                os.makedirs(default_cache_dir(), exist_ok=True)  # 1er lancement: dossier de cache absent
+                (new_items, results), self._last_profile = profile_call(
+                    fetch_query, self.fetcher, urls, False, seen, path=os.path.join(default_cache_dir(), "fetch.prof"))
+            else:
+                new_items, results = fetch_query(self.fetcher, urls, seen=seen)
+            METRICS.observe("cycle", time.perf_counter() - t0)
+            METRICS.inc("cycles")
+            if self.store is not None and new_items:
                 try:
-                    if hasattr(e, "source") and hasattr(e.source, "title"):
-                        src = safe_strip(str(e.source.title))
+                    self.store.upsert(new_items, q)
                 except Exception:
-                    src = ""
+                    pass  # l'historique est un bonus: un échec disque ne bloque pas l'affichage
+            failed = [res for res in results if not res.ok]
+            if len(failed) == len(results):
+                msg = "\n".join(f"{res.label}: {res.error}" for res in failed)
+                if incremental:
+                    self.root.after(0, lambda: self.update_status(extra=f"⚠️ Poll en échec: {msg}"))
+                else:
+                    self.root.after(0, lambda: messagebox.showerror("Erreur HTTP", msg))
+                return
+            warn = ""
+            if failed:
+                warn = "⚠️ Échec " + ", ".join(f"{res.label} ({res.error})" for res in failed)
+            elif self.fetcher.cache is not None:
+                cs = self.fetcher.cache.stats()
+                warn = f"Cache: {cs['hits']} hit / {cs['misses']} miss"
+
+            if incremental:
+                self.root.after(0, lambda: self.merge_items(new_items, warn))
+            else:
+                self.seen = seen
+                self._poll_key = key
+                self.root.after(0, lambda: self.set_items(new_items, warn))
 
-                dt = parse_entry_datetime(e)
+        threading.Thread(target=worker, daemon=True).start()
 
-                score, lang = score_text_auto(title, src)
-                lab = label_from_score(score)
+    def on_toggle_resolve_links(self):
+        """Liens canoniques: résolution dans le thread de fetch (HEAD borné, cache disque)."""
+        if self.var_resolve_links.get():
+            if self._links is None:
+                self._links = LinkResolver(open_link_cache())
+            self.fetcher.links = self._links
+        else:
+            self.fetcher.links = None
+        # dedup_key change avec le lien: le prochain poll repart d'un fetch complet
+        self._poll_key = None
+
+    def _lexicon_poll(self):
+        if not self._lex_busy and self.lexicons.changed():
+            self._lex_busy = True
+            items = list(self.all_items())
+            threading.Thread(target=self._lexicon_reload, args=(items,), daemon=True).start()
+        self.root.after(LEXICON_POLL_MS, self._lexicon_poll)
+
+    def _lexicon_reload(self, items):
+        """Thread: lexiques recompilés (ou relus du cache) puis re-scoring des items en mémoire."""
+        t0 = time.perf_counter()
+        try:
+            lexicons = self.lexicons.reload()
+        except ValueError as e:
+            self.root.after(0, self._lexicon_failed, str(e))
+            return
+        scores, labels, langs = score_batch([it.title for it in items], [it.source for it in items], learn=False)
+        el = time.perf_counter() - t0
+        self.root.after(0, self._lexicon_apply, items, list(scores), list(labels), list(langs),
+                        len(lexicons["packs"]), el)
 
-                k = dedup_key(title, link)
-                if k in seen:
-                    continue
-                seen.add(k)
+    def _store_rescored(self, rows):
+        try:
+            self.store.rescore(rows)
+        except Exception:
+            pass  # l'historique est un bonus: un échec disque ne bloque pas l'affichage
+
+    def _lexicon_failed(self, msg: str):
+        self._lex_busy = False
+        self.update_status(extra=f"⚠️ Lexiques non rechargés: {msg}")
+
+    def _lexicon_apply(self, items, scores, labels, langs, n_packs: int, elapsed: float):
+        self._lex_busy = False
+        changed = 0
+        for it, sc, lab, lang in zip(items, scores, labels, langs):
+            sc = int(sc)
+            changed += sc != it.score
+            it.score = sc
+            it.label = sys.intern(str(lab))
+            it.lang = sys.intern(str(lang))
+        # items arrivés pendant le re-scoring (peut-être scorés avec les anciens lexiques)
+        done = {id(it) for it in items}
+        late = [it for it in self.all_items() if id(it) not in done]
+        if late:
+            sc_late, lab_late, lang_late = score_batch([it.title for it in late], [it.source for it in late],
+                                                       learn=False)
+            for it, sc, lab, lang in zip(late, sc_late, lab_late, lang_late):
+                it.score = int(sc)
+                it.label = sys.intern(str(lab))
+                it.lang = sys.intern(str(lang))
+        if items or late:
+            self._rebuild_indexes(list(self.all_items()))
+            self.refresh_view()
+            if self.store is not None:
+                # historique aligné sur les nouveaux scores (écriture hors thread Tk)
+                rescored = [(it.score, it.label, it.lang, dedup_key(it.title, it.link)) for it in items + late]
+                threading.Thread(target=self._store_rescored, args=(rescored,), daemon=True).start()
+        self.update_status(extra=f"Lexiques rechargés ({n_packs} pack(s), {elapsed * 1000:.0f} ms): "
+                                 f"{len(items) + len(late)} re-scorés, {changed} scores modifiés")
+
+    def diagnostics_text(self) -> str:
+        snap = METRICS.snapshot()
+        lines = [f"{'étape':<14}{'n':>7}{'total ms':>12}{'moy ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+        for name, st in sorted(snap["stages"].items(), key=lambda kv: -kv[1]["total_ms"]):
+            lines.append(f"{name:<14}{st['count']:>7}{st['total_ms']:>12.1f}{st['mean_ms']:>10.2f}"
+                         f"{st['p50_ms']:>10.1f}{st['p95_ms']:>10.1f}{st['max_ms']:>10.1f}")
+        lines.append("")
+        lines += [f"{name:<24}{v:>12}" for name, v in sorted(snap["counters"].items())]
+        lines += [f"{name:<24}{v:>12} (jauge)" for name, v in sorted(snap["gauges"].items())]
+        if self.fetcher.cache is not None:
+            lines.append(f"\nCache HTTP: {json.dumps(self.fetcher.cache.stats())}")
+        if self.fetcher.links is not None:
+            lines.append(f"Liens: {json.dumps(self.fetcher.links.stats())}")
+        lines.append(f"Langue: {json.dumps(get_lang_detector().stats())}")
+        packs = _LEXICON_STATE["packs"]
+        lines.append(f"Lexiques: {self.lexicons.path} -> "
+                     + (", ".join(f"{p['file']} ({p['lang']}/{p['sector']})" for p in packs) or "intégrés seulement"))
+        lines += ["", "Ambiance glissante (moyenne / nb / POS% / NEG%):"]
+        now = time.time()
+        keys = [("all", "")] + [("query", v) for v in self.agg.values("query")] + \
+               [("lang", v) for v in self.agg.values("lang")]
+        top = self.agg.table("source", "24h", now)
+        keys += [("source", v) for v in sorted(top, key=lambda v: -top[v]["count"])[:10]]
+        for dim, val in keys:
+            cells = []
+            for w in list(AGG_WINDOWS) + ["all"]:
+                st = self.agg.get(dim, val, w, now)
+                cells.append(f"{w}: {st['mean']:+.2f}/{st['count']} {st['pos_ratio']:.0%}/{st['neg_ratio']:.0%}")
+            lines.append(f"{dim + (':' + val if val else ''):<32.32}" + "  ".join(cells))
+        if self._last_profile:
+            lines += ["", "Dernier cycle profilé (cProfile, temps cumulé):", self._last_profile]
+        return "\n".join(lines)
+
+    def on_diagnostics(self):
+        """Fenêtre Diagnostics: timers / histogrammes / compteurs (METRICS) + dernier profil."""
+        if self._diag is not None and self._diag[0].winfo_exists():
+            self._diag[0].lift()
+            self._refresh_diagnostics()
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Diagnostics")
+        win.geometry("820x520")
+        bar = ttk.Frame(win, padding=(8, 8, 8, 0))
+        bar.pack(side="top", fill="x")
+        text = ScrolledText(win, wrap="none", font=("Consolas", 10))
+        text.pack(fill="both", expand=True, padx=8, pady=8)
+        self._diag = (win, text)
+        ttk.Button(bar, text="Rafraîchir", command=self._refresh_diagnostics).pack(side="left")
+        ttk.Button(bar, text="Reset", command=lambda: (METRICS.reset(), self._refresh_diagnostics())).pack(
+            side="left", padx=(6, 0))
+        ttk.Button(bar, text="Copier (Prometheus)", command=lambda: self._copy_text(METRICS.to_prometheus())).pack(
+            side="left", padx=(6, 0))
+        ttk.Button(bar, text="Copier (JSON)", command=lambda: self._copy_text(METRICS.to_json())).pack(
+            side="left", padx=(6, 0))
+        self._refresh_diagnostics()
+
+    def _refresh_diagnostics(self):
+        if self._diag is None or not self._diag[0].winfo_exists():
+            return
+        text = self._diag[1]
+        text.delete("1.0", "end")
+        text.insert("end", self.diagnostics_text())
 
-                new_items.append({
-                    "dt": dt,
-                    "title": title,
-                    "source": src,
-                    "link": link,
-                    "score": score,
-                    "label": lab,
-                    "lang": lang,
-                })
+    def _copy_text(self, s: str):
+        self.root.clipboard_clear()
+        self.root.clipboard_append(s)
 
-            new_items.sort(key=lambda x: x["dt"], reverse=True)
-            self.items = new_items
-            self.root.after(0, self.refresh_view)
+    def on_history(self):
+        """Recharge depuis la base locale (sans réseau): requête courante, période After/Before (défaut: 7 jours)."""
+        if self.store is None:
+            messagebox.showinfo("Historique", "Base locale indisponible.")
+            return
+        a = safe_strip(self.var_after.get())
+        b = safe_strip(self.var_before.get())
+        if not (validate_date_or_empty(a) and validate_date_or_empty(b)):
+            messagebox.showerror("Erreur", "After/Before doivent être vides ou au format YYYY-MM-DD.")
+            return
+        since, until = history_range(a, b)
+        user_q = safe_strip(self.var_query.get())
+
+        def worker():
+            items = self.store.history(since=since, until=until, query=user_q)
+            self._poll_key = None  # le prochain poll repartira d'un fetch complet
+            self.root.after(0, lambda: self.set_items(items, f"Historique: {len(items)} items (base locale)"))
 
         threading.Thread(target=worker, daemon=True).start()
 
+    def on_toggle_watch(self):
+        if self.var_watch.get():
+            self.on_fetch(incremental=True)
+        elif self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+
+    def _schedule_poll(self):
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+        try:
+            delay = max(POLL_MIN_S, int(self.var_poll_s.get()))
+        except (tk.TclError, ValueError):
+            delay = POLL_INTERVAL_S
+        self._poll_job = self.root.after(delay * 1000, self._poll)
+
+    def _poll(self):
+        self._poll_job = None
+        if self.var_watch.get():
+            self.on_fetch(incremental=True)
+
     def on_save_csv(self):
         if not self.items:
-            messagebox.showinfo("SAVE CSV", "Aucun résultat à sauvegarder. Lance Fetch d’abord.")
+            messagebox.showinfo("SAVE", "Aucun résultat à sauvegarder. Lance Fetch d’abord.")
             return
 
         default_name = "google_news_rss_export.csv"
         path = filedialog.asksaveasfilename(
-            title="Enregistrer CSV",
+            title="Enregistrer (CSV / JSONL / Parquet)",
             defaultextension=".csv",
             initialfile=default_name,
-            filetypes=[("CSV", "*.csv"), ("All files", "*.*")]
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Parquet", "*.parquet"),
+                       ("JSON colonnaire", "*.json"), ("All files", "*.*")]
         )
         if not path:
             return
 
-        # CSV: simple, utile pour IA / ingestion
+        self._close_exporter()
         # dt_utc, dt_local, lang, label, score, source, title, url, query
         try:
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                w = csv.writer(f)
-                w.writerow(["dt_utc", "dt_local", "lang", "label", "score", "source", "title", "url", "query"])
-                for it in self.items:
-                    dt_utc = it["dt"].astimezone(timezone.utc)
-                    dt_local = it["dt"].astimezone()
-                    w.writerow([
-                        dt_utc.strftime("%Y-%m-%d %H:%M:%S%z"),
-                        dt_local.strftime("%Y-%m-%d %H:%M:%S%z"),
-                        it.get("lang", ""),
-                        it.get("label", ""),
-                        it.get("score", 0),
-                        it.get("source", ""),
-                        it.get("title", ""),
-                        it.get("link", ""),
-                        self.last_query,
-                    ])
-            self.update_status(extra=f"CSV sauvegardé: {path}")
+            writer = ExportWriter(path, append=self.var_export_continuous.get())
         except Exception as e:
-            messagebox.showerror("Erreur", f"Impossible d'écrire le CSV:\n{e}")
+            messagebox.showerror("Erreur", f"Impossible d'écrire l'export:\n{e}")
+            return
 
+        exporter = BackgroundExporter(
+            writer,
+            on_progress=lambda done, total: self.root.after(0, self._export_progress, done, total),
+            on_done=lambda err: self.root.after(0, self._export_done, writer, err),
+        )
+        items = list(self.all_items())
+        self._export_seen = {dedup_key(it.title, it.link) for it in items}
+        exporter.submit(items, self.last_query)
+        # index de recherche à côté de l'export (rechargeable par: rssreader4.py search fichier.idx ...)
+        try:
+            self.search_index.save(path + ".idx")
+        except Exception as e:
+            self.log(f"⚠️ Index de recherche non sauvegardé: {e}\n")
+        self.progress.configure(value=0)
+        self.progress.pack(side="right", padx=(10, 0))
+        if self.var_export_continuous.get():
+            self._exporter = exporter
+        else:
+            exporter.close()
 
-def main():
+    def _export_new(self, items):
+        """Export continu: n'envoie au writer que les items pas encore exportés."""
+        if self._exporter is None:
+            return
+        new = []
+        for it in items:
+            k = dedup_key(it.title, it.link)
+            if k not in self._export_seen:
+                self._export_seen.add(k)
+                new.append(it)
+        if new:
+            try:
+                self._exporter.submit(new, self.last_query)
+            except RuntimeError as e:  # déjà signalé par _export_done
+                self._exporter = None
+                self.log(f"⚠️ Export continu arrêté: {e}\n")
+
+    def _close_exporter(self):
+        if self._exporter is not None:
+            self._exporter.close()
+            self._exporter = None
+
+    def on_toggle_export_continuous(self):
+        if not self.var_export_continuous.get():
+            self._close_exporter()
+
+    def _export_progress(self, done: int, total: int):
+        self.progress.configure(value=100.0 * done / max(1, total))
+        self.update_status(extra=f"Export: {done}/{total}")
+
+    def _export_done(self, writer: ExportWriter, err):
+        self.progress.pack_forget()
+        if err is not None:
+            if self._exporter is not None and self._exporter.writer is writer:
+                self._exporter = None  # export continu: plus rien ne serait écrit
+            messagebox.showerror("Erreur", f"Impossible d'écrire l'export:\n{err}")
+            return
+        extra = f"Export sauvegardé: {writer.path}"
+        if writer.fallback:
+            extra += f" ({writer.fallback})"
+        self.update_status(extra=extra)
+
+
+# -----------------------------
+# CLI (headless)
+# -----------------------------
+def read_watchlist(path: str):
+    """Une requête / un symbole par ligne ('-' = stdin); lignes vides et commentaires (#) ignorés."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        lines = [line.split("#", 1)[0].strip() for line in f]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    return [line for line in lines if line]
+
+
+_INTERVAL_RE = re.compile(r"\s@(\d+(?:\.\d+)?)([smh]?)$")
+
+
+def split_interval(line: str):
+    """'AVGO OR Broadcom @5m' -> ('AVGO OR Broadcom', 300.0); sans suffixe -> (line, None)."""
+    m = _INTERVAL_RE.search(line)
+    if m is None:
+        return line, None
+    return line[:m.start()].strip(), float(m.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[m.group(2)]
+
+
+def _add_watchlist_args(p):
+    p.add_argument("watchlist", help="fichier watchlist ('-' = stdin)")
+    p.add_argument("--recency", default="1d", choices=RECENCY_CHOICES + [""])
+    p.add_argument("--after", default="", help="YYYY-MM-DD")
+    p.add_argument("--before", default="", help="YYYY-MM-DD")
+    p.add_argument("--site", default="", help="domaine source (site:)")
+    p.add_argument("--lang", default="FR+EN", choices=LANG_CHOICES)
+
+
+def _watchlist_queries(args, default_interval: float) -> tuple:
+    """Watchlist -> (requêtes construites, {requête: intervalle s}). ValueError si dates invalides / vide."""
+    if not (validate_date_or_empty(args.after) and validate_date_or_empty(args.before)):
+        raise ValueError("After/Before doivent être vides ou au format YYYY-MM-DD.")
+    queries, intervals = [], {}
+    for line in read_watchlist(args.watchlist):
+        sym, every = split_interval(line)
+        q = build_query(sym, args.recency, args.after, args.before, args.site)
+        if q:
+            queries.append(q)
+            intervals[q] = every or default_interval
+    if not queries:
+        raise ValueError("Watchlist vide.")
+    return queries, intervals
+
+
+def _add_lexicon_args(p):
+    p.add_argument("--lexicons", default=None, metavar="DOSSIER",
+                   help="packs de lexiques *.json (défaut: ~/.config/rssreader4/lexicons s'il existe)")
+    p.add_argument("--sector", action="append", default=None, metavar="SECTEUR",
+                   help="ne charge que les packs de ce secteur (+ general); répétable")
+
+
+def _cli_lexicons(args):
+    """--lexicons / --sector -> LexiconWatcher déjà installé, ou None (lexiques intégrés). ValueError si pack invalide."""
+    path = args.lexicons or default_lexicon_dir()
+    if not os.path.isdir(path):
+        if args.lexicons:
+            raise ValueError(f"--lexicons: dossier introuvable: {path}")
+        return None
+    watcher = LexiconWatcher(path, sectors=set(args.sector) if args.sector else None)
+    watcher.reload()
+    return watcher
+
+
+def _cli_lexicons_check(watcher):
+    """Rechargement à chaud entre deux cycles (--watch / --schedule)."""
+    if watcher is None or not watcher.changed():
+        return
+    try:
+        lex = watcher.reload()
+        print(f"\nLexiques rechargés: {len(lex['packs'])} pack(s)", file=sys.stderr)
+    except ValueError as e:
+        print(f"\nLexiques non rechargés: {e}", file=sys.stderr)
+
+
+def build_arg_parser():
+    import argparse
+    ap = argparse.ArgumentParser(
+        prog="rssreader4.py",
+        description="Google News RSS – PRO. Sans argument: interface Tk. Avec une sous-commande: mode headless.",
+    )
+    sub = ap.add_subparsers(dest="cmd")
+
+    sc = sub.add_parser("scan", help="Scanne une watchlist (une requête/symbole par ligne) en parallèle")
+    _add_watchlist_args(sc)
+    sc.add_argument("--workers", type=int, default=8, help="requêtes simultanées (défaut: 8)")
+    sc.add_argument("--rate", type=float, default=None,
+                    help=f"requêtes HTTP/s max, global (défaut 5; 0 = illimité); par hôte avec --schedule "
+                         f"(défaut {SCHED_RATE:g})")
+    sc.add_argument("--format", default="jsonl", choices=["jsonl", "csv", "parquet"],
+                    help="parquet: nécessite -o et pyarrow (sinon JSON colonnaire)")
+    sc.add_argument("-o", "--output", default="-", help="fichier de sortie ('-' = stdout)")
+    sc.add_argument("--cache-dir", default=None, help="cache HTTP disque (défaut: ~/.cache/rssreader4/http)")
+    sc.add_argument("--no-cache", action="store_true", help="désactive le cache HTTP / GET conditionnel")
+    sc.add_argument("--fresh-for", type=float, default=0.0,
+                    help="secondes pendant lesquelles une réponse en cache est servie sans requête")
+    sc.add_argument("--resolve-links", action="store_true",
+                    help="remplace les liens news.google.com par l'URL de l'article (dédup + export)")
+    sc.add_argument("--link-cache", default=None, metavar="FICHIER",
+                    help="table des liens résolus, JSON (défaut: ~/.cache/rssreader4/links.json)")
+    _add_lexicon_args(sc)
+    sc.add_argument("--db", default=None, metavar="FICHIER",
+                    help="enregistre les items dans la base SQLite (ex: ~/.local/share/rssreader4/articles.db)")
+    sc.add_argument("--new-only", action="store_true", help="n'émet que les items absents de la base (requiert --db)")
+    sc.add_argument("--watch", type=float, default=0.0, metavar="SECONDES",
+                    help="relance le scan toutes les N secondes et n'émet que les nouveaux items")
+    sc.add_argument("--schedule", action="store_true",
+                    help="planificateur asyncio: chaque ligne à son intervalle ('AVGO @5m', défaut --watch "
+                         f"ou {SCHED_INTERVAL:.0f} s), --rate par hôte, backoff sur 429/5xx, requêtes à score fort "
+                         "prioritaires")
+    sc.add_argument("--feedparser", action="store_true",
+                    help="parse tous les flux avec feedparser (pas de parseur Google News dédié)")
+    sc.add_argument("--metrics", default=None, metavar="FICHIER",
+                    help="écrit timers/compteurs après chaque cycle ('-' = stderr)")
+    sc.add_argument("--metrics-format", default="json", choices=["json", "prom"],
+                    help="json, ou prom (format texte Prometheus)")
+    sc.add_argument("--profile", default=None, metavar="DOSSIER",
+                    help="cProfile de chaque cycle -> DOSSIER/cycle-NNNN.prof (force --workers 1)")
+    sc.add_argument("-q", "--quiet", action="store_true", help="pas de progression sur stderr")
+    sv = sub.add_parser("serve", help="Serveur partagé: chaque requête est relevée une fois, servie à N clients "
+                                      "(JSON, RSS scoré, long-poll / SSE)")
+    _add_watchlist_args(sv)
+    sv.add_argument("--host", default=SERVE_HOST, help=f"adresse d'écoute (défaut: {SERVE_HOST}; 0.0.0.0 = réseau)")
+    sv.add_argument("--port", type=int, default=SERVE_PORT, help=f"port (défaut: {SERVE_PORT})")
+    sv.add_argument("--interval", type=float, default=SCHED_INTERVAL, metavar="SECONDES",
+                    help=f"intervalle par défaut des requêtes ('AVGO @5m' l'emporte; défaut: {SCHED_INTERVAL:.0f})")
+    sv.add_argument("--workers", type=int, default=4, help="requêtes relevées simultanément (défaut: 4)")
+    sv.add_argument("--rate", type=float, default=SCHED_RATE,
+                    help=f"requêtes HTTP/s par hôte amont (défaut: {SCHED_RATE:g})")
+    sv.add_argument("--keep", type=int, default=SERVE_KEEP, help=f"items servis par requête (défaut: {SERVE_KEEP})")
+    sv.add_argument("--cache-dir", default=None, help="cache HTTP disque (défaut: ~/.cache/rssreader4/http)")
+    sv.add_argument("--no-cache", action="store_true", help="désactive le cache HTTP / GET conditionnel")
+    sv.add_argument("--resolve-links", action="store_true",
+                    help="remplace les liens news.google.com par l'URL de l'article")
+    sv.add_argument("--link-cache", default=None, metavar="FICHIER",
+                    help="table des liens résolus, JSON (défaut: ~/.cache/rssreader4/links.json)")
+    _add_lexicon_args(sv)
+    sv.add_argument("--db", default=None, metavar="FICHIER",
+                    help="enregistre les items en base SQLite et, au démarrage, resert les derniers items connus")
+    sv.add_argument("--feedparser", action="store_true",
+                    help="parse tous les flux avec feedparser (pas de parseur Google News dédié)")
+    sv.add_argument("-q", "--quiet", action="store_true", help="pas de progression sur stderr")
+    so = sub.add_parser("score", help="Re-score un export CSV/JSONL (backfill d'archives) sur plusieurs processus")
+    so.add_argument("input", help="export .csv ou .jsonl (colonnes de l'export CSV; '-' = JSONL sur stdin)")
+    so.add_argument("--workers", type=int, default=None,
+                    help="processus de scoring (défaut: nb de cœurs; 0 = dans le processus)")
+    so.add_argument("--chunk", type=int, default=SCORE_CHUNK, help=f"titres par lot (défaut: {SCORE_CHUNK})")
+    so.add_argument("--format", default="jsonl", choices=["jsonl", "csv", "parquet"])
+    so.add_argument("-o", "--output", default="-", help="fichier de sortie ('-' = stdout)")
+    so.add_argument("--db", default=None, metavar="FICHIER", help="enregistre aussi les items re-scorés en base")
+    _add_lexicon_args(so)
+    so.add_argument("-q", "--quiet", action="store_true", help="pas de progression sur stderr")
+    be = sub.add_parser("bench", help="Suite de benchmarks (flux synthétiques + enregistrés, serveur local)")
+    be.add_argument("--sizes", default=",".join(map(str, BENCH_SIZES)),
+                    help="tailles des flux synthétiques (ex: 100,1000,10000,100000)")
+    be.add_argument("--fixtures", default=None, metavar="DOSSIER", help="flux enregistrés *.xml à rejouer")
+    be.add_argument("--record", nargs="+", default=None, metavar="REQUÊTE",
+                    help="enregistre les flux réels de ces requêtes dans --fixtures puis quitte")
+    be.add_argument("--repeat", type=int, default=3, help="mesures par cas (le meilleur temps est gardé)")
+    be.add_argument("--no-render", action="store_true", help="sans le cas rendu Tk")
+    be.add_argument("--baseline", default=None, metavar="FICHIER", help="résultats de référence (JSON)")
+    be.add_argument("--tolerance", type=float, default=BENCH_TOLERANCE,
+                    help=f"régression si temps > référence x (1 + tolérance) (défaut: {BENCH_TOLERANCE})")
+    be.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_MS, metavar="MS",
+                    help=f"échec si `import rssreader4` dépasse MS ms, ou charge Tk/requests/feedparser "
+                         f"(défaut: {IMPORT_BUDGET_MS})")
+    be.add_argument("-o", "--output", default="-", help="résultats JSON ('-' = stdout)")
+    hi = sub.add_parser("history", help="Interroge la base locale (sans réseau)")
+    hi.add_argument("--db", default=None, help="base SQLite (défaut: ~/.local/share/rssreader4/articles.db)")
+    hi.add_argument("--after", default="", help="YYYY-MM-DD inclus (défaut: 7 jours)")
+    hi.add_argument("--before", default="", help="YYYY-MM-DD exclu")
+    hi.add_argument("--query", default="", help="requête utilisateur (ex: AVGO), opérateurs when:/site: ignorés")
+    hi.add_argument("--label", default="", choices=["", "POS", "NEU", "NEG"])
+    hi.add_argument("--lang", default="", choices=["", "fr", "en"])
+    hi.add_argument("--source", default="")
+    hi.add_argument("--limit", type=int, default=0)
+    hi.add_argument("--format", default="jsonl", choices=["jsonl", "csv", "parquet"])
+    hi.add_argument("-o", "--output", default="-", help="fichier de sortie ('-' = stdout)")
+    se = sub.add_parser("search", help="Recherche plein texte locale dans un index .idx ou un export (sans réseau)")
+    se.add_argument("source", help="index .idx (sauvegardé avec l'export) ou export .csv/.jsonl")
+    se.add_argument("query", help='ex: broadcom -nvidia "résultats trimestriels" label:POS after:2025-12-01')
+    se.add_argument("--limit", type=int, default=SEARCH_LIMIT, help=f"résultats max (défaut: {SEARCH_LIMIT})")
+    se.add_argument("--format", default="jsonl", choices=["jsonl", "csv", "parquet"])
+    se.add_argument("-o", "--output", default="-", help="fichier de sortie ('-' = stdout)")
+    return ap
+
+
+def _open_output(path: str, fmt: str):
+    if path == "-":
+        if fmt == "parquet":
+            raise ValueError("--format parquet nécessite -o FICHIER.")
+        return ExportWriter("-", fmt=fmt, stream=sys.stdout)
+    writer = ExportWriter(path, fmt=fmt)
+    if writer.fallback:
+        print(f"{writer.fallback} -> {writer.path}", file=sys.stderr)
+    return writer
+
+
+def dump_metrics(path: str, fmt: str = "json"):
+    """METRICS -> fichier (réécrit à chaque appel, lisible par un exporter textfile) ou stderr ('-')."""
+    text = METRICS.to_prometheus() if fmt == "prom" else METRICS.to_json() + "\n"
+    if path == "-":
+        sys.stderr.write(text)
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def cli_history(args) -> int:
+    if not (validate_date_or_empty(args.after) and validate_date_or_empty(args.before)):
+        print("After/Before doivent être vides ou au format YYYY-MM-DD.", file=sys.stderr)
+        return 2
+    since, until = history_range(args.after, args.before)
+    store = ArticleStore(args.db)
+    try:
+        t0 = time.perf_counter()
+        items = store.history(since=since, until=until, query=args.query, label=args.label,
+                              lang=args.lang, source=args.source, limit=args.limit)
+        el = time.perf_counter() - t0
+    finally:
+        store.close()
+    try:
+        writer = _open_output(args.output, args.format)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    try:
+        # un lot par suite d'items de même requête (un row group Parquet par lot, pas par item)
+        for q, grp in itertools.groupby(items, key=lambda it: it.query):
+            writer.write(list(grp), q)
+    finally:
+        writer.close()
+    print(json.dumps({"items": len(items), "query_ms": round(el * 1000, 2)}), file=sys.stderr)
+    return 0
+
+
+def cli_search(args) -> int:
+    t0 = time.perf_counter()
+    try:
+        if args.source.endswith(".idx"):
+            idx = SearchIndex.load(args.source)
+        else:
+            # export brut: labels/langues recalculés pour les facettes
+            idx = SearchIndex()
+            pool = ScoringPool(0)
+            try:
+                for batch in pool.score_items(read_export(args.source)):
+                    idx.extend(batch)
+            finally:
+                pool.close()
+        writer = _open_output(args.output, args.format)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    load_ms = (time.perf_counter() - t0) * 1000
+    res = idx.search(args.query, limit=max(1, args.limit))
+    try:
+        for q, grp in itertools.groupby(res["items"], key=lambda it: it.query):
+            writer.write(list(grp), q)
+    finally:
+        writer.close()
+    print(json.dumps({"docs": len(idx), "total": res["total"], "facets": res["facets"],
+                      "load_ms": round(load_ms, 2), "search_ms": round(res["ms"], 2)},
+                     ensure_ascii=False), file=sys.stderr)
+    return 0
+
+
+def cli_score(args) -> int:
+    skipped = [0]
+    try:
+        _cli_lexicons(args)
+        items = read_export(args.input, skipped)
+        writer = _open_output(args.output, args.format)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    store = ArticleStore(args.db) if args.db else None
+    pool = ScoringPool(args.workers, chunk=args.chunk)
+    try:
+        for batch in pool.score_items(items):
+            for q, grp in itertools.groupby(batch, key=lambda it: it.query):
+                grp = list(grp)
+                writer.write(grp, q)
+                if store is not None:
+                    store.upsert(grp, q)
+            if not args.quiet:
+                st = pool.stats()
+                print(f"\r{st['items']} items | {st['items_per_s']:.0f} items/s | "
+                      f"{st['per_core_items_per_s']:.0f} items/s/cœur", end="", file=sys.stderr)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        pool.close()
+        writer.close()
+        if store is not None:
+            store.close()
+    if not args.quiet:
+        print(file=sys.stderr)
+    stats = pool.stats()
+    stats["skipped"] = skipped[0]
+    print(json.dumps(stats), file=sys.stderr)
+    return 0
+
+
+def cli_bench(args) -> int:
+    if not _has_module("feedparser"):
+        print("feedparser manquant. Fais: pip install feedparser", file=sys.stderr)
+        return 2
+    bench = _import_benchmarks()
+    if args.record:
+        if not args.fixtures:
+            print("--record nécessite --fixtures DOSSIER.", file=sys.stderr)
+            return 2
+        for path in bench.record_fixtures(args.record, args.fixtures):
+            print(path, file=sys.stderr)
+        return 0
+    try:
+        sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    except ValueError:
+        print("--sizes: entiers séparés par des virgules.", file=sys.stderr)
+        return 2
+    try:
+        res = bench.bench_suite(sizes, fixtures_dir=args.fixtures, repeat=args.repeat, render=not args.no_render,
+                                import_budget_ms=args.import_budget)
+    except bench.BenchCheckError as e:
+        print(f"ÉCHEC bench: {e}", file=sys.stderr)
+        return 1
+    imp = res["import"]
+    rc = 0 if imp["ok"] else 1
+    if not imp["ok"]:
+        print(f"RÉGRESSION import: {imp['import_ms']} ms (budget {imp['budget_ms']} ms)"
+              + (f", modules chargés: {', '.join(imp['forbidden_loaded'])}" if imp["forbidden_loaded"] else ""),
+              file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        res["baseline"] = args.baseline
+        res["tolerance"] = args.tolerance
+        res["regressions"] = bench.bench_compare(res, baseline, args.tolerance)
+        for reg in res["regressions"]:
+            print(f"RÉGRESSION {reg['case']}: {reg['baseline_s']}s -> {reg['s']}s (x{reg['ratio']})", file=sys.stderr)
+        rc = 1 if res["regressions"] else rc
+    text = json.dumps(res, indent=2, ensure_ascii=False) + "\n"
+    if args.output == "-":
+        sys.stdout.write(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    return rc
+
+
+def cli_scan(args) -> int:
+    if not _has_module("feedparser"):
+        print("feedparser manquant. Fais: pip install feedparser", file=sys.stderr)
+        return 2
+    try:
+        queries, intervals = _watchlist_queries(args, args.watch or SCHED_INTERVAL)
+        lexicons = _cli_lexicons(args)
+        writer = _open_output(args.output, args.format)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    store = ArticleStore(args.db) if args.db else None
+    done = [0, 0]
+    t0 = time.perf_counter()
+
+    def on_result(q, items, results):
+        # packs modifiés: pris en compte pour les requêtes suivantes (--watch / --schedule)
+        _cli_lexicons_check(lexicons)
+        if store is not None:
+            known = store.known_keys(dedup_key(it.title, it.link) for it in items) if args.new_only else ()
+            store.upsert(items, q)  # tous: un article déjà connu est rattaché à cette requête aussi
+            if known:
+                items = [it for it in items if dedup_key(it.title, it.link) not in known]
+        writer.write(items, q)
+        done[0] += 1
+        done[1] += len(items)
+        if not args.quiet:
+            el = max(time.perf_counter() - t0, 1e-9)
+            for res in results:
+                if not res.ok:
+                    print(f"\n[{q}] {res.label}: {res.error}", file=sys.stderr)
+            runs = f"{done[0]} passages" if args.schedule else f"{done[0]}/{len(queries)} requêtes"
+            print(f"\r{runs} | {done[1]} items | "
+                  f"{done[0] / el:.2f} q/s | {done[1] / el:.1f} items/s", end="", file=sys.stderr)
+
+    cache = None if args.no_cache else open_feed_cache(args.cache_dir, fresh_for=args.fresh_for)
+    links = LinkResolver(open_link_cache(args.link_cache)) if args.resolve_links else None
+    seen_by_query = {} if args.watch > 0 else None
+    workers = 1 if args.profile else max(1, args.workers)
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+    if args.schedule:
+        return _cli_schedule(args, queries, intervals, workers, on_result, cache, writer, store, links)
+    rate = 5.0 if args.rate is None else args.rate
+    cycle = 0
+    try:
+        while True:
+            cycle += 1
+            kw = dict(mode=args.lang, workers=workers, rate=rate, on_result=on_result, cache=cache,
+                      seen_by_query=seen_by_query, fast_parse=not args.feedparser, links=links)
+            if args.profile:
+                path = os.path.join(args.profile, f"cycle-{cycle:04d}.prof")
+                stats, _txt = profile_call(scan_queries, queries, path=path, **kw)
+            else:
+                stats = scan_queries(queries, **kw)
+            if not args.quiet:
+                print(file=sys.stderr)
+            print(json.dumps(stats), file=sys.stderr)
+            if args.metrics:
+                dump_metrics(args.metrics, args.metrics_format)
+            if args.watch <= 0:
+                break
+            time.sleep(args.watch)
+            done[0] = done[1] = 0
+            t0 = time.perf_counter()
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        writer.close()
+        if store is not None:
+            store.close()
+        if links is not None:
+            links.close()
+
+    return 1 if stats["failed_queries"] == len(queries) else 0
+
+
+def _cli_schedule(args, queries, intervals, workers, on_result, cache, writer, store, links=None) -> int:
+    def on_run(q, items, results):
+        on_result(q, items, results)
+        if args.metrics:
+            dump_metrics(args.metrics, args.metrics_format)
+
+    sched = QueryScheduler(workers=workers, rate=SCHED_RATE if args.rate is None else args.rate,
+                           on_result=on_run, cache=cache, fast_parse=not args.feedparser, links=links)
+    for q in queries:
+        sched.add(q, intervals[q], args.lang)
+    try:
+        sched.run_sync()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sched.close()
+        writer.close()
+        if store is not None:
+            store.close()
+        if links is not None:
+            links.close()
+        if not args.quiet:
+            print(file=sys.stderr)
+        print(json.dumps(sched.stats()), file=sys.stderr)
+    return 0
+
+
+def cli_serve(args) -> int:
+    if not _has_module("feedparser"):
+        print("feedparser manquant. Fais: pip install feedparser", file=sys.stderr)
+        return 2
+    try:
+        queries, intervals = _watchlist_queries(args, args.interval)
+        lexicons = _cli_lexicons(args)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    hub = FeedHub(args.keep)
+    store = ArticleStore(args.db) if args.db else None
+    done = [0, 0]
+
+    def on_result(q, items, results):
+        _cli_lexicons_check(lexicons)
+        if store is not None:
+            store.upsert(items, q)
+        hub.publish(q, items)
+        done[0] += 1
+        done[1] += len(items)
+        if not args.quiet:
+            for res in results:
+                if not res.ok:
+                    print(f"\n[{q}] {res.label}: {res.error}", file=sys.stderr)
+            print(f"\r{done[0]} passages | {done[1]} nouveaux items | séquence {hub.seq}", end="", file=sys.stderr)
+
+    cache = None if args.no_cache else open_feed_cache(args.cache_dir)
+    links = LinkResolver(open_link_cache(args.link_cache)) if args.resolve_links else None
+    sched = QueryScheduler(workers=max(1, args.workers), rate=args.rate, on_result=on_result, cache=cache,
+                           fast_parse=not args.feedparser, links=links)
+    for q in queries:
+        job = sched.add(q, intervals[q], args.lang)
+        hub.add_query(q)
+        if store is not None:
+            # redémarrage: les derniers items connus sont servis tout de suite, sans être republiés
+            known = sort_items(store.history(query=q, limit=args.keep))
+            job.seen.update(dedup_key(it.title, it.link) for it in known)
+            hub.publish(q, known)
+    try:
+        srv = FeedServer(hub, args.host, args.port, stats=sched.stats).start()
+    except OSError as e:
+        print(f"Serveur: impossible d'écouter sur {args.host}:{args.port}: {e}", file=sys.stderr)
+        sched.close()
+        return 2
+    print(f"Serveur: {srv.url}  (/items, /rss, /events, /stats, /metrics) | {len(queries)} requêtes",
+          file=sys.stderr)
+    try:
+        sched.run_sync()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.close()
+        sched.close()
+        if store is not None:
+            store.close()
+        if links is not None:
+            links.close()
+        if not args.quiet:
+            print(file=sys.stderr)
+        print(json.dumps(dict(sched.stats(), hub=hub.stats())), file=sys.stderr)
+    return 0
+
+
+def cli_main(argv) -> int:
+    ap = build_arg_parser()
+    args = ap.parse_args(argv)
+    if args.cmd == "scan":
+        if args.new_only and not args.db:
+            ap.error("scan --new-only: --db requis (base des items déjà vus)")
+        return cli_scan(args)
+    if args.cmd == "serve":
+        return cli_serve(args)
+    if args.cmd == "history":
+        return cli_history(args)
+    if args.cmd == "score":
+        return cli_score(args)
+    if args.cmd == "bench":
+        return cli_bench(args)
+    if args.cmd == "search":
+        return cli_search(args)
+    ap.print_help()
+    return 2
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv:
+        sys.exit(cli_main(argv))
+
+    _import_tk()
     root = tk.Tk()
     try:
         style = ttk.Style()
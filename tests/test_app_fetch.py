@@ -0,0 +1,89 @@
+"""Callbacks du thread de fetch de la GUI, sans display: faux root / variables Tk."""
+import threading
+import types
+
+import pytest
+
+import rssreader4 as rr
+
+
+class _Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class _Root:
+    """root.after(0, f, *args) mis en file, exécuté plus tard par run() comme la boucle Tk."""
+
+    def __init__(self):
+        self.pending = []
+        self.errors = []
+
+    def after(self, _ms, fn, *args):
+        self.pending.append((fn, args))
+
+    def run(self):
+        while self.pending:
+            fn, args = self.pending.pop(0)
+            try:
+                fn(*args)
+            except Exception as e:  # Tk journaliserait l'exception du callback sans la propager
+                self.errors.append(e)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    shown = []
+    monkeypatch.setattr(rr, "messagebox", types.SimpleNamespace(showerror=lambda title, msg: shown.append((title, msg))))
+    a = types.SimpleNamespace(_fetching=False, var_watch=_Var(False), var_profile=_Var(False), root=_Root(),
+                              shown=shown)
+    return a
+
+
+def _run_on_fetch(app, monkeypatch, incremental=False):
+    threads = []
+    start = threading.Thread.start
+
+    def track(self):
+        threads.append(self)
+        start(self)
+
+    monkeypatch.setattr(threading.Thread, "start", track)
+    rr.GoogleRssProApp.on_fetch(app, incremental)
+    monkeypatch.setattr(threading.Thread, "start", start)
+    for t in threads:
+        t.join(10)
+    app.root.run()
+
+
+def test_invalid_query_error_reaches_messagebox(app, monkeypatch):
+    def invalid():
+        raise ValueError("Requête vide")
+
+    app.build_and_validate = invalid
+    _run_on_fetch(app, monkeypatch)
+    assert app.root.errors == []
+    assert app.shown == [("Erreur", "Requête vide")]
+    assert app._fetching is False
+
+
+def test_profiled_fetch_creates_cache_dir(app, monkeypatch, tmp_path):
+    cache_home = tmp_path / "xdg-cache"  # absent, comme au premier lancement
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    item = rr.Item(1766100000, "Broadcom shares soar", "Reuters", "https://example.com/1", 3, "POS", "en")
+    monkeypatch.setattr(rr, "fetch_query", lambda fetcher, urls, parallel=True, seen=None:
+                        ([item], [rr.FetchResult("EN", urls[0][1])]))
+    shown_items = []
+    app.var_profile = _Var(True)
+    app.build_and_validate = lambda: ("AVGO", [("EN", "http://127.0.0.1:9/en")])
+    app.fetcher = types.SimpleNamespace(cache=None)
+    app.store = None
+    app.set_items = lambda items, warn: shown_items.extend(items)
+    _run_on_fetch(app, monkeypatch)
+    assert app.root.errors == [] and app.shown == []
+    assert shown_items == [item]
+    assert (cache_home / "rssreader4" / "fetch.prof").is_file()
+    assert "function calls" in app._last_profile  # texte pstats
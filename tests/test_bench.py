@@ -0,0 +1,79 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import rssreader4 as rr
+from benchmarks import bench
+from benchmarks.support import synthetic_rss
+
+
+def _results(**cases):
+    return {"results": {case.replace("__", "/"): {"n": 100, "s": s} for case, s in cases.items()}}
+
+
+def test_compare_reports_slower_cases_worst_first():
+    base = _results(parse__a=0.010, parse__b=0.010, score__a=0.010)
+    cur = _results(parse__a=0.013, parse__b=0.020, score__a=0.011)
+    regs = bench.bench_compare(cur, base, tolerance=0.25)
+    assert [r["case"] for r in regs] == ["parse/b", "parse/a"]
+    assert regs[0]["ratio"] == 2.0
+
+
+def test_compare_ignores_noise_floor_and_new_cases():
+    base = _results(tiny=rr.BENCH_MIN_S / 10)
+    cur = _results(tiny=rr.BENCH_MIN_S / 2, new=1.0)
+    assert bench.bench_compare(cur, base) == []
+
+
+def test_suite_covers_synthetic_and_recorded_feeds(tmp_path):
+    (tmp_path / "AVGO-EN.xml").write_bytes(synthetic_rss(30, seed=7))
+    res = bench.bench_suite(sizes=(20,), fixtures_dir=str(tmp_path), repeat=1, render=False)
+    for stage in ("http+parse", "parse_google_news", "score_batch", "items_from_entries", "export_jsonl"):
+        assert res["results"][f"{stage}/synthetic-20"]["n"] == 20
+        assert res["results"][f"{stage}/fixture-AVGO-EN"]["n"] == 30
+    assert res["meta"]["sizes"] == [20] and not res["meta"]["render"]
+    assert {"import_ms", "ok", "forbidden_loaded"} <= set(res["import"])
+
+
+@pytest.fixture
+def fake_suite(monkeypatch):
+    def suite(*_a, **_kw):
+        return {"meta": {}, "results": {"parse/x": {"n": 10, "s": 0.5}}, "import": {"ok": True}}
+    monkeypatch.setattr(bench, "bench_suite", suite)
+
+
+def test_cli_bench_exit_code_on_regression(tmp_path, fake_suite):
+    baseline = tmp_path / "base.json"
+    baseline.write_text(json.dumps({"results": {"parse/x": {"n": 10, "s": 0.1}}}))
+    out = tmp_path / "out.json"
+    assert rr.cli_main(["bench", "--baseline", str(baseline), "-o", str(out)]) == 1
+    assert json.loads(out.read_text())["regressions"][0]["case"] == "parse/x"
+
+    baseline.write_text(json.dumps({"results": {"parse/x": {"n": 10, "s": 0.5}}}))
+    assert rr.cli_main(["bench", "--baseline", str(baseline), "-o", str(out)]) == 0
+
+
+def test_cli_bench_exit_code_on_failed_check(monkeypatch, capsys):
+    def broken(*_a, **_kw):
+        raise bench.BenchCheckError("parité rompue")
+    monkeypatch.setattr(bench, "bench_suite", broken)
+    assert rr.cli_main(["bench", "-o", "-"]) == 1
+    assert "parité rompue" in capsys.readouterr().err
+
+
+def test_checks_survive_python_O():
+    code = "from benchmarks.bench import _check; _check(False, 'contrôle')"
+    proc = subprocess.run([sys.executable, "-O", "-c", code], capture_output=True, text=True,
+                          cwd=rr.os.path.dirname(rr.os.path.abspath(rr.__file__)))
+    assert proc.returncode != 0 and "BenchCheckError" in proc.stderr
+
+
+def test_benchmarks_do_not_need_tests_package():
+    # sous-commande bench livrée sans tests/: un import de tests.* échouerait ici
+    code = ("import sys; sys.modules['tests'] = None; import rssreader4 as rr; "
+            "bench = rr._import_benchmarks(); print(bench.bench_scoring(200)['n'])")
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                          cwd=rr.os.path.dirname(rr.os.path.abspath(rr.__file__)))
+    assert proc.returncode == 0 and proc.stdout.strip() == "200", proc.stderr
@@ -0,0 +1,85 @@
+"""Export: ajout (Export continu) sur un Parquet / JSON colonnaire existant, erreurs du thread d'écriture."""
+import json
+import threading
+
+import pytest
+
+import rssreader4 as rr
+from benchmarks.support import synthetic_items
+
+
+def _write(path, items, append=False, fmt=None):
+    w = rr.ExportWriter(str(path), fmt=fmt, append=append)
+    try:
+        w.write(items, "AVGO")
+    finally:
+        w.close()
+    return w
+
+
+def test_parquet_append_keeps_existing_rows(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "export.parquet"
+    items = synthetic_items(4, 1)
+    _write(path, items[:3])
+    _write(path, items[3:], append=True)
+    table = pq.read_table(str(path))
+    assert table.num_rows == 4
+    assert table.column("url").to_pylist() == [it.link for it in items]
+    assert not (tmp_path / "export.parquet.tmp").exists()
+
+    _write(path, items[:1])  # sans append: fichier remplacé
+    assert pq.read_table(str(path)).num_rows == 1
+
+
+def test_columns_json_append_keeps_existing_rows(tmp_path):
+    path = tmp_path / "export.json"
+    items = synthetic_items(5, 2)
+    _write(path, items[:3], fmt="columns")
+    _write(path, items[3:], append=True, fmt="columns")
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    assert doc["columns"] == rr.CSV_FIELDS
+    assert {len(v) for v in doc["data"].values()} == {5}
+    assert doc["data"]["url"] == [it.link for it in items]
+
+
+@pytest.mark.parametrize("name, fmt", [("export.json", "columns"), ("export.parquet", None)])
+def test_append_to_foreign_file_is_refused(tmp_path, name, fmt):
+    if fmt is None:
+        pytest.importorskip("pyarrow")
+    path = tmp_path / name
+    path.write_text('{"autre": "chose"}', encoding="utf-8")
+    with pytest.raises(ValueError, match="ajout impossible"):
+        rr.ExportWriter(str(path), fmt=fmt, append=True)
+    assert path.read_text(encoding="utf-8") == '{"autre": "chose"}'
+
+
+class _FailingWriter:
+    path = "x"
+    fallback = ""
+
+    def __init__(self):
+        self.rows = 0
+        self.closed = False
+
+    def write(self, items, query=""):
+        if self.rows:
+            raise OSError("disque plein")
+        self.rows += len(items)
+
+    def close(self):
+        self.closed = True
+
+
+def test_background_exporter_refuses_batches_after_error():
+    done = threading.Event()
+    errors = []
+    writer = _FailingWriter()
+    exporter = rr.BackgroundExporter(writer, on_done=lambda err: (errors.append(err), done.set()))
+    exporter.submit(synthetic_items(3, 3), "AVGO")
+    exporter.submit(synthetic_items(2, 4), "AVGO")  # échoue
+    assert done.wait(5)
+    assert isinstance(errors[0], OSError) and writer.closed and writer.rows == 3
+    with pytest.raises(RuntimeError, match="disque plein"):
+        exporter.submit(synthetic_items(1, 5), "AVGO")
+    assert exporter.submitted == 5
@@ -0,0 +1,154 @@
+"""FeedCache: entrées en JSON (sans pickle), 304 / ETag via FetchEngine, TTL et LRU."""
+import os
+import pickle
+import threading
+
+import pytest
+
+import rssreader4 as rr
+from benchmarks.support import StubFeedServer, synthetic_rss
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "edge-EN.xml")
+
+
+def _item_keys(entries):
+    return [(it.ts, it.title, it.source, it.link) for it in rr.items_from_entries(entries)]
+
+
+def _source_href(e):
+    return getattr(getattr(e, "source", None), "href", None)
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_roundtrip_preserves_entries(tmp_path, fast):
+    with open(FIXTURE, "rb") as f:
+        entries = rr.parse_feed(f.read(), fast=fast)
+    cache = rr.FeedCache(str(tmp_path))
+    cache.put("https://news.google.com/rss/search?q=NVDA", '"v1"', None, entries)
+    assert [fn[-5:] for fn in os.listdir(tmp_path)] == [".json"]
+
+    rec = rr.FeedCache(str(tmp_path)).get("https://news.google.com/rss/search?q=NVDA")  # relu après redémarrage
+    assert rec["etag"] == '"v1"' and rec["last_modified"] is None
+    cached = rec["entries"]
+    assert all(type(e) is rr.FeedEntry for e in cached)
+    assert _item_keys(cached) == _item_keys(entries)
+    assert [_source_href(e) for e in cached] == [_source_href(e) for e in entries]
+    assert [e.published for e in cached] == [getattr(e, "published", "") for e in entries]
+
+
+class _Planted:
+    def __init__(self, log):
+        self.log = log
+
+    def __reduce__(self):
+        return (list.append, (self.log, "chargé"))
+
+
+def test_pickle_and_corrupt_files_are_not_loaded(tmp_path):
+    url = "https://news.google.com/rss/search?q=AVGO"
+    loaded = []
+    key = rr.FeedCache._key(url)
+    (tmp_path / f"{key}.pkl").write_bytes(pickle.dumps(_Planted(loaded)))
+    cache = rr.FeedCache(str(tmp_path))
+    assert cache.get(url) is None
+    assert not loaded and os.listdir(tmp_path) == []
+
+    cache.put(url, '"v1"', None, rr.parse_feed(synthetic_rss(3), fast=True))
+    (tmp_path / f"{key}.json").write_bytes(b'{"url": "x", "etag": null, "last_modified": null, '
+                                           b'"entries": [[1, 2, 3, "pas un entier", null]]}')
+    cache = rr.FeedCache(str(tmp_path))
+    assert cache.get(url) is None
+    assert os.listdir(tmp_path) == []  # entrée illisible supprimée
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    entries = rr.parse_feed(synthetic_rss(20), fast=True)
+    cache = rr.FeedCache(str(tmp_path), ttl=3600)
+    cache.put("u1", None, None, entries)
+    size = cache.stats()["bytes"]
+    cache.max_bytes = 2 * size + size // 2
+    cache.put("u2", None, None, entries)
+    assert cache.get("u1") is not None           # u1 redevient le plus récent
+    cache.put("u3", None, None, entries)
+    assert cache.get("u2") is None and cache.get("u1") is not None and cache.get("u3") is not None
+    assert cache.stats()["evictions"] == 1
+
+    cache.ttl = -1
+    assert cache.get("u1") is None
+
+
+def test_fetch_engine_revalidates_with_etag(tmp_path):
+    body = synthetic_rss(15, seed=7)
+    seen = []
+    lock = threading.Lock()
+
+    def handler(h):
+        with lock:
+            seen.append(h.headers.get("If-None-Match"))
+        if h.headers.get("If-None-Match") == '"v1"':
+            h.send_response(304)
+            h.send_header("ETag", '"v1"')
+            h.end_headers()
+            return True
+        h.send_response(200)
+        h.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        h.send_header("ETag", '"v1"')
+        h.send_header("Content-Length", str(len(body)))
+        h.end_headers()
+        h.wfile.write(body)
+        return True
+
+    with StubFeedServer(handler=handler) as srv:
+        url = f"{srv.url}/rss"
+        engine = rr.FetchEngine(cache=rr.FeedCache(str(tmp_path)))
+        try:
+            first = engine.fetch_entries(url)
+            again = engine.fetch_entries(url)
+        finally:
+            engine.close()
+        # redémarrage: nouveau cache sur le même dossier
+        engine = rr.FetchEngine(cache=rr.FeedCache(str(tmp_path)))
+        try:
+            restarted = engine.fetch_entries(url)
+            st = engine.cache.stats()
+        finally:
+            engine.close()
+
+    assert seen == [None, '"v1"', '"v1"']
+    assert _item_keys(again) == _item_keys(restarted) == _item_keys(first)
+    assert st["hits"] == st["not_modified"] == 1
+
+
+@pytest.mark.parametrize("orphans", [1, 2])
+def test_304_without_cached_record_is_a_miss(tmp_path, orphans):
+    body = synthetic_rss(5, seed=3)
+    seen = []
+
+    def handler(h):
+        seen.append((h.headers.get("If-None-Match"), h.headers.get("Cache-Control")))
+        if len(seen) <= orphans:  # proxy qui répond 304 à un client sans cache
+            h.send_response(304)
+            h.send_header("Content-Length", "0")
+            h.end_headers()
+            return True
+        h.send_response(200)
+        h.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        h.send_header("ETag", '"v1"')
+        h.send_header("Content-Length", str(len(body)))
+        h.end_headers()
+        h.wfile.write(body)
+        return True
+
+    with StubFeedServer(handler=handler) as srv:
+        engine = rr.FetchEngine(cache=rr.FeedCache(str(tmp_path)))
+        try:
+            if orphans == 1:
+                entries = engine.fetch_entries(f"{srv.url}/rss")
+                assert _item_keys(entries) == _item_keys(rr.parse_feed(body, fast=True))
+                assert engine.cache.get(f"{srv.url}/rss")["etag"] == '"v1"'
+            else:
+                with pytest.raises(ValueError, match="304"):
+                    engine.fetch_entries(f"{srv.url}/rss")
+        finally:
+            engine.close()
+    assert seen == [(None, None), (None, "no-cache")]
@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+import requests
+
+import rssreader4 as rr
+from benchmarks.support import StubFeedServer, synthetic_rss
+
+N = 40
+
+
+@pytest.fixture
+def server():
+    ports = []
+    lock = threading.Lock()
+
+    def record(h):
+        with lock:
+            ports.append(h.client_address[1])
+        return False  # réponse servie par les routes
+
+    routes = {"/fr": synthetic_rss(N, 1), "/en": synthetic_rss(N, 2)}
+    with StubFeedServer(routes, delay=0.3, handler=record) as srv:
+        srv.client_ports = ports
+        yield srv
+
+
+@pytest.fixture
+def engine():
+    eng = rr.FetchEngine()
+    yield eng
+    eng.close()
+
+
+def test_editions_are_fetched_concurrently(server, engine):
+    urls = [("FR", server.url + "/fr"), ("EN", server.url + "/en")]
+    t0 = time.perf_counter()
+    results = engine.fetch_many(urls)
+    elapsed = time.perf_counter() - t0
+    assert [r.label for r in results] == ["FR", "EN"]
+    assert all(r.ok and len(r.entries) == N for r in results)
+    assert elapsed < 0.55, f"éditions en série: {elapsed:.2f}s"
+
+    t0 = time.perf_counter()
+    engine.fetch_many(urls, parallel=False)
+    assert time.perf_counter() - t0 >= 0.6
+
+
+def test_failed_edition_keeps_the_other(server, engine):
+    dead = rr.FetchEngine(timeout=(1, 1))
+    try:
+        results = engine.fetch_many([("FR", server.url + "/fr"), ("EN", server.url + "/missing")])
+        refused = dead.fetch_many([("FR", "http://127.0.0.1:9/fr"), ("EN", server.url + "/en")])
+    finally:
+        dead.close()
+    fr, en = results
+    assert fr.ok and len(fr.entries) == N
+    assert not en.ok and en.entries == []
+    assert isinstance(en.error, requests.HTTPError) and en.error.response.status_code == 404
+    assert isinstance(refused[0].error, requests.ConnectionError) and refused[1].ok
+
+
+def test_fetch_query_merges_editions_despite_failure(server, engine):
+    items, results = rr.fetch_query(engine, [("FR", server.url + "/fr"), ("EN", server.url + "/nope"),
+                                             ("EN2", server.url + "/fr")])
+    assert len(items) == N  # la 2e copie du flux FR est dédoublonnée
+    assert [r.ok for r in results] == [True, False, True]
+    assert [it.ts for it in items] == sorted((it.ts for it in items), reverse=True)
+
+
+def test_session_connections_are_reused(server, engine):
+    for _ in range(4):
+        assert engine.fetch_many([("FR", server.url + "/fr")])[0].ok
+    assert len(set(server.client_ports)) == 1, "une connexion par requête: session non réutilisée"
+
+    del server.client_ports[:]
+    for _ in range(3):
+        engine.fetch_many([("FR", server.url + "/fr"), ("EN", server.url + "/en")])
+    assert len(server.client_ports) == 6
+    assert len(set(server.client_ports)) <= 2
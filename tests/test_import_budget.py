@@ -0,0 +1,38 @@
+"""Démarrage à froid: `import rssreader4` dans un processus neuf, budget IMPORT_BUDGET_MS et modules paresseux."""
+import json
+import os
+import subprocess
+import sys
+
+import rssreader4 as rr
+
+HERE = os.path.dirname(os.path.abspath(rr.__file__))
+LAZY = ("tkinter", "numpy", "requests", "feedparser") + rr.IMPORT_FORBIDDEN
+REPEAT = 5
+
+
+def _run(args, code):
+    env = dict(os.environ, PYTHONPATH=HERE + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    return subprocess.run([sys.executable, *args, "-c", code], cwd=HERE, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def _import_ms(stderr):
+    """Cumul (ms) de la ligne rssreader4 d'une sortie -X importtime."""
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if line.startswith("import time:") and len(parts) == 3 and parts[2].strip() == "rssreader4":
+            return int(parts[1]) / 1000
+    raise AssertionError("rssreader4 absent de la sortie -X importtime")
+
+
+def test_import_within_budget():
+    _run([], "import rssreader4")  # compilation des .pyc, non comptée
+    best = min(_import_ms(_run(["-X", "importtime"], "import rssreader4").stderr) for _ in range(REPEAT))
+    assert best <= rr.IMPORT_BUDGET_MS, f"import rssreader4: {best:.1f} ms > {rr.IMPORT_BUDGET_MS} ms"
+
+
+def test_heavy_modules_not_imported():
+    code = ("import json, sys, rssreader4; "
+            f"print(json.dumps(sorted(m for m in {sorted(set(LAZY))!r} if m in sys.modules)))")
+    assert json.loads(_run([], code).stdout) == []
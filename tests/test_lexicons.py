@@ -0,0 +1,169 @@
+"""Packs de lexiques: cache compilé (JSON, sans pickle), LangDetector reconstruit, historique re-scoré."""
+import json
+import os
+import pickle
+import threading
+import types
+
+import pytest
+
+import rssreader4 as rr
+from benchmarks.support import synthetic_titles
+
+PACK = {"lang": "en", "sector": "semis", "pos": {"hyperscaler": 3, "design": 2}, "neg": {"export": 0},
+        "phrases": {"raises guidance": 3, "cuts guidance": -3}}
+
+
+@pytest.fixture
+def lexicon_state(monkeypatch):
+    """Lexiques, BatchScorer et détecteur de langue globaux restaurés après le test."""
+    monkeypatch.setattr(rr, "_LEXICONS", dict(rr._LEXICONS))
+    monkeypatch.setattr(rr, "_BATCH_SCORER", None)
+    monkeypatch.setattr(rr, "_LANG_DETECTOR", rr.LangDetector())
+    monkeypatch.setattr(rr, "_LEXICON_STATE", dict(rr._LEXICON_STATE))
+
+
+@pytest.fixture
+def packs(tmp_path):
+    d = tmp_path / "packs"
+    d.mkdir()
+    (d / "10-semis.json").write_text(json.dumps(PACK), encoding="utf-8")
+    return str(d)
+
+
+def _scores(lex, samples):
+    return [lex.score(t, s) for t, s in samples]
+
+
+def test_cache_is_json_and_rebuilds_same_lexicon(packs, tmp_path):
+    cache = str(tmp_path / "cache")
+    samples = synthetic_titles(2000, 1) + [("Nvidia raises guidance for hyperscaler demand", "Reuters")]
+    rr.METRICS.reset()
+    built = rr.load_lexicons(packs, cache_dir=cache)
+    assert rr.METRICS.counters.get("lexicon_cache_miss") == 2
+    files = sorted(os.listdir(cache))
+    assert files and all(fn.endswith(".json") for fn in files)
+    for fn in files:
+        with open(os.path.join(cache, fn), "rb") as f:
+            head, _, body = f.read().partition(b"\n")
+        assert json.loads(head)["format"] == rr.LEXICON_FORMAT
+        json.loads(body)
+
+    rr.METRICS.reset()
+    cached = rr.load_lexicons(packs, cache_dir=cache)
+    assert rr.METRICS.counters.get("lexicon_cache_hit") == 2
+    assert not rr.METRICS.counters.get("lexicon_cache_miss")
+    for lang in ("fr", "en"):
+        assert cached[lang].digest == built[lang].digest
+        assert _scores(cached[lang], samples) == _scores(built[lang], samples)
+    assert cached["en"].word_w["hyperscaler"] == 3 and cached["en"].phrases_w["raises guidance"] == 3
+
+
+def test_batch_scorer_from_cache(packs, tmp_path, lexicon_state):
+    pytest.importorskip("numpy")
+    cache = str(tmp_path / "cache")
+    samples = synthetic_titles(1500, 2)
+    titles, sources = [t for t, _s in samples], [s for _t, s in samples]
+    rr.install_lexicons(rr.load_lexicons(packs, cache_dir=cache), packs)
+    fresh = [x.tolist() for x in rr.score_batch(titles, sources, learn=False)]
+    assert any(fn.startswith("batch-") for fn in os.listdir(cache))
+
+    rr.install_lexicons(rr.load_lexicons(packs, cache_dir=cache), packs)
+    rr.METRICS.reset()
+    cached = [x.tolist() for x in rr.score_batch(titles, sources, learn=False)]
+    assert rr.METRICS.counters.get("lexicon_cache_hit") == 1
+    assert cached == fresh
+    expected = [rr.score_text_auto(t, s, False) for t, s in samples]
+    assert [(sc, lg) for sc, lg in zip(cached[0], cached[2])] == expected
+
+
+def test_tampered_or_pickled_cache_is_not_loaded(packs, tmp_path):
+    cache = tmp_path / "cache"
+    rr.load_lexicons(packs, cache_dir=str(cache))
+    fn = next(fn for fn in os.listdir(cache) if fn.startswith("lex-en-"))
+    path = cache / fn
+    head, _, body = path.read_bytes().partition(b"\n")
+    state = json.loads(body)
+    state["word_w"]["hyperscaler"] = -100
+    path.write_bytes(head + b"\n" + json.dumps(state).encode("utf-8"))
+
+    # ancien cache pickle au même nom: jamais désérialisé, supprimé à la prochaine écriture
+    loaded = []
+    planted = cache / fn.replace(".json", ".pkl")
+    planted.write_bytes(pickle.dumps(_Planted(loaded)))
+
+    rr.METRICS.reset()
+    lex = rr.load_lexicons(packs, cache_dir=str(cache))
+    assert rr.METRICS.counters.get("lexicon_cache_errors") == 1
+    assert lex["en"].word_w["hyperscaler"] == 3
+    assert not loaded
+    assert not planted.exists()
+
+
+class _Planted:
+    def __init__(self, log):
+        self.log = log
+
+    def __reduce__(self):
+        return (list.append, (self.log, "chargé"))
+
+
+def test_pack_vocabulary_reaches_language_detection(packs, lexicon_state):
+    det = rr.get_lang_detector()
+    det.detect("Hausse des ventes", "Les Echos")
+    for _ in range(rr.LANG_PRIOR_MIN):
+        det.detect("Broadcom shares soar after strong quarter", "Reuters")
+    priors = det.priors()
+    assert abs(det.token_weight("hyperscaler")) < rr.LANG_WORD_W
+
+    rr.install_lexicons(rr.load_lexicons(packs), packs)
+    new = rr.get_lang_detector()
+    assert new is not det
+    assert new.token_weight("hyperscaler") == rr.LANG_WORD_W
+    assert new.priors() == priors                     # a priori par source conservés
+
+    rr.install_lexicons(rr.load_lexicons(os.path.join(os.path.dirname(packs), "absent")))
+    assert abs(rr.get_lang_detector().token_weight("hyperscaler")) < rr.LANG_WORD_W
+
+
+def test_store_rescore_updates_history(tmp_path):
+    store = rr.ArticleStore(str(tmp_path / "a.db"))
+    items = [rr.Item(1700000000 + i, f"Titre {i}", "Reuters", f"https://example.com/{i}", 0, "NEU", "fr")
+             for i in range(5)]
+    try:
+        store.upsert(items, "AVGO")
+        rows = [(7, "POS", "en", rr.dedup_key(it.title, it.link)) for it in items[:3]]
+        rows.append((1, "POS", "en", "absente"))
+        assert store.rescore(rows) == 3
+        hist = {it.title: (it.score, it.label, it.lang, it.query) for it in store.history(query="AVGO")}
+    finally:
+        store.close()
+    assert hist["Titre 0"] == (7, "POS", "en", "AVGO")
+    assert hist["Titre 4"] == (0, "NEU", "fr", "AVGO")
+
+
+def test_lexicon_apply_writes_rescored_items_to_store(tmp_path, monkeypatch):
+    store = rr.ArticleStore(str(tmp_path / "a.db"))
+    items = [rr.Item(1700000000, "Broadcom shares soar", "Reuters", "https://example.com/1", 0, "NEU", "en"),
+             rr.Item(1700000001, "Broadcom plunges", "Reuters", "https://example.com/2", 0, "NEU", "en")]
+    store.upsert(items, "AVGO")
+    threads = []
+    start = threading.Thread.start
+
+    def track(self):
+        threads.append(self)
+        start(self)
+
+    app = types.SimpleNamespace(store=store, all_items=lambda: items, _rebuild_indexes=lambda items: None,
+                                refresh_view=lambda: None, update_status=lambda extra="": None)
+    app._store_rescored = types.MethodType(rr.GoogleRssProApp._store_rescored, app)
+    monkeypatch.setattr(threading.Thread, "start", track)
+    rr.GoogleRssProApp._lexicon_apply(app, items, [4, -5], ["POS", "NEG"], ["en", "en"], 1, 0.01)
+    monkeypatch.undo()
+    for t in threads:
+        t.join(5)
+    try:
+        hist = {it.link: (it.score, it.label) for it in store.history(query="AVGO")}
+    finally:
+        store.close()
+    assert hist == {"https://example.com/1": (4, "POS"), "https://example.com/2": (-5, "NEG")}
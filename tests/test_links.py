@@ -0,0 +1,100 @@
+"""Liens canoniques: décodage hors ligne, LinkResolver contre un serveur de redirection, LinkCache (JSON, LRU)."""
+import json
+import pickle
+
+import pytest
+
+import rssreader4 as rr
+from benchmarks.support import RedirectFeedServer, gnews_token
+
+N = 40
+WORKERS = 4
+
+
+@pytest.mark.parametrize("url", ["https://www.reuters.com/markets/broadcom-2025-12-19/",
+                                 "https://example.com/" + "é" * 200])
+def test_decode_gnews_link(url):
+    token = gnews_token(url)
+    assert rr.decode_gnews_link(f"https://news.google.com/rss/articles/{token}?oc=5") == url
+
+
+@pytest.mark.parametrize("link", ["https://news.google.com/rss/articles/AU_yqLNotDecodable?oc=5",
+                                  "https://news.google.com/rss/articles/?oc=5", "",
+                                  "https://news.google.com/rss/articles/" + gnews_token("https://example.com/abc")[:-8]])
+def test_decode_gnews_link_opaque(link):
+    assert rr.decode_gnews_link(link) is None
+
+
+def _scan(srv, path):
+    resolver = rr.LinkResolver(rr.LinkCache(path), workers=WORKERS, rate=0, hosts=srv.hosts)
+    fetcher = rr.FetchEngine(links=resolver)
+    head0 = srv.state["head"]
+    try:
+        items, results = rr.fetch_query(fetcher, [("EN", f"{srv.url}/feed")])
+    finally:
+        fetcher.close()
+        resolver.close()
+    assert all(res.ok for res in results)
+    return items, srv.state["head"] - head0, resolver
+
+
+def test_resolver_dedups_on_canonical_url(tmp_path):
+    path = str(tmp_path / "links.json")
+    with RedirectFeedServer(N, delay=0.05) as srv:
+        items, heads, resolver = _scan(srv, path)
+        missing = N // 10
+        # chaque article apparaît une fois; les liens en 404 restent opaques (pas de dédup possible)
+        assert len(items) == N + missing
+        unresolved = [it.link for it in items if resolver.is_redirect(it.link)]
+        assert len(unresolved) == missing
+        assert sorted(it.link for it in items if not resolver.is_redirect(it.link)) == \
+            sorted(f"{srv.site}/article/{i}" for i in range(N))
+        assert heads == N  # un HEAD par jeton opaque distinct
+        assert srv.state["max_inflight"] <= WORKERS
+        assert srv.state["max_inflight"] > 1  # HEAD bien parallélisés
+        st = resolver.stats()
+        assert st["decoded"] >= N and st["resolved"] == N - missing and st["failed"] == missing
+
+        # second passage (cache persistant relu): plus aucun HEAD hormis les échecs
+        items2, heads2, _ = _scan(srv, path)
+    assert heads2 == missing
+    assert [(it.title, it.link) for it in items2] == [(it.title, it.link) for it in items]
+
+
+def test_link_cache_json_roundtrip_and_lru(tmp_path):
+    path = tmp_path / "links.json"
+    cache = rr.LinkCache(str(path), max_entries=10)
+    for i in range(20):
+        cache.put(f"https://news.google.com/rss/articles/x{i}", f"https://example.com/{i}")
+    assert len(cache) == 10 and cache.evictions == 10
+    assert cache.get("https://news.google.com/rss/articles/x0?oc=5") is None
+    assert cache.get("https://news.google.com/rss/articles/x10?hl=fr") == "https://example.com/10"
+    cache.save()
+    rows = json.loads(path.read_text(encoding="utf-8"))
+    assert rows[-1] == ["https://news.google.com/rss/articles/x10", "https://example.com/10"]  # ordre LRU gardé
+
+    back = rr.LinkCache(str(path), max_entries=10)
+    assert len(back) == 10 and back.get("https://news.google.com/rss/articles/x19") == "https://example.com/19"
+    assert len(rr.LinkCache(str(path), max_entries=4)) == 4
+
+
+class _Planted:
+    def __init__(self, log):
+        self.log = log
+
+    def __reduce__(self):
+        return (list.append, (self.log, "chargé"))
+
+
+@pytest.mark.parametrize("kind", ["pickle", "dict", "pairs"])
+def test_link_cache_ignores_foreign_files(tmp_path, kind):
+    path = tmp_path / "links.json"
+    loaded = []
+    payload = {"pickle": pickle.dumps(_Planted(loaded)),
+               "dict": b'{"https://news.google.com/rss/articles/x": "https://example.com/"}',
+               "pairs": b'[["https://news.google.com/rss/articles/x", 3]]'}[kind]
+    path.write_bytes(payload)
+    cache = rr.LinkCache(str(path))
+    assert len(cache) == 0 and not loaded
+    cache.save()  # illisible: réécrit au format courant
+    assert json.loads(path.read_text(encoding="utf-8")) == []
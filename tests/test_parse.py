@@ -0,0 +1,96 @@
+"""Parseur Google News (iter_google_news) contre feedparser, sur des flux enregistrés (tests/fixtures)."""
+import glob
+import os
+
+import pytest
+
+import rssreader4 as rr
+
+feedparser = pytest.importorskip("feedparser")
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "fixtures", "*.xml")))
+
+
+def _read(path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _fields(e) -> dict:
+    st = getattr(e, "published_parsed", None)
+    src = getattr(e, "source", None)
+    return {
+        "title": rr.safe_strip(getattr(e, "title", "")),
+        "link": rr.safe_strip(getattr(e, "link", "")),
+        "published": getattr(e, "published", "") or "",
+        "published_parsed": tuple(st[:6]) if st else None,
+        "timestamp": rr.entry_timestamp(e),
+        "source": rr.entry_source(e),
+        "source_href": (getattr(src, "href", "") or "") if src is not None else "",
+    }
+
+
+def test_fixtures_present():
+    assert len(FIXTURES) >= 3
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_fast_parser_matches_feedparser(path):
+    data = _read(path)
+    fast = list(rr.iter_google_news(data))
+    ref = feedparser.parse(data).entries
+    assert len(fast) == len(ref)
+    for i, (a, b) in enumerate(zip(fast, ref)):
+        fa, fb = _fields(a), _fields(b)
+        for name in fa:
+            assert fa[name] == fb[name], f"entrée {i}, champ {name}"
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_items_match_feedparser(path):
+    data = _read(path)
+    fast = rr.items_from_entries(rr.parse_feed(data, fast=True))
+    ref = rr.items_from_entries(rr.parse_feed(data, fast=False))
+    key = lambda it: (it.ts, it.title, it.source, it.link, it.score, it.label, it.lang)  # noqa: E731
+    assert [key(it) for it in fast] == [key(it) for it in ref]
+
+
+def test_edge_cases_in_fixture():
+    entries = list(rr.iter_google_news(_read(os.path.join(os.path.dirname(__file__), "fixtures", "edge-EN.xml"))))
+    by_link = {e.link.strip(): e for e in entries}
+    no_source = by_link["https://news.google.com/rss/articles/CBMiZ0FVX3lxTE1fZWRnZTM?oc=5"]
+    assert rr.entry_source(no_source) == ""
+    no_date = by_link["https://news.google.com/rss/articles/CBMiZ0FVX3lxTE1fZWRnZTQ?oc=5"]
+    assert rr.entry_timestamp(no_date) is None
+    # +0900 -> 00:30 UTC
+    tz = by_link["https://news.google.com/rss/articles/CBMiZ0FVX3lxTE1fZWRnZTI?oc=5"]
+    assert tz.published_parsed[:6] == (2025, 12, 19, 0, 30, 0)
+
+
+UNEXPECTED = {
+    "atom": b'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>t</title>'
+            b'<entry><title>A</title><link href="https://example.com/a"/></entry></feed>',
+    "html": b"<!DOCTYPE html><html><head><title>Erreur</title></head><body><p>429</p></body></html>",
+    "garbage": b"\x00\x01 ceci n'est pas du XML",
+    "truncated": b'<?xml version="1.0"?><rss version="2.0"><channel><item><title>A</title>',
+    "unknown_tag": b'<?xml version="1.0"?><rss version="2.0"><channel><item><title>A</title>'
+                   b'<link>https://example.com/a</link><enclosure url="https://example.com/a.mp3"/>'
+                   b'</item></channel></rss>',
+    "missing_link": b'<?xml version="1.0"?><rss version="2.0"><channel><item><title>A</title>'
+                    b'</item></channel></rss>',
+}
+
+
+@pytest.mark.parametrize("name", sorted(UNEXPECTED))
+def test_unexpected_feed(name):
+    with pytest.raises(rr.UnexpectedFeed):
+        list(rr.iter_google_news(UNEXPECTED[name]))
+
+
+@pytest.mark.parametrize("name", ["atom", "unknown_tag"])
+def test_parse_feed_falls_back_to_feedparser(name):
+    data = UNEXPECTED[name]
+    before = rr.METRICS.counters.get("parse_fallback", 0)
+    entries = rr.parse_feed(data, fast=True)
+    assert rr.METRICS.counters.get("parse_fallback", 0) == before + 1
+    assert [e.title for e in entries] == [e.title for e in feedparser.parse(data).entries] == ["A"]
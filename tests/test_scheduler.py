@@ -0,0 +1,180 @@
+"""QueryScheduler: token bucket par hôte, backoff 429 / Retry-After, survie aux exceptions."""
+import asyncio
+import random
+import threading
+import time
+
+import pytest
+
+import rssreader4 as rr
+from benchmarks.support import StubFeedServer, synthetic_rss
+
+
+def _feed_server(status_for=None):
+    """Serveur local: 200 + un item (titre unique) par hit; status_for(n) -> code d'erreur éventuel."""
+    hits = []
+    lock = threading.Lock()
+
+    def handler(h):
+        with lock:
+            hits.append(time.monotonic())
+            n = len(hits)
+        status = status_for(n) if status_for else None
+        if status:
+            h.send_response(status)
+            if status == 429:
+                h.send_header("Retry-After", "1")
+            h.send_header("Content-Length", "0")
+            h.end_headers()
+            return True
+        body = synthetic_rss(1, seed=n, titles=[(f"Broadcom to hold annual shareholder meeting {n}", "Reuters")])
+        h.send_response(200)
+        h.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        h.send_header("Content-Length", str(len(body)))
+        h.end_headers()
+        h.wfile.write(body)
+        return True
+
+    srv = StubFeedServer(handler=handler)
+    srv.hit_times = hits
+    return srv
+
+
+def _scheduler(url_for, **kw):
+    kw.setdefault("workers", 4)
+    kw.setdefault("backoff_base", 0.4)
+    kw.setdefault("backoff_max", 2.0)
+    return rr.QueryScheduler(url_for=url_for, seed=0, **kw)
+
+
+def test_backoff_delay_bounds():
+    rnd = random.Random(0)
+    for attempt in range(1, 12):
+        d = min(rr.SCHED_BACKOFF_MAX, rr.SCHED_BACKOFF_BASE * 2 ** (attempt - 1))
+        for _ in range(20):
+            assert d / 2 <= rr.backoff_delay(attempt, rnd=rnd) <= d
+
+
+def test_token_bucket_spacing():
+    async def take(n):
+        bucket = rr.AsyncTokenBucket(rate=10.0, burst=2)
+        out = []
+        for _ in range(n):
+            await bucket.acquire()
+            out.append(time.monotonic())
+        return out
+
+    times = asyncio.run(take(8))
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert times[1] - times[0] < 0.05           # rafale de 2 jetons
+    assert all(g >= 0.09 for g in gaps[2:])     # puis 1 jeton / 100 ms
+    assert times[-1] - times[0] >= 0.55
+
+
+def test_rate_limit_per_host():
+    rate, burst, duration = 5.0, 1, 1.6
+    with _feed_server() as a, _feed_server() as b:
+        urls = {"a": a.url, "b": b.url}
+        sched = _scheduler(lambda q, mode: [("EN", f"{urls[q[0]]}/{q}")], rate=rate, burst=burst)
+        for q in ("a1", "a2", "a3", "b1", "b2", "b3"):
+            sched.add(q, interval=0.05)
+        try:
+            sched.run_sync(duration)
+        finally:
+            sched.close()
+        hits_a, hits_b = list(a.hit_times), list(b.hit_times)
+
+    assert set(sched.hosts) == {a.url.split("//")[1], b.url.split("//")[1]}
+    for hits in (hits_a, hits_b):
+        gaps = [y - x for x, y in zip(hits, hits[1:])]
+        assert len(hits) >= 4
+        assert min(gaps) >= 1 / rate - 0.03
+        assert len(hits) <= burst + rate * duration + 1
+    # chaque hôte a son propre bucket: ensemble, deux fois le débit d'un seul
+    assert len(hits_a) + len(hits_b) > burst + rate * duration + 1
+
+
+def test_429_backs_off_host_and_recovers():
+    with _feed_server(lambda n: 429 if n == 1 else None) as srv:
+        sched = _scheduler(lambda q, mode: [("EN", f"{srv.url}/{q}")], rate=50.0, burst=5, workers=1)
+        job = sched.add("q", interval=0.1)
+        rr.METRICS.reset()
+        try:
+            sched.run_sync(2.0)
+        finally:
+            sched.close()
+        hits = list(srv.hit_times)
+
+    st = sched.stats()
+    assert st["throttled"] == 1 and st["failed_requests"] == 1
+    assert rr.METRICS.counters.get("sched_throttled") == 1
+    # Retry-After: 1 -> hôte bloqué une seconde après le 429
+    assert hits[1] - hits[0] >= 0.95
+    assert job.runs >= 3 and job.failures == 0
+    assert st["hosts"][srv.url.split("//")[1]]["failures"] == 0
+
+
+def test_callback_exception_does_not_stop_loop(capsys):
+    calls = []
+
+    def on_result(query, items, results):
+        calls.append(query)
+        if len(calls) == 1:
+            raise RuntimeError("callback en échec")
+
+    with _feed_server() as srv:
+        sched = _scheduler(lambda q, mode: [("EN", f"{srv.url}/{q}")], rate=50.0, burst=5, on_result=on_result)
+        bad = sched.add("bad", interval=0.1)
+        sched.add("ok", interval=0.1)
+        rr.METRICS.reset()
+        try:
+            sched.run_sync(1.2)
+        finally:
+            sched.close()
+
+    st = sched.stats()
+    assert st["errors"] == 1
+    assert rr.METRICS.counters.get("sched_errors") == 1
+    assert calls.count("bad") >= 2 and calls.count("ok") >= 3   # la boucle a continué
+    assert bad.failures == 0                                     # remis à zéro au passage suivant
+    assert "callback en échec" in capsys.readouterr().err
+
+
+def test_items_exception_backs_off_query():
+    with _feed_server() as srv:
+        sched = _scheduler(lambda q, mode: [("EN", f"{srv.url}/{q}")], rate=100.0, burst=10,
+                           backoff_base=0.2, backoff_max=0.4)
+
+        def broken(job, results):
+            raise ValueError("parse")
+
+        sched._items = broken
+        job = sched.add("q", interval=30.0)
+        try:
+            sched.run_sync(1.2)
+        finally:
+            sched.close()
+        hits = list(srv.hit_times)
+
+    st = sched.stats()
+    # relancée en backoff (bien avant l'intervalle de 30 s), délai croissant
+    assert job.runs == 0
+    assert job.failures == st["errors"] == len(hits) >= 3
+    gaps = [b - a for a, b in zip(hits, hits[1:])]
+    assert 0.1 - 0.02 <= gaps[0] <= 0.2 + 0.1
+    assert all(0.2 - 0.02 <= g <= 0.4 + 0.1 for g in gaps[1:])
+
+
+@pytest.mark.parametrize("fails", [1, 3])
+def test_failed_requests_back_off_query(fails):
+    with _feed_server(lambda n: 503 if n <= fails else None) as srv:
+        sched = _scheduler(lambda q, mode: [("EN", f"{srv.url}/{q}")], rate=100.0, burst=10,
+                           backoff_base=0.1, backoff_max=0.2)
+        job = sched.add("q", interval=30.0)
+        try:
+            sched.run_sync(1.5)
+        finally:
+            sched.close()
+    # 5xx: relance bien avant l'intervalle normal (30 s), puis reprise
+    assert job.runs == fails + 1
+    assert job.failures == 0
@@ -0,0 +1,118 @@
+"""
+Équivalence du scorer compilé (CompiledLexicon: un passage regex pour les expressions,
+dict de poids par token) avec l'implémentation historique (benchmarks/support.py).
+"""
+import random
+
+import pytest
+
+import rssreader4 as rr
+from benchmarks.support import score_text_reference, synthetic_titles
+
+LEXICONS = {
+    "fr": (rr.score_text_fr, (rr.POS_WORDS_FR_W, rr.NEG_WORDS_FR_W, rr.FIN_WORDS_FR_W, rr.PHRASES_FR_W)),
+    "en": (rr.score_text_en, (rr.POS_WORDS_EN_W, rr.NEG_WORDS_EN_W, rr.FIN_WORDS_EN_W, rr.PHRASES_EN_W)),
+}
+
+
+CASES = [
+    ("", ""),
+    ("Broadcom", ""),
+    ("Broadcom beats estimates, raises guidance", "Reuters"),
+    ("BROADCOM BEATS ESTIMATES AND BEATS EXPECTATIONS", "CNBC"),
+    ("beats estimates beats estimates", ""),                      # une expression ne compte qu'une fois
+    ("Nvidia misses estimates; shares plunge after guidance cut", "Bloomberg"),
+    ("Dividend hike: record revenue, record profit", ""),
+    ("raises guidancexyz and prebeats estimates", ""),              # sous-chaînes hors frontière de mot
+    ("Share buyback announced", "MarketWatch"),
+    ("LVMH dépasse les attentes et relève ses prévisions", "Les Echos"),
+    ("LVMH depasse les attentes, releve ses previsions", "Boursorama"),
+    ("Kering : l'action chute après un avertissement sur résultats", "Zonebourse"),
+    ("Programme de rachat d'actions et hausse du dividende", ""),
+    ("Résultats record, au-dessus des attentes", ""),
+    ("hausse hausse baisse rebond", ""),                           # tokens: chaque occurrence compte
+    ("Q3 2025 : chiffre d'affaires en hausse de 12 %", "BFM Bourse"),
+    ("L'Oréal s'envole; Stellantis recule", ""),
+    ("Œuvre — «  hausse  » … ‘record’", ""),
+    ("tab\tseparated\nrecord  profit", ""),
+    ("Broadcom", "beats estimates"),                               # la source fait partie du texte
+]
+
+
+@pytest.mark.parametrize("lang", sorted(LEXICONS))
+@pytest.mark.parametrize("title, source", CASES)
+def test_compiled_matches_reference(lang, title, source):
+    fast, dicts = LEXICONS[lang]
+    assert fast(title, source) == score_text_reference(title, source, *dicts)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_compiled_matches_reference_on_synthetic_titles(seed):
+    samples = synthetic_titles(5000, seed)
+    for lang, (fast, dicts) in LEXICONS.items():
+        bad = [(t, s) for t, s in samples if fast(t, s) != score_text_reference(t, s, *dicts)]
+        assert not bad, f"{lang}: {len(bad)} écarts, ex: {bad[:3]!r}"
+
+
+def _fuzz_text(rnd: random.Random, pieces: list) -> str:
+    # fragments de lexique recollés sans espace, casse / ponctuation / accents aléatoires:
+    # vise les frontières (sous-chaînes, expressions qui se chevauchent)
+    out = []
+    for _ in range(rnd.randint(0, 10)):
+        p = rnd.choice(pieces)
+        if rnd.random() < 0.3:
+            a = rnd.randrange(len(p) + 1)
+            p = p[a:a + rnd.randint(1, 12)]
+        if rnd.random() < 0.3:
+            p = p.upper()
+        out.append(p)
+        out.append(rnd.choice(["", " ", "  ", "-", "'", ", ", ": ", "é", " ", " l'", "."]))
+    return "".join(out)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_compiled_matches_reference_fuzz(seed):
+    rnd = random.Random(seed)
+    for lang, (fast, dicts) in LEXICONS.items():
+        pieces = [w for d in dicts for w in d] + ["Broadcom", "AVGO", "the", "le", "Reuters", "2025"]
+        for _ in range(2500):
+            title, source = _fuzz_text(rnd, pieces), _fuzz_text(rnd, pieces)[:20]
+            assert fast(title, source) == score_text_reference(title, source, *dicts), (lang, title, source)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_custom_lexicon_matches_reference(seed):
+    # lexiques arbitraires: expressions préfixes / suffixes les unes des autres, mots partagés
+    rnd = random.Random(100 + seed)
+    vocab = ["gain", "gains", "loss", "profit", "up", "down", "beat", "beats", "est", "estimates"]
+    phrases = {" ".join(rnd.sample(vocab, rnd.randint(1, 3))): rnd.randint(1, 4) for _ in range(25)}
+    pos = {w: rnd.randint(1, 3) for w in rnd.sample(vocab, 4)}
+    neg = {w: rnd.randint(1, 3) for w in rnd.sample(vocab, 4)}
+    fin = {w: 1 for w in rnd.sample(vocab, 2)}
+    lex = rr.CompiledLexicon(pos, neg, fin, phrases)
+    for _ in range(2000):
+        title = " ".join(rnd.choice(vocab) for _ in range(rnd.randint(0, 8)))
+        assert lex.score(title) == score_text_reference(title, "", pos, neg, fin, phrases), title
+
+
+@pytest.mark.parametrize("n", [1, rr.BATCH_MIN - 1, rr.BATCH_MIN, 4 * rr.BATCH_MIN])
+def test_items_from_entries_routing(monkeypatch, n):
+    """Sous BATCH_MIN: score_text_auto item par item, sinon score_batch; mêmes résultats."""
+    from benchmarks.support import synthetic_rss
+    entries = rr.parse_feed(synthetic_rss(n, seed=n), fast=True)
+
+    monkeypatch.setattr(rr, "_LANG_DETECTOR", rr.LangDetector())
+    expected = []
+    for e in entries:
+        sc, lang = rr.score_text_auto(rr.safe_strip(e.title), rr.entry_source(e))
+        expected.append((sc, rr.label_from_score(sc), lang))
+
+    calls = []
+    batch = rr.score_batch
+    monkeypatch.setattr(rr, "score_batch", lambda *a, **kw: calls.append(len(a[0])) or batch(*a, **kw))
+    monkeypatch.setattr(rr, "_LANG_DETECTOR", rr.LangDetector())
+    items = rr.items_from_entries(entries)
+
+    assert [(it.score, it.label, it.lang) for it in items] == expected
+    assert all(type(it.score) is int and type(it.label) is str and type(it.lang) is str for it in items)
+    assert calls == ([] if n < rr.BATCH_MIN else [n])
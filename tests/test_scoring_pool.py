@@ -0,0 +1,34 @@
+import pytest
+
+import rssreader4 as rr
+from benchmarks.support import synthetic_titles
+
+
+@pytest.fixture(scope="module")
+def samples():
+    pairs = synthetic_titles(6000, seed=11)
+    return [t for t, _s in pairs], [s for _t, s in pairs]
+
+
+@pytest.fixture(scope="module")
+def in_process(samples):
+    with rr.ScoringPool(0, chunk=500) as pool:
+        return pool.score(*samples)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pool_keeps_order_and_results(samples, in_process, workers):
+    with rr.ScoringPool(workers, chunk=500) as pool:
+        assert pool.score(*samples) == in_process
+        st = pool.stats()
+    assert st["items"] == len(samples[0])
+
+
+def test_score_items_fills_items_in_order(in_process, samples):
+    items = [rr.Item(title=t, source=s) for t, s in zip(*samples)]
+    with rr.ScoringPool(2, chunk=700) as pool:
+        done = [it for batch in pool.score_items(iter(items)) for it in batch]
+    assert done == items
+    assert [it.score for it in done] == list(in_process[0])
+    assert [it.label for it in done] == list(in_process[1])
+
@@ -0,0 +1,112 @@
+"""Recherche locale: syntaxe (AND / OR / NOT / expressions), index .idx en JSON."""
+import argparse
+import json
+import pickle
+
+import pytest
+
+import rssreader4 as rr
+from benchmarks.support import synthetic_items
+
+TITLES = [
+    ("Broadcom and Nvidia rally on AI demand", "Reuters"),
+    ("Nvidia shares slip after export ban", "CNBC"),
+    ("Broadcom raises dividend", "Barron's"),
+    ("Broadcom, Nvidia lead chip stocks higher", "MarketWatch"),
+    ("LVMH : l'action bondit", "Les Echos"),
+]
+
+
+@pytest.fixture
+def index():
+    idx = rr.SearchIndex()
+    for i, (title, src) in enumerate(TITLES):
+        sc, lang = rr.score_text_auto(title, src)
+        idx.add(rr.Item(1766100000 + 60 * i, title, src, f"https://example.com/{i}", sc,
+                        rr.label_from_score(sc), lang))
+    return idx
+
+
+def _titles(res):
+    return sorted(it.title for it in res["items"])
+
+
+def test_and_is_an_operator(index):
+    assert rr.parse_search("Broadcom AND Nvidia") == rr.parse_search("Broadcom Nvidia")
+    both = _titles(index.search("Broadcom AND Nvidia"))
+    assert both == _titles(index.search("Broadcom Nvidia"))
+    assert both == ["Broadcom and Nvidia rally on AI demand", "Broadcom, Nvidia lead chip stocks higher"]
+    # "and" en minuscules reste un mot du titre
+    assert _titles(index.search('"broadcom and nvidia"')) == ["Broadcom and Nvidia rally on AI demand"]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Broadcom OR LVMH", [0, 2, 3, 4]),
+    ("Nvidia NOT Broadcom", [1]),
+    ("Nvidia -export", [0, 3]),
+    ("Broadcom AND NOT Nvidia", [2]),
+    ("Broadcom AND Nvidia OR dividend", [0, 2, 3]),
+    ('"chip stocks"', [3]),
+    ("AND", list(range(len(TITLES)))),
+])
+def test_search_syntax(index, query, expected):
+    assert _titles(index.search(query)) == sorted(TITLES[i][0] for i in expected)
+
+
+def test_save_load_roundtrip(tmp_path):
+    idx = rr.SearchIndex()
+    idx.extend(synthetic_items(3000, 4))
+    idx.add(rr.Item(None, "Broadcom sans date", "Reuters", "https://example.com/nodate", 0, "NEU", "en"))
+    path = str(tmp_path / "export.csv.idx")
+    idx.save(path)
+    with open(path, "rb") as f:
+        assert json.load(f)["version"] == rr.SearchIndex.VERSION
+
+    back = rr.SearchIndex.load(path)
+    assert len(back) == len(idx)
+    assert [it.to_dict() for it in back.docs] == [it.to_dict() for it in idx.docs]
+    for q in ("broadcom", "shares OR action", "label:POS lang:en", "NOT broadcom after:2025-12-18", '"record"'):
+        a, b = idx.search(q), back.search(q)
+        assert (a["total"], a["facets"], [it.link for it in a["items"]]) == \
+            (b["total"], b["facets"], [it.link for it in b["items"]])
+    assert not back.add(idx.docs[0])  # clés de dedup reconstruites
+
+
+class _Planted:
+    def __reduce__(self):
+        return (print, ("pickle exécuté",))
+
+
+@pytest.mark.parametrize("payload", [
+    pickle.dumps({"version": 1, "docs": [], "postings": {}}),
+    pickle.dumps(_Planted()),
+    b'{"version": 1, "docs": [], "postings": {}}',
+    b'{"version": 2, "fields": ["ts", "title", "source", "link", "score", "label", "lang", "query"],'
+    b' "docs": [[1, "t", "s", "l", 0, "NEU", "fr", ""]], "postings": {"t": [5]}}',
+    b'{"version": 2, "fields": ["ts", "title", "source", "link", "score", "label", "lang", "query"],'
+    b' "docs": [[1, "t", "s"]], "postings": {}}',
+])
+def test_load_rejects_other_formats(tmp_path, capsys, payload):
+    path = tmp_path / "bad.idx"
+    path.write_bytes(payload)
+    with pytest.raises(ValueError):
+        rr.SearchIndex.load(str(path))
+    args = argparse.Namespace(source=str(path), query="x", limit=10, output=str(tmp_path / "out.jsonl"),
+                              format="jsonl")
+    assert rr.cli_search(args) == 2
+    out = capsys.readouterr()
+    assert "pickle exécuté" not in out.out + out.err
+
+
+def test_search_output_is_batched(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    idx = rr.SearchIndex()
+    idx.extend(synthetic_items(500, 5))
+    path = str(tmp_path / "export.csv.idx")
+    idx.save(path)
+    out = tmp_path / "hits.parquet"
+    args = argparse.Namespace(source=path, query="shares OR action", limit=1000, output=str(out), format="parquet")
+    assert rr.cli_search(args) == 0
+    meta = pq.read_metadata(str(out))
+    assert meta.num_rows == idx.search("shares OR action", limit=1000)["total"] > 1
+    assert meta.num_row_groups == 1
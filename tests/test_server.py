@@ -0,0 +1,200 @@
+"""FeedServer sur un port libre, clients concurrents: ETag / 304, gzip, long-poll, SSE."""
+import gzip
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import pytest
+
+import rssreader4 as rr
+from benchmarks.support import synthetic_items
+
+CLIENTS = 16
+
+
+@pytest.fixture
+def server():
+    hub = rr.FeedHub()
+    hub.add_query("AVGO")
+    hub.add_query("LVMH")
+    hub.publish("AVGO", synthetic_items(40, 1))
+    with rr.FeedServer(hub, port=0, heartbeat=0.2) as srv:
+        yield srv
+
+
+def _conn(srv, timeout=10):
+    u = urlsplit(srv.url)
+    return http.client.HTTPConnection(u.hostname, u.port, timeout=timeout)
+
+
+def _get(conn, path, headers=None):
+    conn.request("GET", path, headers=headers or {})
+    resp = conn.getresponse()
+    return resp, resp.read()
+
+
+def _concurrently(fn, n=CLIENTS):
+    """fn(i) dans n threads démarrés ensemble -> résultats dans l'ordre de i (exceptions relancées)."""
+    out, errors = [None] * n, []
+    barrier = threading.Barrier(n)
+
+    def run(i):
+        try:
+            barrier.wait()
+            out[i] = fn(i)
+        except Exception as e:  # relancée dans le thread du test
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(30)
+    if errors:
+        raise errors[0]
+    return out
+
+
+def test_etag_not_modified_under_concurrency(server):
+    def client(_i):
+        conn = _conn(server)
+        try:
+            resp, body = _get(conn, "/items?q=AVGO&limit=50")  # keep-alive: même connexion ensuite
+            etag = resp.getheader("ETag")
+            again, empty = _get(conn, "/items?q=AVGO&limit=50", {"If-None-Match": etag})
+            return resp.status, etag, json.loads(body)["count"], again.status, again.getheader("ETag"), empty
+        finally:
+            conn.close()
+
+    res = _concurrently(client)
+    assert {r[0] for r in res} == {200} and {r[3] for r in res} == {304}
+    assert len({r[1] for r in res}) == 1 and all(r[4] == r[1] and r[5] == b"" for r in res)
+    assert {r[2] for r in res} == {40}
+    assert server.hub.stats()["renders"] == 1  # un seul encodage pour tous les clients
+
+    # l'ETag d'AVGO ne bouge que si ses items changent
+    conn = _conn(server)
+    try:
+        server.hub.publish("LVMH", synthetic_items(3, 2))
+        assert _get(conn, "/items?q=AVGO&limit=50", {"If-None-Match": res[0][1]})[0].status == 304
+        server.hub.publish("AVGO", synthetic_items(1, 3))
+        resp, _body = _get(conn, "/items?q=AVGO&limit=50", {"If-None-Match": res[0][1]})
+        assert resp.status == 200 and resp.getheader("ETag") != res[0][1]
+    finally:
+        conn.close()
+
+
+def test_gzip_negotiation(server):
+    def client(i):
+        conn = _conn(server)
+        try:
+            headers = {"Accept-Encoding": "gzip, deflate"} if i % 2 else {}
+            resp, body = _get(conn, "/rss?q=AVGO", headers)
+            etag = resp.getheader("ETag")
+            again, _ = _get(conn, "/rss?q=AVGO", dict(headers, **{"If-None-Match": etag}))
+            return resp.getheader("Content-Encoding"), resp.getheader("Vary"), etag, body, again.status
+        finally:
+            conn.close()
+
+    res = _concurrently(client)
+    plain = [r for i, r in enumerate(res) if not i % 2]
+    gz = [r for i, r in enumerate(res) if i % 2]
+    assert all(r[0] is None for r in plain) and all(r[0] == "gzip" for r in gz)
+    assert all(r[1] == "Accept-Encoding" and r[4] == 304 for r in res)
+    assert gz[0][2] == plain[0][2][:-1] + '-gz"'  # une représentation = un ETag
+    assert gzip.decompress(gz[0][3]) == plain[0][3]
+    assert len(gz[0][3]) < len(plain[0][3])
+    assert plain[0][3].startswith(b'<?xml version="1.0" encoding="UTF-8"?>')
+
+
+def test_long_poll_timeout_and_wakeup(server):
+    since = server.hub.seq
+    conn = _conn(server)
+    try:
+        t0 = time.monotonic()
+        resp, body = _get(conn, f"/items?q=AVGO&since={since}&wait=0.3")
+        elapsed = time.monotonic() - t0
+    finally:
+        conn.close()
+    doc = json.loads(body)
+    assert resp.status == 200 and doc["count"] == 0 and doc["seq"] == since
+    assert 0.25 <= elapsed < 5
+
+    def client(_i):
+        conn = _conn(server)
+        try:
+            t0 = time.monotonic()
+            _resp, body = _get(conn, f"/items?q=AVGO&since={since}&wait=10")
+            return json.loads(body), time.monotonic() - t0
+        finally:
+            conn.close()
+
+    fresh = synthetic_items(2, 4)
+    timer = threading.Timer(0.3, lambda: (server.hub.publish("LVMH", synthetic_items(1, 5)),  # autre requête
+                                          time.sleep(0.2), server.hub.publish("AVGO", fresh)))
+    timer.start()
+    try:
+        res = _concurrently(client, 8)
+    finally:
+        timer.join()
+    for doc, elapsed in res:
+        assert [it["title"] for it in doc["items"]] == [it.title for it in fresh]
+        assert doc["seq"] == server.hub.seq and 0.4 <= elapsed < 5  # réveillés par AVGO, pas par LVMH
+
+
+def _sse_events(resp, n):
+    """Lit n événements "item" (les pings sont ignorés) -> [(id, dict)]."""
+    events, cur = [], {}
+    while len(events) < n:
+        line = resp.readline()
+        assert line, "flux SSE fermé trop tôt"
+        line = line.rstrip(b"\n").decode("utf-8")
+        if not line:
+            if cur.get("event") == "item":
+                events.append((int(cur["id"]), json.loads(cur["data"])))
+            cur = {}
+        elif not line.startswith(":"):
+            k, _, v = line.partition(": ")
+            cur[k] = v
+    return events
+
+
+def test_sse_delivers_items_to_every_client(server):
+    conns, resps = [], []
+    try:
+        for _ in range(4):
+            conn = _conn(server)
+            conn.request("GET", "/events?q=AVGO")
+            resp = conn.getresponse()
+            assert resp.status == 200 and resp.getheader("Content-Type").startswith("text/event-stream")
+            assert resp.readline().startswith(b"retry:") and resp.readline() == b"event: hello\n"
+            conns.append(conn)
+            resps.append(resp)
+        deadline = time.monotonic() + 5
+        while server._sse < 4 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        first = server.hub.seq
+        server.hub.publish("LVMH", synthetic_items(2, 6))  # filtrée par ?q=AVGO
+        fresh = synthetic_items(3, 7)
+        last = server.hub.publish("AVGO", fresh)
+        got = _concurrently(lambda i: _sse_events(resps[i], 3), len(resps))
+        for events in got:
+            assert [s for s, _d in events] == list(range(last - 2, last + 1))
+            assert all(s > first for s, _d in events)
+            assert [d["title"] for _s, d in events] == [it.title for it in reversed(fresh)]
+            assert all(d["query"] == "AVGO" for _s, d in events)
+    finally:
+        for conn in conns:
+            conn.close()
+
+    # reprise: Last-Event-ID ne renvoie que ce qui suit
+    conn = _conn(server)
+    try:
+        conn.request("GET", "/events?q=AVGO", headers={"Last-Event-ID": str(last - 1)})
+        resp = conn.getresponse()
+        assert [s for s, _d in _sse_events(resp, 1)] == [last]
+    finally:
+        conn.close()
@@ -0,0 +1,120 @@
+"""ArticleStore: appartenance article -> requêtes (article_queries), migration, scan --new-only."""
+import json
+import sqlite3
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import rssreader4 as rr
+from benchmarks.support import StubFeedServer, synthetic_rss
+
+
+def _items(lo, hi):
+    return [rr.Item(1766100000 - 60 * i, f"Broadcom et Nvidia, article {i}", "Reuters",
+                    f"https://example.com/{i}", 0, "NEU", "fr") for i in range(lo, hi)]
+
+
+def _links(items):
+    return sorted(it.link for it in items)
+
+
+def test_history_sees_every_query_of_an_article(tmp_path):
+    store = rr.ArticleStore(str(tmp_path / "a.db"))
+    try:
+        store.upsert(_items(0, 5), "AVGO when:1d")
+        store.upsert(_items(3, 8), "NVDA")       # 3 et 4 déjà vus sous AVGO
+        store.upsert(_items(4, 5), "AVGO")       # même article, autre forme de la requête
+        assert store.count() == 8
+
+        nvda = store.history(query="NVDA")
+        assert _links(nvda) == _links(_items(3, 8))
+        assert {it.query for it in nvda} == {"NVDA"}
+        avgo = store.history(query="AVGO")     # préfixe: "AVGO" et "AVGO when:1d", sans doublon
+        assert _links(avgo) == _links(_items(0, 5))
+        assert [it.ts for it in avgo] == sorted((it.ts for it in avgo), reverse=True)
+        assert not store.history(query="AVG")
+        assert _links(store.history(query="NVDA", limit=2)) == _links(_items(3, 5))
+
+        # sans filtre de requête: chaque article une fois, sous sa première requête
+        everything = store.history()
+        assert len(everything) == 8
+        assert {it.link: it.query for it in everything}["https://example.com/3"] == "AVGO when:1d"
+    finally:
+        store.close()
+
+
+def test_old_database_is_migrated(tmp_path):
+    path = str(tmp_path / "old.db")
+    db = sqlite3.connect(path)
+    db.executescript(rr.ArticleStore.SCHEMA.split("CREATE TABLE IF NOT EXISTS article_queries")[0])
+    now = 1766100000
+    db.executemany("INSERT INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                   [rr.ArticleStore._row(it, "AVGO", now) for it in _items(0, 3)])
+    db.commit()
+    db.close()
+
+    store = rr.ArticleStore(path)
+    try:
+        assert _links(store.history(query="AVGO")) == _links(_items(0, 3))
+        store.upsert(_items(2, 4), "NVDA")
+        assert _links(store.history(query="NVDA")) == _links(_items(2, 4))
+        assert store.db.execute("PRAGMA user_version").fetchone()[0] == rr.ArticleStore.VERSION
+    finally:
+        store.close()
+    rr.ArticleStore(path).close()  # réouverture: pas de nouvelle migration
+
+
+def test_new_only_requires_db(capsys):
+    with pytest.raises(SystemExit) as exc:
+        rr.cli_main(["scan", "watchlist.txt", "--new-only"])
+    assert exc.value.code == 2
+    assert "--db" in capsys.readouterr().err
+
+
+def test_scan_new_only_records_every_query(tmp_path, monkeypatch):
+    def handler(h):
+        sym = parse_qs(urlsplit(h.path).query)["q"][0].split()[0]
+        lo = {"AVGO": 0, "NVDA": 3}[sym]
+        titles = [(f"Broadcom et Nvidia, article {i}", "Reuters") for i in range(lo, lo + 5)]
+        body = synthetic_rss(5, titles=titles, links=[f"https://example.com/{i}" for i in range(lo, lo + 5)])
+        h.send_response(200)
+        h.send_header("Content-Type", "application/rss+xml; charset=utf-8")
+        h.send_header("Content-Length", str(len(body)))
+        h.end_headers()
+        h.wfile.write(body)
+        return True
+
+    watchlist = tmp_path / "watchlist.txt"
+    watchlist.write_text("AVGO\nNVDA\n", encoding="utf-8")
+    db, out = str(tmp_path / "a.db"), tmp_path / "out.jsonl"
+    with StubFeedServer(handler=handler) as srv:
+        monkeypatch.setattr(rr, "BASE_URL", f"{srv.url}/rss/search")
+        args = ["scan", str(watchlist), "--db", db, "--new-only", "--workers", "1", "--no-cache", "-q",
+                "-o", str(out)]
+        assert rr.cli_main(args) == 0
+        first = [json.loads(line)["url"] for line in out.read_text(encoding="utf-8").splitlines()]
+        assert rr.cli_main(args) == 0
+        second = out.read_text(encoding="utf-8")
+
+    assert sorted(first) == sorted(f"https://example.com/{i}" for i in range(8))  # chacun émis une fois
+    assert second == ""
+    store = rr.ArticleStore(db)
+    try:
+        assert _links(store.history(query="NVDA")) == sorted(f"https://example.com/{i}" for i in range(3, 8))
+        assert _links(store.history(query="AVGO")) == sorted(f"https://example.com/{i}" for i in range(5))
+    finally:
+        store.close()
+
+
+def test_history_writes_one_batch_per_query(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    db, out = str(tmp_path / "a.db"), tmp_path / "hist.parquet"
+    store = rr.ArticleStore(db)
+    try:
+        store.upsert(_items(0, 50), "AVGO")
+    finally:
+        store.close()
+    assert rr.cli_main(["history", "--db", db, "--query", "AVGO", "--after", "2025-01-01", "--format", "parquet",
+                        "-o", str(out)]) == 0
+    meta = pq.read_metadata(str(out))
+    assert (meta.num_rows, meta.num_row_groups) == (50, 1)